@@ -0,0 +1,422 @@
+"""
+Motor de conexiones SSH asíncrono (asyncio) para routers Cisco.
+Alternativa a network_connection basada en asyncssh: todas las sesiones
+comparten un único event loop y la concurrencia se acota con un semáforo,
+de modo que escala a cientos de routers sin un hilo por dispositivo.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from datetime import datetime
+
+from ios_config import calcular_delta
+from response_cache import ResponseCache, es_cacheable
+from textfsm_parser import normalizar_comando, parsear_salida
+
+
+# Prompt de IOS al final del buffer: "R1>", "R1#", "R1(config-if)#"
+PATRON_PROMPT = r"(?:^|\n)(?P<host>{host})(?:\([^)\r\n]*\))?[>#]\s*\Z"
+
+
+class AsyncRouterConnection:
+    """
+    Conexión SSH asíncrona a un router Cisco.
+    Equivalente a SSHRouterConnection, pero sus métodos son corrutinas.
+    """
+
+    def __init__(self, ip, usuario, password, nombre="Router", puerto=22):
+        self.ip = ip
+        self.usuario = usuario
+        self.password = password
+        self.nombre = nombre
+        self.puerto = puerto
+        self.conexion = None
+        self.proceso = None
+        self.hostname = None
+        self.conectado = False
+        self.ultimo_comando = None
+        self.ultima_actividad = 0.0  # time.monotonic() de la última E/S exitosa
+        self.umbral_inactividad = 60  # segundos sin E/S antes de sondear el router
+        self.timeout_conexion = 20
+        self.timeout_comando = 30
+        self.cache = ResponseCache()  # respuestas de comandos show
+        self.historial = None  # ResultStore donde se registran las respuestas (opcional)
+        self._lock = None
+        self._patron_prompt = re.compile(PATRON_PROMPT.format(host=r"[\w.\-]+"))
+
+    async def conectar(self):
+        """Establece la conexión SSH y abre una shell interactiva"""
+        try:
+            print(f"Conectando a {self.nombre} ({self.ip}:{self.puerto})...")
+            import asyncssh  # se importa en la primera conexión
+            self.conexion = await asyncio.wait_for(
+                asyncssh.connect(
+                    self.ip, port=self.puerto,
+                    username=self.usuario, password=self.password,
+                    known_hosts=None, client_keys=None,
+                ),
+                timeout=self.timeout_conexion,
+            )
+            self.proceso = await self.conexion.create_process(term_type="vt100")
+
+            # Leer banner y prompt inicial para conocer el hostname
+            salida = await self._leer_hasta_prompt(self.timeout_conexion)
+            self.hostname = self._patron_prompt.search(salida).group("host")
+            self._patron_prompt = re.compile(PATRON_PROMPT.format(host=re.escape(self.hostname)))
+
+            await self._enviar("terminal length 0")
+            self.conectado = True
+            self._registrar_actividad()
+            print(f"✓ Conexión exitosa a {self.nombre}")
+            return True
+
+        except Exception as e:
+            print(f"✗ Error conectando a {self.nombre}: {e}")
+            self._cerrar()
+            return False
+
+    async def desconectar(self):
+        """Cierra la conexión SSH"""
+        try:
+            if self.conexion and self.conectado:
+                self._cerrar()
+                await self.conexion.wait_closed()
+                print(f"✓ Desconectado de {self.nombre}")
+            self.conectado = False
+        except Exception as e:
+            print(f"Error al desconectar de {self.nombre}: {e}")
+
+    async def verificar_conexion(self, forzar=False):
+        """
+        Verifica si la conexión está activa
+        Solo envía un comando de sondeo si la sesión lleva inactiva más de
+        umbral_inactividad segundos o si forzar=True
+        """
+        if not self.conexion or not self.conectado:
+            return False
+
+        if not self._transporte_activo():
+            self.conectado = False
+            return False
+
+        if not forzar and self.tiempo_inactivo() < self.umbral_inactividad:
+            return True
+
+        try:
+            await self._enviar("show clock")
+            return True
+        except Exception:
+            self.conectado = False
+            return False
+
+    async def reconectar(self):
+        """Intenta reconectar al router"""
+        print(f"Intentando reconectar a {self.nombre}...")
+        await self.desconectar()
+        await asyncio.sleep(2)
+        return await self.conectar()
+
+    async def obtener_informacion(self, comando, parsear=False, forzar=False):
+        """
+        Ejecuta comandos de consulta (show commands)
+        parsear: si es True y existe plantilla TextFSM, devuelve una lista de
+        registros (diccionarios) en lugar del texto
+        forzar: ignora la caché de respuestas y consulta al router
+        """
+        clave = normalizar_comando(comando)
+        cacheable = es_cacheable(comando)
+        if cacheable and not forzar:
+            resultado = self.cache.obtener(clave)
+            if resultado is not None:
+                return self._parsear(comando, resultado) if parsear else resultado
+
+        if not await self._verificar_y_reconectar():
+            return None
+
+        try:
+            print(f"[{self.nombre}] Ejecutando: {comando}")
+            resultado = await self._enviar(comando)
+            self.ultimo_comando = datetime.now()
+            if cacheable:
+                self.cache.guardar(clave, resultado)
+            if self.historial:
+                self.historial.guardar_resultado(self.nombre, comando, resultado)
+            if parsear:
+                return self._parsear(comando, resultado)
+            return resultado
+        except Exception as e:
+            print(f"Error ejecutando '{comando}' en {self.nombre}: {e}")
+            self._marcar_si_caida()
+            return None
+
+    async def obtener_varios(self, comandos, parsear=False, forzar=False):
+        """
+        Ejecuta varios comandos show seguidos
+        Devuelve un diccionario comando -> resultado (None si falló)
+        """
+        return {comando: await self.obtener_informacion(comando, parsear, forzar)
+                for comando in comandos}
+
+    async def configurar(self, comandos):
+        """
+        Ejecuta comandos de configuración
+        comandos: lista de comandos o string único
+        """
+        if not await self._verificar_y_reconectar():
+            return False
+
+        if isinstance(comandos, str):
+            comandos = [comandos]
+
+        try:
+            print(f"[{self.nombre}] Ejecutando {len(comandos)} comando(s) de configuración")
+            salidas = []
+            async with self._obtener_lock():
+                try:
+                    for comando in ["configure terminal"] + list(comandos) + ["end"]:
+                        salidas.append(f"{comando}\n{await self._enviar_sin_lock(comando)}")
+                finally:
+                    # Cualquier respuesta show anterior puede haber quedado obsoleta
+                    self.cache.invalidar()
+            self.ultimo_comando = datetime.now()
+            print(f"✓ Configuración aplicada en {self.nombre}")
+            return "\n".join(salidas)
+        except Exception as e:
+            print(f"✗ Error en configuración de {self.nombre}: {e}")
+            self._marcar_si_caida()
+            return False
+
+    async def configurar_delta(self, comandos):
+        """
+        Aplica solo las líneas de la plantilla que faltan en la running-config
+        Devuelve (delta, resultado): delta vacío si el router ya cumple la plantilla
+        """
+        if isinstance(comandos, str):
+            comandos = [comandos]
+        running = await self.obtener_informacion("show running-config", forzar=True)
+        if not running:
+            return None, False
+
+        delta = calcular_delta(comandos, running)
+        if not delta:
+            print(f"✓ {self.nombre} ya cumple la plantilla ({len(comandos)} comando(s))")
+            return delta, ""
+        print(f"[{self.nombre}] Diferencias: {len(delta)} de {len(comandos)} comando(s)")
+        return delta, await self.configurar(delta)
+
+    def _parsear(self, comando, resultado):
+        """Parsea la salida con TextFSM; si no hay plantilla o falla, devuelve el texto"""
+        try:
+            registros = parsear_salida(comando, resultado)
+        except Exception as e:
+            print(f"Error parseando '{comando}' de {self.nombre}: {e}")
+            return resultado
+        return resultado if registros is None else registros
+
+    def estadisticas_cache(self):
+        """Aciertos y fallos de la caché de respuestas"""
+        return self.cache.estadisticas()
+
+    def tiempo_inactivo(self):
+        """Segundos transcurridos desde la última E/S exitosa con el router"""
+        return time.monotonic() - self.ultima_actividad
+
+    async def _verificar_y_reconectar(self):
+        """Verifica conexión y reconecta si es necesario"""
+        if not await self.verificar_conexion():
+            return await self.reconectar()
+        return True
+
+    async def _enviar(self, comando):
+        """Envía un comando en exclusiva sobre la shell y devuelve su salida"""
+        async with self._obtener_lock():
+            return await self._enviar_sin_lock(comando)
+
+    async def _enviar_sin_lock(self, comando):
+        """Envía un comando y lee hasta el siguiente prompt (requiere el lock)"""
+        self.proceso.stdin.write(comando + "\n")
+        salida = await self._leer_hasta_prompt(self.timeout_comando)
+        self._registrar_actividad()
+        return self._limpiar_salida(salida, comando)
+
+    async def _leer_hasta_prompt(self, timeout):
+        """Lee del canal hasta encontrar el prompt del router"""
+        buffer = []
+
+        async def leer():
+            while True:
+                datos = await self.proceso.stdout.read(65535)
+                if not datos:
+                    raise ConnectionError("Canal SSH cerrado por el router")
+                buffer.append(datos.replace("\r", ""))
+                texto = "".join(buffer)
+                if self._patron_prompt.search(texto):
+                    return texto
+
+        return await asyncio.wait_for(leer(), timeout)
+
+    def _limpiar_salida(self, salida, comando):
+        """Elimina el eco del comando y el prompt final"""
+        lineas = salida.split("\n")
+        if lineas and lineas[0].strip().endswith(comando.strip()):
+            lineas = lineas[1:]
+        if lineas:
+            lineas = lineas[:-1]
+        return "\n".join(lineas).strip("\n")
+
+    def _obtener_lock(self):
+        """Lock del canal, creado dentro del event loop en el primer uso"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def _registrar_actividad(self):
+        """Marca el instante de la última E/S exitosa"""
+        self.ultima_actividad = time.monotonic()
+
+    def _transporte_activo(self):
+        """Comprueba el estado de la shell sin enviar nada al router"""
+        return self.proceso is not None and not self.proceso.stdout.at_eof()
+
+    def _marcar_si_caida(self):
+        """Tras un error de E/S, marca la sesión como caída si el canal murió"""
+        if not self._transporte_activo():
+            self.conectado = False
+
+    def _cerrar(self):
+        """Cierra el canal y la conexión sin esperar"""
+        if self.proceso:
+            self.proceso.close()
+            self.proceso = None
+        if self.conexion:
+            self.conexion.close()
+        self.conectado = False
+
+    def __str__(self):
+        estado = "Conectado" if self.conectado else "Desconectado"
+        return f"{self.nombre} ({self.ip}) - {estado}"
+
+
+class AsyncRouterManager:
+    """
+    Equivalente asíncrono de RouterManager.
+    Todas las operaciones masivas se ejecutan con concurrencia acotada.
+    """
+
+    def __init__(self, max_concurrencia=50, historial=None):
+        self.routers = {}
+        self.max_concurrencia = max_concurrencia
+        self.historial = historial  # ResultStore compartido por los routers (opcional)
+        self._semaforo = None
+
+    def agregar_router(self, nombre, ip, usuario, password, puerto=22):
+        """Agrega un router al manager"""
+        router = AsyncRouterConnection(ip, usuario, password, nombre, puerto)
+        router.historial = self.historial
+        self.routers[nombre] = router
+        return router
+
+    def obtener_router(self, nombre):
+        """Obtiene un router específico"""
+        return self.routers.get(nombre)
+
+    async def conectar_todos(self, callback=None):
+        """
+        Conecta a todos los routers
+        callback: función (nombre, resultado, duracion) llamada al terminar cada router
+        """
+        return await self._en_todos(lambda router: router.conectar(), callback=callback)
+
+    async def desconectar_todos(self):
+        """Desconecta todos los routers"""
+        await self._en_todos(lambda router: router.desconectar())
+
+    async def obtener_informacion(self, comando, nombres=None, callback=None, parsear=False,
+                                  forzar=False):
+        """Ejecuta un comando show en los routers indicados (todos por defecto)"""
+        return await self._en_todos(lambda router: router.obtener_informacion(comando, parsear, forzar),
+                                    nombres, callback)
+
+    async def configurar(self, comandos, nombres=None, callback=None):
+        """Aplica comandos de configuración en los routers indicados (todos por defecto)"""
+        return await self._en_todos(lambda router: router.configurar(comandos),
+                                    nombres, callback)
+
+    async def verificar_todos(self, forzar=False, callback=None):
+        """Comprueba el estado de todos los routers"""
+        return await self._en_todos(lambda router: router.verificar_conexion(forzar),
+                                    callback=callback)
+
+    async def _en_todos(self, operacion, nombres=None, callback=None):
+        """Ejecuta operacion(router) en paralelo con concurrencia acotada"""
+        nombres = list(self.routers) if nombres is None else nombres
+        semaforo = self._obtener_semaforo()
+        resultados = {}
+
+        async def ejecutar(nombre):
+            async with semaforo:
+                inicio = time.perf_counter()
+                try:
+                    resultado = await operacion(self.routers[nombre])
+                except Exception as e:
+                    # Como en RouterManager: el fallo de un router no detiene a los demás
+                    print(f"Error en {nombre}: {e}")
+                    resultado = None
+                duracion = time.perf_counter() - inicio
+            resultados[nombre] = resultado
+            if callback:
+                try:
+                    callback(nombre, resultado, duracion)
+                except Exception as e:
+                    print(f"Error en callback para {nombre}: {e}")
+
+        await asyncio.gather(*(ejecutar(nombre) for nombre in nombres if nombre in self.routers))
+        return resultados
+
+    def _obtener_semaforo(self):
+        """Semáforo de concurrencia, creado dentro del event loop en el primer uso"""
+        if self._semaforo is None:
+            self._semaforo = asyncio.Semaphore(self.max_concurrencia)
+        return self._semaforo
+
+    def listar_routers(self):
+        """Lista todos los routers y su estado"""
+        for router in self.routers.values():
+            print(router)
+
+
+class EventLoopThread:
+    """
+    Hilo único que ejecuta un event loop de asyncio.
+    Permite a código síncrono (Tk) lanzar corrutinas del motor y recibir
+    concurrent.futures.Future con el resultado.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, daemon=True, name="asyncio-loop")
+
+    def iniciar(self):
+        """Arranca el hilo del event loop"""
+        self.thread.start()
+        return self
+
+    def enviar(self, corrutina):
+        """Programa una corrutina en el loop y devuelve un concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(corrutina, self.loop)
+
+    def ejecutar(self, corrutina, timeout=None):
+        """Ejecuta una corrutina en el loop y espera su resultado"""
+        return self.enviar(corrutina).result(timeout)
+
+    def detener(self):
+        """Detiene el event loop y espera al hilo"""
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=2)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
@@ -0,0 +1,57 @@
+"""
+Benchmark del motor asíncrono contra routers SSH simulados locales.
+Mide conexión, consulta, configuración y verificación de toda la flota.
+
+Uso: python benchmarks/bench_async_engine.py [routers] [concurrencia]
+"""
+
+import asyncio
+import contextlib
+import io
+import sys
+import time
+
+from fake_ssh_server import PASSWORD, USUARIO, iniciar_servidores
+from async_connection import AsyncRouterManager
+
+PUERTO_BASE = 2200
+
+
+async def medir(descripcion, corrutina, total):
+    """Ejecuta una operación masiva e imprime el tiempo y los éxitos"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        resultados = await corrutina
+        duracion = time.perf_counter() - inicio
+    exitos = sum(1 for resultado in resultados.values() if resultado)
+    print(f"{descripcion:<14} {exitos:>4}/{total} en {duracion:6.2f}s")
+    return resultados
+
+
+async def main(routers, concurrencia):
+    servidores = await iniciar_servidores(routers, PUERTO_BASE, latencia=0.01)
+
+    manager = AsyncRouterManager(max_concurrencia=concurrencia)
+    for indice in range(routers):
+        manager.agregar_router(f"R{indice + 1}", "127.0.0.1", USUARIO, PASSWORD,
+                               puerto=PUERTO_BASE + indice)
+
+    print(f"Routers: {routers}, concurrencia: {concurrencia}")
+    await medir("Conexión", manager.conectar_todos(), routers)
+    resultados = await medir("show ip arp", manager.obtener_informacion("show ip arp"), routers)
+    await medir("Configuración", manager.configurar(["interface FastEthernet0/0",
+                                                     "description enlace"]), routers)
+    await medir("Verificación", manager.verificar_todos(forzar=True), routers)
+
+    print("\nSalida de R1:")
+    print(resultados.get("R1"))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        await manager.desconectar_todos()
+    for servidor in servidores:
+        servidor.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50,
+                     int(sys.argv[2]) if len(sys.argv) > 2 else 25))
@@ -0,0 +1,95 @@
+"""
+Benchmark: almacén de respaldos con miles de revisiones.
+Mide el espacio en disco frente a guardar copias completas, la
+deduplicación de configuraciones sin cambios y el tiempo de las consultas
+"qué cambió desde" y de reconstrucción de una revisión.
+
+Uso: python benchmarks/bench_backup.py [routers] [revisiones_por_router]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import simulated_device  # noqa: F401 (añade la raíz del repositorio a sys.path)
+from config_backup import ConfigBackupStore, normalizar_config
+
+
+def config_base(nombre, interfaces=48):
+    lineas = ["Building configuration...", "", "Current configuration : 9999 bytes",
+              f"hostname {nombre}", "!"]
+    for i in range(interfaces):
+        lineas += [f"interface GigabitEthernet0/{i}",
+                   f" description enlace {i}",
+                   f" ip address 10.{i}.0.1 255.255.255.0",
+                   " no shutdown", "!"]
+    lineas += [f"access-list 100 permit tcp any host 10.0.0.{i} eq 22" for i in range(100)]
+    lineas += ["end"]
+    return lineas
+
+
+def tamano_directorio(directorio):
+    return sum(os.path.getsize(os.path.join(raiz, archivo))
+               for raiz, _, archivos in os.walk(directorio) for archivo in archivos)
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    revisiones = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    aleatorio = random.Random(1)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        store = ConfigBackupStore(directorio)
+        bytes_completos = 0
+        nuevas = 0
+        instante = 1_000_000.0
+
+        inicio = time.perf_counter()
+        configs = {f"R{i}": config_base(f"R{i}") for i in range(1, cantidad + 1)}
+        for _ in range(revisiones):
+            for nombre, lineas in configs.items():
+                instante += 1
+                if aleatorio.random() < 0.5:  # la mitad de los respaldos no cambia nada
+                    indice = 6 + 5 * aleatorio.randrange(48)  # línea description de una interfaz
+                    lineas[indice] = f" description cambio {aleatorio.randrange(10**6)}"
+                texto = "\n".join(lineas)
+                bytes_completos += len(texto)
+                nuevas += store.guardar(nombre, texto, instante)[1]
+        t_guardar = time.perf_counter() - inicio
+
+        en_disco = tamano_directorio(directorio)
+        total = cantidad * revisiones
+        print(f"{cantidad} routers x {revisiones} respaldos = {total} respaldos, {nuevas} revisiones nuevas")
+        print(f"Guardado: {t_guardar:.2f}s ({t_guardar / total * 1000:.2f} ms/respaldo)")
+        print(f"Copias completas: {bytes_completos / 1e6:8.2f} MB")
+        print(f"En disco:         {en_disco / 1e6:8.2f} MB (x{bytes_completos / en_disco:.0f} menos)")
+
+        # Consultas sobre un almacén recién abierto (índices leídos desde disco)
+        store = ConfigBackupStore(directorio)
+        inicio = time.perf_counter()
+        store.cambios_desde(0)
+        t_carga = time.perf_counter() - inicio
+
+        desde = instante - cantidad * revisiones // 2
+        inicio = time.perf_counter()
+        for _ in range(100):
+            cambios = store.cambios_desde(desde)
+        t_cambios = (time.perf_counter() - inicio) / 100
+        print(f"Carga de índices: {t_carga * 1000:.1f} ms")
+        print(f"cambios_desde:    {t_cambios * 1000:.3f} ms ({len(cambios)} routers con cambios)")
+
+        inicio = time.perf_counter()
+        for _ in range(20):
+            store._textos.clear()
+            store.obtener("R1", aleatorio.uniform(1_000_000, instante))
+        t_reconstruir = (time.perf_counter() - inicio) / 20
+        print(f"Reconstrucción de una revisión sin caché: {t_reconstruir * 1000:.2f} ms")
+
+        original = normalizar_config("\n".join(configs["R1"]))
+        print(f"Última revisión idéntica: {store.obtener('R1') == original}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmark: varios comandos show en un único intercambio (obtener_varios)
+frente a un send_command por comando, sobre un router simulado.
+
+Uso: python benchmarks/bench_batch.py [repeticiones] [latencia_ms] [proceso_ms]
+"""
+
+import contextlib
+import io
+import sys
+import time
+
+from simulated_device import crear_router_simulado
+import topology_config as config
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    latencia = (float(sys.argv[2]) if len(sys.argv) > 2 else 20) / 1000
+    proceso = (float(sys.argv[3]) if len(sys.argv) > 3 else 1) / 1000
+    comandos = list(config.QUERY_COMMANDS.values())
+
+    router = crear_router_simulado(latencia)
+    router.conexion.procesamiento = proceso
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            secuencial = {c: router.obtener_informacion(c, forzar=True) for c in comandos}
+        t_secuencial = (time.perf_counter() - inicio) / repeticiones
+        llamadas_secuencial = router.conexion.comandos_enviados
+
+        router.conexion.comandos_enviados = 0
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            lote = router.obtener_varios(comandos, forzar=True)
+        t_lote = (time.perf_counter() - inicio) / repeticiones
+        llamadas_lote = router.conexion.comandos_enviados
+
+    print(f"{len(comandos)} comandos, latencia {latencia * 1000:.0f} ms, "
+          f"proceso {proceso * 1000:.0f} ms/comando, {repeticiones} repeticiones")
+    print(f"Secuencial: {t_secuencial * 1000:8.1f} ms ({llamadas_secuencial // repeticiones} intercambios)")
+    print(f"Lote:       {t_lote * 1000:8.1f} ms ({llamadas_lote // repeticiones} intercambio)")
+    print(f"Mejora: x{t_secuencial / t_lote:.1f}")
+    print(f"Resultados idénticos: {secuencial == lote}")
+
+
+if __name__ == "__main__":
+    main()
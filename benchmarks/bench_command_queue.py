@@ -0,0 +1,65 @@
+"""
+Benchmark de la cola de comandos por router bajo carga concurrente.
+Varios hilos lanzan consultas, sondas y configuraciones contra el mismo
+router simulado; se comprueba que no hay colisiones en el canal, que las
+salidas son correctas y cuántas lecturas se agruparon.
+
+Uso: python benchmarks/bench_command_queue.py [hilos] [peticiones_por_hilo] [latencia_ms]
+"""
+
+import contextlib
+import io
+import random
+import sys
+import threading
+import time
+
+from simulated_device import SALIDAS_POR_DEFECTO, crear_router_simulado
+
+COMANDOS = ["show ip arp", "show ip interface brief", "show clock"]
+
+
+def main():
+    hilos = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    peticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    latencia = (float(sys.argv[3]) if len(sys.argv) > 3 else 5) / 1000
+
+    router = crear_router_simulado(latencia)
+    errores = []
+
+    def cliente(semilla):
+        aleatorio = random.Random(semilla)
+        for _ in range(peticiones):
+            operacion = aleatorio.random()
+            if operacion < 0.8:
+                comando = aleatorio.choice(COMANDOS)
+                salida = router.obtener_informacion(comando, forzar=True)
+                if salida != SALIDAS_POR_DEFECTO[comando]:
+                    errores.append(comando)
+            elif operacion < 0.95:
+                router.verificar_conexion(forzar=True)
+            else:
+                router.configurar(["interface FastEthernet0/0", "description prueba"])
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        trabajadores = [threading.Thread(target=cliente, args=(i,)) for i in range(hilos)]
+        for trabajador in trabajadores:
+            trabajador.start()
+        for trabajador in trabajadores:
+            trabajador.join()
+        duracion = time.perf_counter() - inicio
+
+    total = hilos * peticiones
+    enviados = router.conexion.comandos_enviados
+    print(f"Hilos: {hilos}, peticiones: {total}, latencia simulada: {latencia * 1000:.0f} ms")
+    print(f"Llamadas al router:   {enviados} ({router.cola.agrupadas} peticiones agrupadas)")
+    print(f"Colisiones en canal:  {router.conexion.colisiones}")
+    print(f"Salidas incorrectas:  {len(errores)}")
+    print(f"Duración:             {duracion:.2f}s")
+    print(f"Uso del canal:        {enviados * latencia / duracion:.0%} "
+          f"({enviados / duracion:.0f} comandos/s, máximo {1 / latencia:.0f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark: escritura masiva en la consola desde varios hilos.
+Compara el método anterior (un root.after(0) con insert y see por línea)
+con ConsoleSink (cola y un único drenado periódico con presupuesto). Como
+no hace falta pantalla, se simula el event loop de Tk y un Text cuyo
+insert y see tienen un coste fijo por llamada; se mide cuántos callbacks
+recibe el event loop y cuánto se retrasa un evento de usuario (un clic
+programado cada 10 ms) mientras llega la salida.
+
+Uso: python benchmarks/bench_console.py [líneas] [hilos]
+"""
+
+import contextlib
+import heapq
+import io
+import itertools
+import statistics
+import sys
+import threading
+import time
+
+import simulated_device  # noqa: F401 (añade la raíz del repositorio a sys.path)
+
+try:
+    from gui_components import ConsoleSink
+except ImportError as e:  # tkinter no instalado
+    print(f"No se puede importar gui_components: {e}")
+    sys.exit(1)
+
+COSTE_INSERT = 40e-6  # segundos por llamada a Text.insert
+COSTE_POR_CARACTER = 0.02e-6
+COSTE_SEE = 150e-6  # see() recalcula el layout visible
+
+
+def ocupar(segundos):
+    fin = time.perf_counter() + segundos
+    while time.perf_counter() < fin:
+        pass
+
+
+class EventLoop:
+    """Event loop mínimo con after()/after_cancel() seguro entre hilos, como el de Tk"""
+
+    def __init__(self):
+        self._eventos = []
+        self._lock = threading.Lock()
+        self._contador = itertools.count()
+        self.callbacks = 0
+
+    def after(self, ms, funcion):
+        with self._lock:
+            identificador = next(self._contador)
+            heapq.heappush(self._eventos, (time.perf_counter() + ms / 1000, identificador, funcion))
+        return identificador
+
+    def after_cancel(self, identificador):
+        with self._lock:
+            self._eventos = [e for e in self._eventos if e[1] != identificador]
+            heapq.heapify(self._eventos)
+
+    def ejecutar_hasta(self, condicion):
+        while not condicion():
+            with self._lock:
+                listo = self._eventos and self._eventos[0][0] <= time.perf_counter()
+                evento = heapq.heappop(self._eventos) if listo else None
+            if evento is None:
+                time.sleep(0.0005)
+                continue
+            self.callbacks += 1
+            evento[2]()
+
+
+class TextSimulado:
+    """Text con coste de inserción y see; after se delega en el event loop"""
+
+    def __init__(self, bucle):
+        self.bucle = bucle
+        self.lineas = 0
+        self.inserts = 0
+
+    def insert(self, indice, *argumentos):
+        textos = argumentos[::2]
+        ocupar(COSTE_INSERT + COSTE_POR_CARACTER * sum(map(len, textos)))
+        self.inserts += 1
+        self.lineas += sum(texto.count("\n") for texto in textos)
+
+    def see(self, indice):
+        ocupar(COSTE_SEE)
+
+    def after(self, ms, funcion):
+        return self.bucle.after(ms, funcion)
+
+    def after_cancel(self, identificador):
+        self.bucle.after_cancel(identificador)
+
+
+def medir(modo, lineas, hilos):
+    bucle = EventLoop()
+    texto = TextSimulado(bucle)
+    retrasos = []
+    terminado = threading.Event()
+
+    if modo == "sink":
+        sink = ConsoleSink(texto)
+        sink.start()
+        escribir = sink.write
+    else:
+        def escribir(linea, tag=""):
+            def add():
+                texto.insert("end", linea, tag)
+                texto.see("end")
+            bucle.after(0, add)
+
+    def clic(programado):
+        retrasos.append(time.perf_counter() - programado)
+        if not terminado.is_set():
+            siguiente = time.perf_counter() + 0.01
+            bucle.after(10, lambda: clic(siguiente))
+
+    def productor(indice):
+        for i in range(lineas // hilos):
+            escribir(f"R{indice} Internet 10.0.{i // 256 % 256}.{i % 256} 3 c201.0b5c.0000 ARPA Fa0/0\n",
+                     "info")
+
+    clic(time.perf_counter())
+    inicio = time.perf_counter()
+    trabajadores = [threading.Thread(target=productor, args=(h,)) for h in range(hilos)]
+    for trabajador in trabajadores:
+        trabajador.start()
+    total = (lineas // hilos) * hilos
+    bucle.ejecutar_hasta(lambda: texto.lineas >= total)
+    duracion = time.perf_counter() - inicio
+    terminado.set()
+    for trabajador in trabajadores:
+        trabajador.join()
+    if modo == "sink":
+        sink.stop()
+    return duracion, bucle.callbacks, texto.inserts, retrasos
+
+
+def main():
+    lineas = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    hilos = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    print(f"{lineas} líneas desde {hilos} hilos")
+    print(f"{'modo':<14} {'total':>8} {'callbacks':>10} {'inserts':>8} {'clic med':>9} {'clic máx':>9}")
+    for modo, nombre in (("after", "after por línea"), ("sink", "ConsoleSink")):
+        with contextlib.redirect_stdout(io.StringIO()):
+            duracion, callbacks, inserts, retrasos = medir(modo, lineas, hilos)
+        print(f"{nombre:<14} {duracion:>7.2f}s {callbacks:>10} {inserts:>8} "
+              f"{statistics.median(retrasos) * 1000:>7.1f}ms {max(retrasos) * 1000:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
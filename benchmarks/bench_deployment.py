@@ -0,0 +1,109 @@
+"""
+Benchmark: despliegue de configuración en varios routers simulados,
+secuencial frente a concurrente, con un router que rechaza el cambio para
+comprobar el rollback y la parada por canario, y el modo solo_delta con la
+mitad de la flota ya conforme.
+
+Uso: python benchmarks/bench_deployment.py [routers] [latencia_ms]
+"""
+
+import contextlib
+import io
+import sys
+import time
+
+from simulated_device import crear_router_simulado
+from deployment import ConfigDeployer
+from ios_config import calcular_delta, generar_rollback
+import topology_config as config
+
+RUNNING_CONFIG = """Building configuration...
+
+hostname {nombre}
+!
+interface FastEthernet0/0
+ ip address 192.168.1.1 255.255.255.0
+ duplex auto
+!
+access-list 1 permit 10.0.0.0 0.0.0.255
+!
+end"""
+
+
+def crear_flota(cantidad, latencia, rechaza=None, extra_pares=""):
+    routers = {}
+    for i in range(1, cantidad + 1):
+        nombre = f"R{i}"
+        running = RUNNING_CONFIG.format(nombre=nombre)
+        if i % 2 == 0:
+            running = running.replace("end", extra_pares + "end")
+        router = crear_router_simulado(latencia, nombre, {"show running-config": running})
+        if nombre == rechaza:
+            aplicar = router.conexion.send_config_set
+            # Rechaza las líneas 'deny' de la plantilla, pero acepta el rollback
+            router.conexion.send_config_set = (
+                lambda comandos, aplicar=aplicar, **kwargs:
+                aplicar(comandos) + ("\n% Invalid input detected at '^' marker."
+                                     if any("deny" in c for c in comandos) else ""))
+        routers[nombre] = router
+    return routers
+
+
+def desplegar(routers, comandos, **opciones):
+    deployer = ConfigDeployer(routers, **opciones)
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        resultados = deployer.desplegar(comandos)
+    return resultados, time.perf_counter() - inicio
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latencia = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+    comandos = config.CONFIG_TEMPLATES["ACL"]
+
+    print(f"{cantidad} routers, latencia {latencia * 1000:.0f} ms, plantilla ACL ({len(comandos)} comandos)")
+
+    _, t_secuencial = desplegar(crear_flota(cantidad, latencia), comandos, max_workers=1)
+    _, t_concurrente = desplegar(crear_flota(cantidad, latencia), comandos,
+                                 max_workers=config.MAX_CONEXIONES_SIMULTANEAS)
+    print(f"Secuencial:  {t_secuencial:6.2f}s")
+    print(f"Concurrente: {t_concurrente:6.2f}s (x{t_secuencial / t_concurrente:.1f})")
+
+    fallo = f"R{cantidad}"
+    resultados, _ = desplegar(crear_flota(cantidad, latencia, rechaza=fallo), comandos,
+                              max_workers=config.MAX_CONEXIONES_SIMULTANEAS)
+    print(f"\nRouter que rechaza el cambio: {resultados[fallo]}")
+    print("Comandos de rollback:")
+    for comando in resultados[fallo].rollback:
+        print(f"  {comando}")
+
+    resultados, _ = desplegar(crear_flota(cantidad, latencia, rechaza="R1"), comandos,
+                              max_workers=config.MAX_CONEXIONES_SIMULTANEAS, canarios=1)
+    omitidos = sum(1 for r in resultados.values() if r.estado == r.OMITIDO)
+    print(f"\nCanario R1 rechaza el cambio: {resultados['R1'].estado}, {omitidos} routers sin tocar")
+
+    # CDP está activo por defecto y no aparece en la running-config
+    rollback = generar_rollback(["no cdp run"], RUNNING_CONFIG.format(nombre="R1"))
+    assert rollback == ["cdp run"], rollback
+    print(f"Rollback de 'no cdp run' con CDP activo por defecto: {rollback}")
+    # IOS no deja borrar un policy-map aplicado a una interfaz ni un class-map en uso
+    rollback = generar_rollback(config.CONFIG_TEMPLATES["QoS"], RUNNING_CONFIG.format(nombre="R1"))
+    assert rollback == ["interface FastEthernet0/0", "no service-policy output QOS_POLICY", "exit",
+                        "no policy-map QOS_POLICY", "no class-map match-all VOICE"], rollback
+    print(f"Rollback de la plantilla QoS: {rollback}")
+    delta = calcular_delta(["no cdp run", "no ip domain-lookup"], RUNNING_CONFIG.format(nombre="R1"))
+    assert delta == ["no cdp run", "no ip domain-lookup"], delta
+    print(f"Solo diferencias de 'no cdp run' y 'no ip domain-lookup' en una configuración de fábrica: {delta}")
+
+    flota = crear_flota(cantidad, latencia, extra_pares="\n".join(comandos) + "\n")
+    resultados, t_delta = desplegar(flota, comandos, solo_delta=True,
+                                    max_workers=config.MAX_CONEXIONES_SIMULTANEAS)
+    conformes = sum(1 for r in resultados.values() if r.estado == r.CONFORME)
+    enviados = sum(len(r.delta or []) for r in resultados.values())
+    print(f"\nSolo diferencias: {conformes}/{cantidad} routers conformes sin cambios, "
+          f"{enviados} de {cantidad * len(comandos)} comandos enviados ({t_delta:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
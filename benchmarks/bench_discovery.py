@@ -0,0 +1,99 @@
+"""
+Benchmark: descubrimiento CDP/LLDP de una red simulada partiendo de un
+único router conocido, secuencial frente a concurrente. Cada dispositivo
+nuevo tarda en conectarse (varias idas y vueltas de SSH) y responde a
+'show cdp neighbors detail' con sus vecinos reales.
+
+Uso: python benchmarks/bench_discovery.py [dispositivos] [latencia_ms]
+"""
+
+import contextlib
+import io
+import random
+import sys
+import time
+
+from simulated_device import crear_router_simulado
+from topology_discovery import COMANDO_CDP, TopologyDiscovery
+import topology_config as config
+
+IDAS_Y_VUELTAS_CONEXION = 3
+
+ENTRADA_CDP = """-------------------------
+Device ID: {nombre}.lab.local
+Entry address(es):
+  IP address: {ip}
+Platform: Cisco 7206VXR,  Capabilities: Router
+Interface: {local},  Port ID (outgoing port): {remota}
+Holdtime : 155 sec
+
+Version :
+Cisco IOS Software, 7200 Software (C7200-ADVENTERPRISEK9-M), Version 15.2(4)M7, RELEASE SOFTWARE (fc2)
+
+advertisement version: 2
+Duplex: full
+"""
+
+
+def generar_red(cantidad, aleatorio):
+    """Red jerárquica con enlaces redundantes; devuelve el conjunto de enlaces"""
+    enlaces = set()
+    for i in range(1, cantidad):
+        enlaces.add((i, (i - 1) // 3))
+        if aleatorio.random() < 0.3:
+            enlaces.add((i, aleatorio.randrange(max(0, i - 10), i)))
+    return {tuple(sorted(enlace)) for enlace in enlaces if enlace[0] != enlace[1]}
+
+
+def salidas_cdp(cantidad, enlaces):
+    """Salida de 'show cdp neighbors detail' de cada dispositivo"""
+    vecinos = {i: [] for i in range(cantidad)}
+    for a, b in enlaces:
+        vecinos[a].append(b)
+        vecinos[b].append(a)
+    salidas = {}
+    for i, lista in vecinos.items():
+        salidas[f"R{i}"] = "".join(
+            ENTRADA_CDP.format(nombre=f"R{v}", ip=ip(v), local=f"Gi0/{n}", remota=f"Gi0/{lista.index(v)}")
+            for n, v in enumerate(lista))
+    return salidas
+
+
+def ip(i):
+    return f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}"
+
+
+def descubrir(salidas, latencia, concurrencia):
+    def conectar_nuevo(nombre, direccion):
+        time.sleep(latencia * IDAS_Y_VUELTAS_CONEXION)
+        router = crear_router_simulado(latencia, nombre, {COMANDO_CDP: salidas[nombre]})
+        router.ip = direccion
+        return router
+
+    semilla = crear_router_simulado(latencia, "R0", {COMANDO_CDP: salidas["R0"]})
+    semilla.ip = ip(0)
+    discovery = TopologyDiscovery({"R0": semilla}, conectar_nuevo=conectar_nuevo,
+                                  max_concurrencia=concurrencia)
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        topologia = discovery.descubrir()
+    return topologia, time.perf_counter() - inicio
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    latencia = (float(sys.argv[2]) if len(sys.argv) > 2 else 20) / 1000
+    enlaces = generar_red(cantidad, random.Random(3))
+    salidas = salidas_cdp(cantidad, enlaces)
+    print(f"{cantidad} dispositivos, {len(enlaces)} enlaces, latencia {latencia * 1000:.0f} ms")
+
+    for concurrencia in (1, 5, config.DESCUBRIMIENTO_CONCURRENCIA, 50):
+        topologia, duracion = descubrir(salidas, latencia, concurrencia)
+        descubiertos = {tuple(sorted((int(a[1:]), int(b[1:])))) for a, b in topologia.connections}
+        assert len(topologia) == cantidad and descubiertos == enlaces
+        print(f"Concurrencia {concurrencia:>3}: {duracion:6.2f}s "
+              f"({len(topologia)} dispositivos, {len(topologia.connections)} enlaces sin duplicados)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: exportación de la consola.
+Compara el método anterior (todo el texto en una cadena, como
+results_text.get, escrito de una vez en el hilo de Tk) con log_export
+leyendo los segmentos por bloques en un hilo aparte, en texto, JSON Lines
+y gzip. Mientras se exporta, un hilo que simula el event loop de Tk
+programa un tic cada 10 ms y se mide su mayor retraso; también se mide el
+pico de memoria de Python.
+
+Uso: python benchmarks/bench_export.py [líneas]   (por defecto 500000)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import simulated_device  # noqa: F401 (añade la raíz del repositorio a sys.path)
+from log_export import exportar
+from segment_log import SegmentLog
+
+LINEAS_POR_CONSULTA = 50
+
+
+def llenar(log, cantidad):
+    for base in range(0, cantidad, LINEAS_POR_CONSULTA):
+        router = f"R{base // LINEAS_POR_CONSULTA % 20}"
+        salida = "".join(f"Internet 10.0.{i // 256 % 256}.{i % 256} 3 c201.0b5c.0000 ARPA Fa0/0\n"
+                         for i in range(base, base + LINEAS_POR_CONSULTA))
+        log.escribir([(f"\n[12:00:00] Tabla ARP - {router}\n", "timestamp"),
+                      (salida, "success", (router, "show ip arp"))])
+
+
+def medir(funcion):
+    """
+    Ejecuta la función mientras un tic de 10 ms mide el retraso máximo del
+    'event loop', y otra vez con tracemalloc para el pico de memoria (que
+    ralentiza la ejecución y no se usa para el tiempo)
+    """
+    retrasos = []
+    fin = threading.Event()
+
+    def event_loop():
+        while not fin.is_set():
+            programado = time.perf_counter() + 0.01
+            time.sleep(0.01)
+            retrasos.append(time.perf_counter() - programado)
+
+    tic = threading.Thread(target=event_loop)
+    tic.start()
+    inicio = time.perf_counter()
+    funcion()
+    duracion = time.perf_counter() - inicio
+    fin.set()
+    tic.join()
+
+    tracemalloc.start()
+    funcion()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return duracion, pico, max(retrasos, default=0.0)
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    log = SegmentLog()
+    llenar(log, cantidad)
+    print(f"{log.num_lineas} líneas, {log.tamano / 1e6:.0f} MB")
+    print(f"{'método':<28} {'tiempo':>8} {'tamaño':>9} {'pico mem':>9} {'retraso UI':>11}")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        def anterior():
+            # results_text.get(1.0, END) y una sola escritura en el hilo de Tk
+            contenido = b"".join(log.bloques()).decode("utf-8")
+            with open(os.path.join(directorio, "anterior.txt"), "w", encoding="utf-8") as archivo:
+                archivo.write(contenido)
+
+        duracion, pico, _ = medir(anterior)
+        # En el hilo de Tk, todo el tiempo de exportación es retraso de la interfaz
+        print(f"{'anterior (hilo de Tk)':<28} {duracion:>7.2f}s "
+              f"{os.path.getsize(os.path.join(directorio, 'anterior.txt')) / 1e6:>7.1f}MB "
+              f"{pico / 1e6:>7.1f}MB {duracion * 1000:>9.0f}ms")
+
+        for extension in (".txt", ".txt.gz", ".jsonl", ".jsonl.gz"):
+            ruta = os.path.join(directorio, "consola" + extension)
+
+            def nuevo():
+                hilo = threading.Thread(target=exportar, args=(
+                    ruta,
+                    lambda: ((len(bloque), bloque) for bloque in log.bloques()),
+                    lambda: ((len(entrada[4]), entrada) for entrada in log.entradas()),
+                    log.tamano))
+                hilo.start()
+                hilo.join()
+
+            duracion, pico, retraso = medir(nuevo)
+            print(f"{'log_export ' + extension:<28} {duracion:>7.2f}s {os.path.getsize(ruta) / 1e6:>7.1f}MB "
+                  f"{pico / 1e6:>7.1f}MB {retraso * 1000:>9.1f}ms")
+    log.cerrar()
+
+
+if __name__ == "__main__":
+    main()
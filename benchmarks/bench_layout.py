@@ -0,0 +1,91 @@
+"""
+Benchmark: distribución automática de topologías sin coordenadas.
+Mide el cálculo completo, la reapertura de la misma topología (caché por
+hash) y el re-layout incremental al añadir un 1% de routers nuevos, junto
+con la longitud mediana de los enlaces y la distancia mediana al router
+más cercano (ambas deberían rondar el espaciado ideal).
+
+Uso: python benchmarks/bench_layout.py [tamaños...]   (por defecto 200 2000 10000)
+"""
+
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import simulated_device  # noqa: F401 (añade la raíz del repositorio a sys.path)
+from topology_layout import ESPACIADO, ForceLayout
+from topology_model import Topology
+
+
+def generar_enlaces(cantidad, aleatorio):
+    """Red jerárquica (cada router cuelga de uno del nivel superior) con enlaces redundantes"""
+    enlaces = []
+    for i in range(1, cantidad):
+        enlaces.append((f"N{i}", f"N{(i - 1) // 4}"))
+        if i > 1 and aleatorio.random() < 0.3:
+            enlaces.append((f"N{i}", f"N{i - 1}"))
+    return enlaces
+
+
+def construir(cantidad, enlaces):
+    """Topología sin coordenadas"""
+    topologia = Topology()
+    for i in range(cantidad):
+        topologia.add_router(f"N{i}")
+    for r1, r2 in enlaces:
+        topologia.add_link(r1, r2)
+    return topologia
+
+
+def calidad(topologia, aleatorio):
+    """Longitud mediana de los enlaces y distancia mediana al vecino más cercano (muestra)"""
+    posiciones = topologia.positions
+    enlaces = [np.hypot(posiciones[a][0] - posiciones[b][0], posiciones[a][1] - posiciones[b][1])
+               for a, b in topologia.connections]
+    puntos = np.array(list(posiciones.values()))
+    muestra = aleatorio.sample(range(len(puntos)), min(300, len(puntos)))
+    cercanos = [np.partition(np.hypot(*(puntos - puntos[i]).T), 1)[1] for i in muestra]
+    return np.median(enlaces), np.median(cercanos)
+
+
+def main():
+    tamanos = [int(t) for t in sys.argv[1:]] or [200, 2000, 10000]
+    aleatorio = random.Random(7)
+
+    print(f"espaciado ideal: {ESPACIADO}")
+    print(f"{'routers':>8} {'enlaces':>8} {'completo':>9} {'caché':>9} {'incremental':>12} "
+          f"{'enlace med':>11} {'vecino med':>11}")
+    with tempfile.TemporaryDirectory() as directorio:
+        for cantidad in tamanos:
+            enlaces = generar_enlaces(cantidad, aleatorio)
+            topologia = construir(cantidad, enlaces)
+            inicio = time.perf_counter()
+            ForceLayout(directorio_cache=directorio).aplicar(topologia)
+            t_completo = time.perf_counter() - inicio
+            enlace, vecino = calidad(topologia, aleatorio)
+
+            # Reabrir la misma topología sin posiciones: se lee de la caché
+            reabierta = construir(cantidad, enlaces)
+            inicio = time.perf_counter()
+            ForceLayout(directorio_cache=directorio).aplicar(reabierta)
+            t_cache = time.perf_counter() - inicio
+            assert reabierta.positions == topologia.positions
+
+            # Añadir un 1% de routers nuevos enlazados a routers existentes
+            for i in range(cantidad, cantidad + max(1, cantidad // 100)):
+                topologia.add_router(f"N{i}")
+                topologia.add_link(f"N{i}", f"N{aleatorio.randrange(cantidad)}")
+            inicio = time.perf_counter()
+            nuevos = ForceLayout(directorio_cache=directorio).aplicar(topologia)
+            t_incremental = time.perf_counter() - inicio
+
+            print(f"{cantidad:>8} {len(topologia.connections):>8} {t_completo:>8.2f}s "
+                  f"{t_cache * 1000:>7.0f}ms {t_incremental:>6.2f}s ({nuevos:>3}) "
+                  f"{enlace:>11.0f} {vecino:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark: latencia por consulta con y sin sondeo "show clock" previo.
+
+Compara el comportamiento anterior (sondear antes de cada comando,
+umbral_inactividad=0) con el seguimiento de actividad por transporte.
+
+Uso: python benchmarks/bench_liveness.py [consultas] [latencia_ms]
+"""
+
+import contextlib
+import io
+import sys
+import time
+
+from simulated_device import crear_router_simulado
+
+
+def medir(router, consultas):
+    """Devuelve la latencia media por consulta en milisegundos"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        for _ in range(consultas):
+            router.obtener_informacion("show ip arp", forzar=True)
+        fin = time.perf_counter()
+    return (fin - inicio) / consultas * 1000
+
+
+def main():
+    consultas = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latencia = (float(sys.argv[2]) if len(sys.argv) > 2 else 20) / 1000
+    
+    router = crear_router_simulado(latencia)
+    
+    router.umbral_inactividad = 0  # sondeo antes de cada comando
+    antes = medir(router, consultas)
+    envios_antes = router.conexion.comandos_enviados
+    
+    router.conexion.comandos_enviados = 0
+    router.umbral_inactividad = 60
+    despues = medir(router, consultas)
+    envios_despues = router.conexion.comandos_enviados
+    
+    print(f"Consultas: {consultas}, latencia simulada: {latencia * 1000:.0f} ms")
+    print(f"Con sondeo previo:   {antes:8.2f} ms/consulta ({envios_antes} envíos)")
+    print(f"Sin sondeo previo:   {despues:8.2f} ms/consulta ({envios_despues} envíos)")
+    print(f"Mejora: x{antes / despues:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: filtrado de logs con LogIndex frente a recorrer todos los logs
+(como hacía LogPanel.filter_logs en cada tecla). Simula a un usuario que
+escribe un término letra a letra (cada búsqueda reutiliza la anterior) y
+algunas búsquedas con facetas de router y tipo, y comprueba que los
+resultados coinciden con los del recorrido completo.
+
+Uso: python benchmarks/bench_log_search.py [logs]   (por defecto 1000000)
+"""
+
+import random
+import sys
+import time
+
+import simulated_device  # noqa: F401 (añade la raíz del repositorio a sys.path)
+from log_index import LogIndex
+
+MENSAJES = [
+    "Consulta show ip arp completada",
+    "Conexión establecida",
+    "Error de autenticación",
+    "Keepalive falló, reconectando",
+    "Configuración aplicada: access-list 100 permit ip any any",
+    "Respaldo guardado hash {hash}",
+    "Interfaz FastEthernet0/{puerto} cambió a down",
+    "Vecino OSPF 10.0.{a}.{b} FULL",
+]
+TIPOS = ["info", "success", "warning", "error"]
+
+
+def generar_log(aleatorio):
+    mensaje = aleatorio.choice(MENSAJES).format(hash=f"{aleatorio.getrandbits(32):08x}",
+                                                puerto=aleatorio.randrange(4),
+                                                a=aleatorio.randrange(256), b=aleatorio.randrange(256))
+    return {"message": mensaje, "router": f"R{aleatorio.randrange(1, 60)}", "type": aleatorio.choice(TIPOS)}
+
+
+def buscar_lineal(logs, termino, router=None, tipo=None):
+    termino = termino.lower()
+    return [log for log in logs
+            if (router is None or log["router"] == router) and (tipo is None or log["type"] == tipo)
+            and (termino in log["message"].lower() or termino in log["router"].lower())]
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    aleatorio = random.Random(1)
+    logs = [generar_log(aleatorio) for _ in range(cantidad)]
+
+    indice = LogIndex(cantidad)
+    inicio = time.perf_counter()
+    for log in logs:
+        indice.agregar(log)
+    t_indexar = time.perf_counter() - inicio
+    print(f"{cantidad} logs indexados en {t_indexar:.1f}s ({t_indexar / cantidad * 1e6:.1f}µs/log), "
+          f"{len(indice._palabras)} palabras distintas")
+
+    busquedas = [(termino, None, None) for termino in
+                 ("k", "ke", "kee", "keep", "keepa", "keepalive f", "keepalive falló")]
+    busquedas += [("10.0.3", None, None), ("hash 0a", None, None), ("", "R7", None),
+                  ("arp", "R7", "info"), ("", None, "error")]
+
+    print(f"{'término':<18} {'router':>6} {'tipo':>7} {'resultados':>10} {'índice':>9} {'lineal':>9}")
+    for termino, router, tipo in busquedas:
+        inicio = time.perf_counter()
+        ids = indice.buscar(termino, router, tipo)
+        t_indice = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        esperados = buscar_lineal(logs, termino, router, tipo)
+        t_lineal = time.perf_counter() - inicio
+        assert [indice.entrada(i) for i in ids] == esperados, termino
+
+        print(f"{termino!r:<18} {router or '-':>6} {tipo or '-':>7} {len(ids):>10} "
+              f"{t_indice * 1000:>7.1f}ms {t_lineal * 1000:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: coste de LogPanel.add_log en una sesión larga.
+Compara el buffer circular (solo se borran del Text las líneas del log que
+sale) con el método anterior (lista recortada y refresh_display de los
+1000 logs en cada log nuevo). El Text se sustituye por uno simulado que
+cuenta las líneas insertadas y borradas, con coste fijo por llamada y por
+línea, de modo que no hace falta pantalla.
+
+Uso: python benchmarks/bench_logpanel.py [logs] [capacidad]
+"""
+
+import sys
+import time
+from collections import deque
+
+import simulated_device  # noqa: F401 (añade la raíz del repositorio a sys.path)
+
+try:
+    from gui_components import LogPanel
+    from log_index import LogIndex
+except ImportError as e:  # tkinter no instalado
+    print(f"No se puede importar gui_components: {e}")
+    sys.exit(1)
+
+COSTE_LLAMADA = 20e-6
+COSTE_LINEA = 2e-6
+
+
+def ocupar(segundos):
+    fin = time.perf_counter() + segundos
+    while time.perf_counter() < fin:
+        pass
+
+
+class TextSimulado:
+    """Text que solo cuenta líneas; insert y delete cuestan por llamada y por línea"""
+
+    def __init__(self):
+        self.lineas = 0
+        self.lineas_tocadas = 0
+
+    def insert(self, indice, *argumentos):
+        nuevas = sum(texto.count("\n") for texto in argumentos[::2])
+        ocupar(COSTE_LLAMADA + COSTE_LINEA * nuevas)
+        self.lineas += nuevas
+        self.lineas_tocadas += nuevas
+
+    def delete(self, inicio, fin="end"):
+        hasta = self.lineas if fin in ("end", "end-1c") else int(float(fin)) - 1
+        borradas = hasta - int(float(inicio)) + 1
+        ocupar(COSTE_LLAMADA + COSTE_LINEA * borradas)
+        self.lineas -= borradas
+        self.lineas_tocadas += borradas
+
+    def see(self, indice):
+        pass
+
+
+class PanelAnterior(LogPanel):
+    """add_log tal como era antes: lista, recorte y refresh_display completo"""
+
+    def add_log(self, message, log_type="info", router=""):
+        entrada = {"timestamp": "12:00:00", "router": router, "message": message,
+                   "type": log_type, "full": f"[12:00:00] {message}\n", "lines": 1}
+        self.all_logs.append(entrada)
+        self.text_area.insert("end", *self._segments(entrada))
+        if len(self.all_logs) > self.capacity:
+            self.all_logs = self.all_logs[-self.capacity:]
+            self.refresh_display()
+
+    def refresh_display(self):
+        self.text_area.delete("1.0", "end")
+        for entrada in self.all_logs:
+            self.text_area.insert("end", *self._segments(entrada))
+
+
+def crear_panel(clase, capacidad, texto):
+    """Panel sin widgets de Tk (solo el estado que usa add_log)"""
+    panel = clase.__new__(clase)
+    panel.text_area = texto
+    panel.capacity = capacidad
+    panel.all_logs = [] if clase is PanelAnterior else deque(maxlen=capacidad)
+    panel.index = LogIndex(capacidad)
+    panel.active_filter = ("", None, None)
+    panel._displayed = deque()
+    panel.store = None
+    return panel
+
+
+def medir(clase, logs, capacidad):
+    texto = TextSimulado()
+    panel = crear_panel(clase, capacidad, texto)
+    inicio = time.perf_counter()
+    for i in range(logs):
+        panel.add_log(f"Consulta show ip arp completada en R{i % 5 + 1}", "success", f"R{i % 5 + 1}")
+    duracion = time.perf_counter() - inicio
+    assert texto.lineas == capacidad and len(panel.all_logs) == capacidad
+    return duracion, texto.lineas_tocadas
+
+
+def main():
+    logs = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    capacidad = int(sys.argv[2]) if len(sys.argv) > 2 else LogPanel.DEFAULT_CAPACITY
+    print(f"{logs} logs, capacidad {capacidad}")
+    for nombre, clase in (("lista + refresh", PanelAnterior), ("buffer circular", LogPanel)):
+        duracion, tocadas = medir(clase, logs, capacidad)
+        print(f"{nombre:<16} {duracion:7.2f}s  {duracion / logs * 1e6:8.0f}µs/log  "
+              f"{tocadas / logs:8.1f} líneas del Text por log")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark: historial SQLite de resultados.
+Simula varios días de consultas periódicas de una red (cada router
+responde a los comandos de QUERY_COMMANDS cada pocos minutos, con salidas
+que cambian de vez en cuando) y mide:
+- cuánto tarda quien registra un resultado (el hilo de la consulta) y
+  cuánto el hilo escritor en guardarlos, frente a un INSERT con commit por
+  resultado;
+- el tamaño de la base de datos frente al de las salidas sin deduplicar;
+- consultas del tipo "ARP de R2 hace una hora", por comando en un rango de
+  tiempo y de logs por router, comprobando el resultado.
+
+Uso: python benchmarks/bench_results_store.py [routers] [días]
+"""
+
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+import simulated_device  # noqa: F401 (añade la raíz del repositorio a sys.path)
+from results_store import ResultStore
+import topology_config as config
+
+INTERVALO = 300  # segundos entre sondeos de cada router
+PROB_CAMBIO = 0.1  # probabilidad de que una salida cambie entre sondeos
+
+
+def generar_salida(router, comando, version):
+    filas = "".join(f"Internet 10.{version % 256}.{i}.1 {i % 60} c201.0b5c.{i:04x} ARPA Fa0/{i % 4}\n"
+                    for i in range(40))
+    return f"{router}# {comando} (versión {version})\n{filas}"
+
+
+def generar_sondeos(routers, dias, aleatorio):
+    """(instante, router, comando, salida) en orden de tiempo"""
+    inicio = time.time() - dias * 86400
+    versiones = {}
+    for paso in range(int(dias * 86400 / INTERVALO)):
+        for r in range(routers):
+            router = f"R{r + 1}"
+            for comando in config.QUERY_COMMANDS.values():
+                clave = (router, comando)
+                if clave not in versiones or aleatorio.random() < PROB_CAMBIO:
+                    versiones[clave] = versiones.get(clave, 0) + 1
+                yield (inicio + paso * INTERVALO + r, router, comando,
+                       generar_salida(router, comando, versiones[clave]))
+
+
+def medir_consulta(funcion, repeticiones=200):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return resultado, statistics.median(tiempos) * 1000
+
+
+def main():
+    routers = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    dias = float(sys.argv[2]) if len(sys.argv) > 2 else 3
+    sondeos = list(generar_sondeos(routers, dias, random.Random(5)))
+    bruto = sum(len(s[3].encode("utf-8")) for s in sondeos)
+    print(f"{len(sondeos)} resultados de {routers} routers en {dias:g} días ({bruto / 1e6:.0f} MB de salidas)")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "historial.db")
+        store = ResultStore(ruta)
+        inicio = time.perf_counter()
+        for instante, router, comando, salida in sondeos:
+            store.guardar_resultado(router, comando, salida, instante)
+        t_encolar = time.perf_counter() - inicio
+        store.vaciar()
+        t_total = time.perf_counter() - inicio
+        for i in range(20000):
+            store.guardar_log(f"Consulta completada {i}", "success", f"R{i % routers + 1}",
+                              instante=sondeos[0][0] + i * 10)
+        store.vaciar()
+        tamano = sum(os.path.getsize(os.path.join(directorio, f)) for f in os.listdir(directorio))
+        print(f"ResultStore: registrar {t_encolar / len(sondeos) * 1e6:.1f}µs/resultado en el hilo de la "
+              f"consulta, todo guardado en {t_total:.1f}s ({store.lotes} transacciones)")
+        print(f"Base de datos: {tamano / 1e6:.1f} MB ({bruto / tamano:.0f}x menos que las salidas)")
+
+        # Referencia: un INSERT con commit por resultado, sin deduplicar (solo una muestra)
+        muestra = sondeos[:2000]
+        conexion = sqlite3.connect(os.path.join(directorio, "referencia.db"))
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute("CREATE TABLE resultados (instante REAL, router TEXT, comando TEXT, salida TEXT)")
+        inicio = time.perf_counter()
+        for fila in muestra:
+            with conexion:
+                conexion.execute("INSERT INTO resultados VALUES (?, ?, ?, ?)", fila)
+        t_referencia = time.perf_counter() - inicio
+        conexion.close()
+        print(f"Referencia (commit por resultado): {t_referencia / len(muestra) * 1e6:.0f}µs/resultado "
+              f"en el hilo de la consulta")
+
+        # "ARP en R2 hace una hora"
+        objetivo = time.time() - 3600
+        esperado = max((s for s in sondeos if s[1] == "R2" and s[2] == "show ip arp" and s[0] <= objetivo),
+                       key=lambda s: s[0])
+        registro, ms = medir_consulta(lambda: store.hace("R2", "show ip arp", 3600))
+        assert (registro.instante, registro.salida) == (esperado[0], esperado[3])
+        print(f"ARP de R2 hace una hora: {ms:.3f}ms")
+
+        comando, desde, hasta = "show ip interface brief", time.time() - 7200, time.time() - 3600
+        registros, ms = medir_consulta(
+            lambda: store.consultar(comando=comando, desde=desde, hasta=hasta, limite=10000), 20)
+        assert len(registros) == sum(1 for s in sondeos if s[2] == comando and desde <= s[0] <= hasta)
+        print(f"'{comando}' de todos los routers en una hora ({len(registros)} resultados): {ms:.2f}ms")
+
+        logs, ms = medir_consulta(lambda: store.consultar_logs(router="R3", limite=100))
+        assert len(logs) == 100 and all(log.router == "R3" for log in logs)
+        print(f"Últimos 100 logs de R3: {ms:.3f}ms")
+        store.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: consola respaldada por SegmentLog en una sesión con mucha salida.
+Escribe millones de líneas de 'show ip arp' en bloques como los de
+ConsoleSink y mide la memoria que queda en el proceso (frente al texto
+completo que guardaba el Text), el coste de leer la ventana que ve
+VirtualConsole en posiciones aleatorias, la búsqueda de un texto que solo
+aparece al final y la exportación copiando los segmentos.
+
+Uso: python benchmarks/bench_segment_log.py [líneas]   (por defecto 2000000)
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import simulated_device  # noqa: F401 (añade la raíz del repositorio a sys.path)
+from segment_log import SegmentLog
+
+LINEAS_POR_ESCRITURA = 200  # como un bloque de ConsoleSink
+VENTANA = 40 + 2 * 200  # filas visibles más el margen de VirtualConsole
+
+
+def linea(i):
+    return f"R{i % 50} Internet 10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256} 3 c201.0b5c.0000 ARPA Fa0/0\n"
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+    log = SegmentLog()
+
+    t_escribir = 0.0
+    for base in range(0, cantidad, LINEAS_POR_ESCRITURA):
+        bloque = [(linea(i), "info") for i in range(base, min(cantidad, base + LINEAS_POR_ESCRITURA))]
+        if base + LINEAS_POR_ESCRITURA >= cantidad:
+            bloque.append(("Keepalive falló en R99\n", "error"))
+        inicio = time.perf_counter()
+        log.escribir(bloque)
+        t_escribir += time.perf_counter() - inicio
+    indice = log.tamano_indice()
+    print(f"{log.num_lineas} líneas, {log.tamano / 1e6:.0f} MB en {len(log._segmentos)} segmentos")
+    print(f"Escritura: {t_escribir:.1f}s ({log.tamano / 1e6 / t_escribir:.0f} MB/s)")
+    print(f"Memoria del índice de líneas y tags: {indice / 1e6:.1f} MB "
+          f"(el Text guardaba los {log.tamano / 1e6:.0f} MB de texto y sus estructuras)")
+
+    aleatorio = random.Random(1)
+    tiempos = []
+    for _ in range(200):
+        primera = aleatorio.randrange(log.num_lineas - VENTANA)
+        inicio = time.perf_counter()
+        segmentos = log.segmentos(primera, primera + VENTANA)
+        tiempos.append(time.perf_counter() - inicio)
+        texto = "".join(segmentos[::2])
+        assert texto.startswith(linea(primera)) and texto.count("\n") == VENTANA
+    print(f"Ventana de {VENTANA} líneas: mediana {statistics.median(tiempos) * 1000:.2f}ms, "
+          f"máx {max(tiempos) * 1000:.2f}ms")
+
+    inicio = time.perf_counter()
+    encontrada = log.buscar("FALLÓ en r99")
+    t_buscar = time.perf_counter() - inicio
+    assert encontrada == cantidad
+    print(f"Búsqueda de una línea al final: {t_buscar:.2f}s ({log.tamano / 1e6 / t_buscar:.0f} MB/s)")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "consola.txt")
+        inicio = time.perf_counter()
+        with open(ruta, "wb") as archivo:
+            for bloque in log.bloques():
+                archivo.write(bloque)
+        t_exportar = time.perf_counter() - inicio
+        assert os.path.getsize(ruta) == log.tamano
+    print(f"Exportación: {t_exportar:.2f}s ({log.tamano / 1e6 / t_exportar:.0f} MB/s)")
+    log.cerrar()
+
+
+if __name__ == "__main__":
+    main()
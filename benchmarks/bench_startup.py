@@ -0,0 +1,131 @@
+"""
+Benchmark: arranque de la interfaz gráfica.
+En un intérprete nuevo por repetición mide:
+- la importación de main y network_gui con -X importtime: tiempo total,
+  los módulos que más tardan y que no se cargue la pila SSH (netmiko,
+  paramiko, cryptography, asyncssh) ni textfsm, numpy o asyncio, que se
+  importan al usarse;
+- si hay display, el tiempo hasta el primer pintado de la ventana (primer
+  <Expose>) y hasta que arranca el mainloop con la topología dibujada.
+Si una mediana supera su límite o se carga un módulo pesado, termina con
+código 1, de modo que puede usarse como prueba de regresión.
+
+Uso: python benchmarks/bench_startup.py [repeticiones]   (por defecto 5)
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import simulated_device  # noqa: F401 (añade la raíz del repositorio a sys.path)
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LIMITE_IMPORTACION = 0.25  # segundos; con netmiko importado al arrancar eran ~0.35s
+LIMITE_PRIMER_PINTADO = 1.0
+LIMITE_MAINLOOP = 1.5
+MODULOS_PESADOS = ("netmiko", "paramiko", "cryptography", "asyncssh", "textfsm", "numpy", "asyncio")
+
+CODIGO_IMPORTACION = f"""
+import sys
+import main, network_gui
+print(",".join(m for m in {MODULOS_PESADOS!r} if m in sys.modules))
+"""
+
+# Arranca la aplicación como main(): el mainloop se sustituye por el cierre
+# de la ventana tras anotar los tiempos
+CODIGO_PINTADO = """
+import time
+inicio = time.perf_counter()
+import json
+import tkinter as tk
+tiempos = {}
+
+class Tk(tk.Tk):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bind_all("<Expose>", lambda e: tiempos.setdefault("pintado", time.perf_counter() - inicio), add="+")
+
+    def mainloop(self, n=0):
+        tiempos["mainloop"] = time.perf_counter() - inicio
+        self.tk.call(self.protocol("WM_DELETE_WINDOW"))
+
+tk.Tk = Tk
+try:
+    import network_gui
+    network_gui.main()
+except tk.TclError as e:
+    tiempos = {"error": str(e)}
+print(json.dumps(tiempos))
+"""
+
+
+def ejecutar(argumentos, directorio):
+    entorno = dict(os.environ, PYTHONPATH=RAIZ)
+    return subprocess.run([sys.executable] + argumentos, cwd=directorio, env=entorno,
+                          capture_output=True, text=True, check=True)
+
+
+def leer_importtime(texto):
+    """[(profundidad, acumulado en segundos, módulo)] de la salida de -X importtime"""
+    modulos = []
+    for linea in texto.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, nombre = linea.split("|")
+        profundidad = (len(nombre) - len(nombre.lstrip()) - 1) // 2
+        modulos.append((profundidad, int(acumulado) / 1e6, nombre.strip()))
+    return modulos
+
+
+def medir_importacion(directorio):
+    proceso = ejecutar(["-X", "importtime", "-c", CODIGO_IMPORTACION], directorio)
+    modulos = leer_importtime(proceso.stderr)
+    total = sum(acumulado for profundidad, acumulado, nombre in modulos
+                if profundidad == 0 and nombre in ("main", "network_gui"))
+    pesados = [m for m in proceso.stdout.strip().split(",") if m]
+    return total, modulos, pesados
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    fallos = []
+
+    with tempfile.TemporaryDirectory() as directorio:
+        medidas = [medir_importacion(directorio) for _ in range(repeticiones)]
+        importacion = statistics.median(total for total, _, _ in medidas)
+        _, modulos, pesados = medidas[-1]
+        print(f"Importación de main + network_gui: mediana {importacion * 1000:.0f}ms "
+              f"(límite {LIMITE_IMPORTACION * 1000:.0f}ms)")
+        print("Módulos importados directamente que más tardan:")
+        for _, acumulado, nombre in sorted((m for m in modulos if m[0] == 1), key=lambda m: -m[1])[:8]:
+            print(f"  {nombre:<28} {acumulado * 1000:>6.1f}ms")
+        if importacion > LIMITE_IMPORTACION:
+            fallos.append("importación")
+        if pesados:
+            print(f"Módulos pesados cargados al arrancar: {', '.join(pesados)}")
+            fallos.append("módulos pesados")
+
+        tiempos = [json.loads(ejecutar(["-c", CODIGO_PINTADO], directorio).stdout.strip().splitlines()[-1])
+                   for _ in range(repeticiones)]
+        if "error" in tiempos[0]:
+            print(f"Sin display, no se mide el primer pintado: {tiempos[0]['error']}")
+        else:
+            for clave, descripcion, limite in (("pintado", "Primer pintado de la ventana", LIMITE_PRIMER_PINTADO),
+                                               ("mainloop", "Mainloop con la topología dibujada", LIMITE_MAINLOOP)):
+                mediana = statistics.median(t.get(clave, float("inf")) for t in tiempos)
+                print(f"{descripcion}: mediana {mediana * 1000:.0f}ms (límite {limite * 1000:.0f}ms)")
+                if mediana > limite:
+                    fallos.append(descripcion.lower())
+
+    if fallos:
+        print(f"REGRESIÓN en el arranque: {', '.join(fallos)}")
+        sys.exit(1)
+    print("Arranque dentro de los límites")
+
+
+if __name__ == "__main__":
+    main()
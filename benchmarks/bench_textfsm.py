@@ -0,0 +1,81 @@
+"""
+Benchmark de parseo TextFSM sobre salidas grandes de show ip arp y
+show ip interface brief, con plantilla compilada en caché frente a
+compilar la plantilla en cada llamada.
+
+Uso: python benchmarks/bench_textfsm.py [entradas] [repeticiones]
+"""
+
+import os
+import sys
+import time
+
+import textfsm
+
+import simulated_device  # noqa: F401  (añade la raíz del proyecto a sys.path)
+from textfsm_parser import DIRECTORIO_PLANTILLAS, PLANTILLAS, TemplateCache
+
+
+def generar_arp(entradas):
+    """Genera una salida de 'show ip arp' con el número de entradas indicado"""
+    lineas = ["Protocol  Address          Age (min)  Hardware Addr   Type   Interface"]
+    for i in range(entradas):
+        ip = f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+        mac = f"c2{i >> 8 & 255:02x}.{i & 255:02x}5c.{i % 7:04x}"
+        lineas.append(f"Internet  {ip:<16} {i % 240:>5}   {mac}  ARPA   FastEthernet0/{i % 4}")
+    return "\n".join(lineas)
+
+
+def generar_interfaces(entradas):
+    """Genera una salida de 'show ip interface brief' con el número de interfaces indicado"""
+    lineas = ["Interface                  IP-Address      OK? Method Status                Protocol"]
+    for i in range(entradas):
+        estado = "up                    up" if i % 3 else "administratively down down"
+        lineas.append(f"GigabitEthernet{i // 48}/{i % 48:<12} 10.1.{i >> 8 & 255}.{i & 255:<8} "
+                      f"YES NVRAM  {estado}")
+    return "\n".join(lineas)
+
+
+def parsear_sin_cache(comando, salida):
+    """Compila la plantilla en cada llamada (comportamiento sin caché)"""
+    with open(os.path.join(DIRECTORIO_PLANTILLAS, PLANTILLAS[comando]), encoding="utf-8") as f:
+        fsm = textfsm.TextFSM(f)
+    return fsm.ParseText(salida)
+
+
+def medir(funcion, repeticiones):
+    """Devuelve (segundos por llamada, resultado de la última llamada)"""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion()
+    return (time.perf_counter() - inicio) / repeticiones, resultado
+
+
+def main():
+    entradas = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    cache = TemplateCache()
+    casos = [
+        ("show ip arp", generar_arp(entradas)),
+        ("show ip interface brief", generar_interfaces(entradas)),
+    ]
+
+    print(f"Entradas por salida: {entradas}, repeticiones: {repeticiones}\n")
+    for comando, salida in casos:
+        lineas = salida.count("\n") + 1
+        t_cache, registros = medir(lambda: cache.parsear(comando, salida), repeticiones)
+        t_sin, _ = medir(lambda: parsear_sin_cache(comando, salida), repeticiones)
+        t_pequena, _ = medir(lambda: cache.parsear(comando, salida[:400]), repeticiones * 200)
+        t_pequena_sin, _ = medir(lambda: parsear_sin_cache(comando, salida[:400]), repeticiones * 200)
+
+        print(f"{comando}")
+        print(f"  registros: {len(registros)}")
+        print(f"  con caché: {t_cache * 1000:8.1f} ms/llamada  ({lineas / t_cache:,.0f} líneas/s)")
+        print(f"  sin caché: {t_sin * 1000:8.1f} ms/llamada  ({lineas / t_sin:,.0f} líneas/s)")
+        print(f"  salida corta: {t_pequena * 1e6:.0f} µs con caché, "
+              f"{t_pequena_sin * 1e6:.0f} µs sin caché\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: carga de topologías grandes desde archivo y latencia de
+localización de routers (clic/tooltip) con el índice espacial en rejilla,
+frente a recorrer todos los routers como hace find_closest.
+
+Uso: python benchmarks/bench_topology.py [tamaños...]   (por defecto 1000 10000 50000)
+"""
+
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+import simulated_device  # noqa: F401 (añade la raíz del repositorio a sys.path)
+from spatial_index import SpatialGrid
+from topology_model import cargar_topologia
+
+CONSULTAS = 2000
+
+
+def generar_archivo(ruta, cantidad, aleatorio):
+    """Routers en un plano con densidad constante y enlaces a vecinos cercanos"""
+    lado = math.sqrt(cantidad) * 60
+    with open(ruta, "w", encoding="utf-8") as f:
+        for i in range(cantidad):
+            f.write(f"router N{i} {aleatorio.uniform(0, lado):.1f} {aleatorio.uniform(0, lado):.1f} "
+                    f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256} rol=acceso sitio=S{i % 97}\n")
+        for i in range(1, cantidad):
+            f.write(f"link N{i} N{aleatorio.randrange(max(0, i - 50), i)}\n")
+            if aleatorio.random() < 0.5:
+                f.write(f"link N{i} N{aleatorio.randrange(i)}\n")
+    return lado
+
+
+def mas_cercano_lineal(posiciones, x, y, radio):
+    mejor, mejor_distancia = None, radio * radio
+    for clave, (px, py) in posiciones.items():
+        distancia = (px - x) ** 2 + (py - y) ** 2
+        if distancia <= mejor_distancia:
+            mejor, mejor_distancia = clave, distancia
+    return mejor
+
+
+def main():
+    tamanos = [int(t) for t in sys.argv[1:]] or [1000, 10000, 50000]
+    aleatorio = random.Random(7)
+
+    print(f"{'routers':>8} {'enlaces':>8} {'carga':>9} {'índice':>9} {'hover rejilla':>14} "
+          f"{'hover lineal':>13} {'atributos':>10}")
+    with tempfile.TemporaryDirectory() as directorio:
+        for cantidad in tamanos:
+            ruta = os.path.join(directorio, f"topo_{cantidad}.topo")
+            lado = generar_archivo(ruta, cantidad, aleatorio)
+
+            inicio = time.perf_counter()
+            topologia = cargar_topologia(ruta)
+            t_carga = time.perf_counter() - inicio
+
+            posiciones = topologia.placed_positions()
+            inicio = time.perf_counter()
+            indice = SpatialGrid(SpatialGrid.celda_recomendada(len(posiciones), lado, lado))
+            indice.cargar(posiciones)
+            t_indice = time.perf_counter() - inicio
+
+            # Consultas en puntos aleatorios y sobre routers existentes
+            nombres = list(posiciones)
+            puntos = [(aleatorio.uniform(0, lado), aleatorio.uniform(0, lado))
+                      for _ in range(CONSULTAS // 2)]
+            puntos += [posiciones[aleatorio.choice(nombres)] for _ in range(CONSULTAS // 2)]
+
+            inicio = time.perf_counter()
+            encontrados = [indice.mas_cercano(x, y, 6) for x, y in puntos]
+            t_rejilla = (time.perf_counter() - inicio) / len(puntos)
+
+            muestra = puntos[:50]
+            inicio = time.perf_counter()
+            lineales = [mas_cercano_lineal(posiciones, x, y, 6) for x, y in muestra]
+            t_lineal = (time.perf_counter() - inicio) / len(muestra)
+            assert lineales == encontrados[:50]
+
+            inicio = time.perf_counter()
+            for nombre in nombres[:1000]:
+                topologia.attributes(nombre)
+            t_atributos = (time.perf_counter() - inicio) / min(1000, len(nombres))
+
+            print(f"{cantidad:>8} {len(topologia.connections):>8} {t_carga * 1000:>7.0f}ms "
+                  f"{t_indice * 1000:>7.0f}ms {t_rejilla * 1e6:>12.1f}µs {t_lineal * 1e6:>11.0f}µs "
+                  f"{t_atributos * 1e6:>8.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Servidor SSH local que emula routers Cisco IOS para probar el motor asíncrono.
+Cada router escucha en un puerto distinto (puerto_base + índice) y responde
+a los comandos show con salidas fijas y a 'configure terminal' con prompts
+de modo configuración.
+
+Uso: python benchmarks/fake_ssh_server.py [routers] [puerto_base]
+"""
+
+import asyncio
+import sys
+
+import asyncssh
+
+from simulated_device import SALIDAS_POR_DEFECTO
+
+USUARIO = "admin"
+PASSWORD = "password"
+
+# Comandos que abren un submodo de configuración y su prompt
+SUBMODOS = {
+    "interface": "config-if",
+    "router": "config-router",
+    "ip dhcp pool": "dhcp-config",
+    "policy-map": "config-pmap",
+    "class-map": "config-cmap",
+    "class": "config-pmap-c",
+    "line": "config-line",
+}
+
+
+class _Servidor(asyncssh.SSHServer):
+    """Acepta únicamente el usuario y contraseña de prueba"""
+
+    def begin_auth(self, username):
+        return True
+
+    def password_auth_supported(self):
+        return True
+
+    def validate_password(self, username, password):
+        return username == USUARIO and password == PASSWORD
+
+
+def _crear_shell(hostname, latencia, salidas):
+    """Crea el manejador de sesión interactiva para un router"""
+
+    async def shell(proceso):
+        modo = None
+        proceso.stdout.write(f"\n{hostname}#")
+        while True:
+            try:
+                linea = await proceso.stdin.readline()
+            except asyncssh.TerminalSizeChanged:
+                continue
+            except (asyncssh.BreakReceived, asyncssh.SignalReceived):
+                break
+            if not linea:
+                break
+
+            comando = linea.strip()
+            if latencia:
+                await asyncio.sleep(latencia)
+
+            respuesta = ""
+            if comando in ("exit", "logout") and modo is None:
+                break
+            elif comando == "configure terminal":
+                modo = "config"
+                respuesta = "Enter configuration commands, one per line.  End with CNTL/Z."
+            elif comando == "end":
+                modo = None
+            elif comando == "exit":
+                modo = "config" if modo not in ("config", None) else None
+            elif modo is not None:
+                for prefijo, submodo in SUBMODOS.items():
+                    if comando.startswith(prefijo + " "):
+                        modo = submodo
+                        break
+            elif comando.startswith("show") or comando.startswith("terminal"):
+                respuesta = salidas.get(comando, "")
+            elif comando:
+                respuesta = "% Invalid input detected at '^' marker."
+
+            sufijo = f"({modo})" if modo else ""
+            proceso.stdout.write((respuesta + "\n" if respuesta else "") + f"{hostname}{sufijo}#")
+        proceso.exit(0)
+
+    return shell
+
+
+async def iniciar_servidores(routers=5, puerto_base=2200, host="127.0.0.1",
+                             latencia=0.0, salidas=None):
+    """
+    Arranca un servidor SSH por router simulado
+    Devuelve la lista de servidores (cerrar con server.close())
+    """
+    clave = asyncssh.generate_private_key("ssh-ed25519")
+    tabla = dict(SALIDAS_POR_DEFECTO)
+    tabla.update(salidas or {})
+
+    servidores = []
+    for indice in range(routers):
+        servidor = await asyncssh.create_server(
+            _Servidor, host, puerto_base + indice,
+            server_host_keys=[clave],
+            process_factory=_crear_shell(f"R{indice + 1}", latencia, tabla),
+        )
+        servidores.append(servidor)
+    return servidores
+
+
+async def _main(routers, puerto_base):
+    await iniciar_servidores(routers, puerto_base)
+    print(f"{routers} router(s) simulados en 127.0.0.1:{puerto_base}-{puerto_base + routers - 1}")
+    print(f"Credenciales: {USUARIO} / {PASSWORD}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_main(int(sys.argv[1]) if len(sys.argv) > 1 else 5,
+                          int(sys.argv[2]) if len(sys.argv) > 2 else 2200))
+    except KeyboardInterrupt:
+        pass
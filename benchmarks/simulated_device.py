@@ -0,0 +1,129 @@
+"""
+Dispositivo Cisco simulado para benchmarks.
+Imita la interfaz de una conexión netmiko (send_command, send_config_set,
+write_channel/read_channel) añadiendo una latencia fija por ida y vuelta y
+un tiempo de proceso por comando, sin necesidad de red.
+Como un canal SSH real, no admite comandos simultáneos: si dos hilos lo usan
+a la vez, la salida se corrompe y se contabiliza una colisión.
+"""
+
+import contextlib
+import os
+import sys
+import threading
+import time
+
+# Permitir importar los módulos del proyecto desde benchmarks/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SALIDAS_POR_DEFECTO = {
+    "show clock": "*12:00:00.000 UTC Mon Mar 1 2024",
+    "show ip arp": (
+        "Protocol  Address          Age (min)  Hardware Addr   Type   Interface\n"
+        "Internet  172.168.1.1             -   c201.0b5c.0000  ARPA   FastEthernet0/0\n"
+        "Internet  172.168.1.2             3   c202.0b6d.0000  ARPA   FastEthernet0/0"
+    ),
+    "show ip interface brief": (
+        "Interface                  IP-Address      OK? Method Status                Protocol\n"
+        "FastEthernet0/0            172.168.1.1     YES NVRAM  up                    up\n"
+        "FastEthernet0/1            unassigned      YES NVRAM  administratively down down"
+    ),
+}
+
+
+class _SimulatedTransport:
+    """Transporte SSH simulado (siempre activo salvo que se cierre)"""
+    
+    def __init__(self):
+        self.activo = True
+    
+    def is_active(self):
+        return self.activo
+
+
+class _SimulatedChannel:
+    """Canal SSH simulado con la interfaz mínima de paramiko.Channel"""
+    
+    def __init__(self):
+        self.closed = False
+        self.transport = _SimulatedTransport()
+    
+    def get_transport(self):
+        return self.transport
+
+
+class SimulatedConnection:
+    """
+    Conexión netmiko simulada.
+    latencia: segundos de ida y vuelta por cada intercambio con el router
+    procesamiento: segundos que tarda el router en ejecutar cada comando
+    """
+    
+    def __init__(self, latencia=0.02, hostname="R1", salidas=None, procesamiento=0.0):
+        self.latencia = latencia
+        self.procesamiento = procesamiento
+        self.hostname = hostname
+        self.base_prompt = hostname
+        self.salidas = dict(SALIDAS_POR_DEFECTO)
+        self.salidas.update(salidas or {})
+        self.remote_conn = _SimulatedChannel()
+        self.comandos_enviados = 0
+        self.colisiones = 0
+        self._en_uso = threading.Lock()
+        self._escrito = ""
+    
+    def send_command(self, comando, **kwargs):
+        with self._canal() as exclusivo:
+            time.sleep(self.latencia + self.procesamiento)
+            self.comandos_enviados += 1
+            salida = self.salidas.get(comando, "")
+            return salida if exclusivo else salida[:len(salida) // 2]
+    
+    def send_config_set(self, comandos, **kwargs):
+        with self._canal():
+            time.sleep(self.latencia)
+            self.comandos_enviados += 1
+            lineas = [f"{self.hostname}(config)#{cmd}" for cmd in comandos]
+            return "configure terminal\n" + "\n".join(lineas) + f"\n{self.hostname}(config)#end"
+    
+    def write_channel(self, datos):
+        with self._canal():
+            self._escrito += datos
+    
+    def read_channel(self):
+        """Devuelve el eco y la salida de todo lo escrito en un solo intercambio"""
+        with self._canal():
+            comandos = [linea.strip() for linea in self._escrito.split("\n") if linea.strip()]
+            self._escrito = ""
+            if not comandos:
+                return ""
+            time.sleep(self.latencia + self.procesamiento * len(comandos))
+            self.comandos_enviados += 1
+            return "".join(f"{comando}\r\n{self.salidas.get(comando, '')}\r\n{self.hostname}#"
+                           for comando in comandos)
+    
+    def disconnect(self):
+        self.remote_conn.closed = True
+    
+    @contextlib.contextmanager
+    def _canal(self):
+        """Contexto que detecta el uso simultáneo del canal"""
+        exclusivo = self._en_uso.acquire(blocking=False)
+        if not exclusivo:
+            self.colisiones += 1
+        try:
+            yield exclusivo
+        finally:
+            if exclusivo:
+                self._en_uso.release()
+
+
+def crear_router_simulado(latencia=0.02, nombre="R1", salidas=None):
+    """Crea un SSHRouterConnection ya 'conectado' a un dispositivo simulado"""
+    from network_connection import SSHRouterConnection
+    
+    router = SSHRouterConnection("127.0.0.1", "admin", "password", nombre)
+    router.conexion = SimulatedConnection(latencia, nombre, salidas)
+    router.conectado = True
+    router._registrar_actividad()
+    return router
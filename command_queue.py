@@ -0,0 +1,93 @@
+"""
+Cola de comandos por router con un único ejecutor.
+Todas las operaciones sobre el canal SSH de un router (consultas,
+configuración, sondas y keepalives) pasan por su cola y se ejecutan de una
+en una, evitando que varios hilos escriban a la vez en el mismo canal.
+Las lecturas idénticas pendientes se agrupan en una sola llamada al router.
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+
+class CommandQueue:
+    """
+    Cola FIFO serializada con un hilo ejecutor bajo demanda.
+    El hilo se crea con el primer trabajo y termina tras
+    tiempo_inactivo_hilo segundos sin trabajos.
+    """
+
+    def __init__(self, nombre="Router", tiempo_inactivo_hilo=30):
+        self.nombre = nombre
+        self.tiempo_inactivo_hilo = tiempo_inactivo_hilo
+        self.agrupadas = 0  # peticiones resueltas por una llamada ya pendiente
+        self._trabajos = deque()
+        self._pendientes = {}  # clave -> Future de lecturas aún no resueltas
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def enviar(self, funcion, *args, clave=None):
+        """
+        Encola funcion(*args) y devuelve un concurrent.futures.Future
+        clave: si ya hay un trabajo pendiente con la misma clave, se devuelve
+        su Future en lugar de encolar otro (solo para lecturas)
+        """
+        with self._cond:
+            if clave is not None:
+                futuro = self._pendientes.get(clave)
+                if futuro is not None:
+                    self.agrupadas += 1
+                    return futuro
+
+            futuro = Future()
+            self._trabajos.append((futuro, funcion, args, clave))
+            if clave is not None:
+                self._pendientes[clave] = futuro
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._ejecutor, daemon=True,
+                                                name=f"cmd-{self.nombre}")
+                self._thread.start()
+            else:
+                self._cond.notify()
+        return futuro
+
+    def ejecutar(self, funcion, *args, clave=None, timeout=None):
+        """
+        Ejecuta funcion(*args) a través de la cola y espera el resultado.
+        Si se llama desde el propio ejecutor se ejecuta directamente para
+        no bloquearse esperando a sí mismo.
+        """
+        if self.en_ejecutor():
+            return funcion(*args)
+        return self.enviar(funcion, *args, clave=clave).result(timeout)
+
+    def en_ejecutor(self):
+        """Indica si el hilo actual es el ejecutor de esta cola"""
+        return threading.current_thread() is self._thread
+
+    def pendientes(self):
+        """Número de trabajos en espera"""
+        return len(self._trabajos)
+
+    def _ejecutor(self):
+        while True:
+            with self._cond:
+                if not self._trabajos:
+                    self._cond.wait(timeout=self.tiempo_inactivo_hilo)
+                if not self._trabajos:
+                    self._thread = None
+                    return
+                futuro, funcion, args, clave = self._trabajos.popleft()
+
+            if futuro.set_running_or_notify_cancel():
+                try:
+                    futuro.set_result(funcion(*args))
+                except BaseException as e:
+                    futuro.set_exception(e)
+
+            if clave is not None:
+                with self._cond:
+                    if self._pendientes.get(clave) is futuro:
+                        del self._pendientes[clave]
@@ -0,0 +1,334 @@
+"""
+Almacén de respaldos de running-config direccionado por contenido.
+Cada configuración se identifica por el SHA-256 de su texto normalizado y
+se guarda comprimida con zlib en objects/. Una configuración que no cambia
+no genera objetos nuevos, y cada revisión se guarda como diferencia
+respecto a la anterior, con una copia completa (keyframe) cada cierto
+número de revisiones para acotar la reconstrucción.
+El historial de cada router es un índice JSONL ordenado por tiempo, de modo
+que las consultas "qué cambió desde" se resuelven con búsqueda binaria.
+"""
+
+import bisect
+import difflib
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+
+KEYFRAME_CADA = 20  # revisiones máximas encadenadas por diferencias
+MAX_TEXTOS_EN_MEMORIA = 32
+
+# Líneas que cambian sin que cambie la configuración
+_VOLATILES = re.compile(
+    r"^(Building configuration|Current configuration|! Last configuration change"
+    r"|! NVRAM config last updated|ntp clock-period)"
+)
+
+
+def normalizar_config(texto):
+    """Elimina cabeceras y líneas volátiles para comparar configuraciones"""
+    lineas = [linea.rstrip() for linea in (texto or "").splitlines()]
+    lineas = [linea for linea in lineas if not _VOLATILES.match(linea)]
+    while lineas and not lineas[0]:
+        lineas.pop(0)
+    return "\n".join(lineas).strip("\n") + "\n"
+
+
+class _Revision:
+    """Entrada del índice de un router"""
+
+    __slots__ = ("instante", "hash", "profundidad", "anadidas", "eliminadas")
+
+    def __init__(self, instante, hash, profundidad=0, anadidas=0, eliminadas=0):
+        self.instante = instante
+        self.hash = hash
+        self.profundidad = profundidad  # diferencias hasta el keyframe
+        self.anadidas = anadidas
+        self.eliminadas = eliminadas
+
+    def a_dict(self):
+        return {"t": self.instante, "hash": self.hash, "prof": self.profundidad,
+                "add": self.anadidas, "del": self.eliminadas}
+
+
+class ConfigBackupStore:
+    """
+    Almacén de respaldos en disco.
+    directorio/objects/ab/cdef...  objetos zlib (texto completo o diferencia)
+    directorio/indices/R1.jsonl    historial de revisiones de cada router
+    """
+
+    def __init__(self, directorio="backups", keyframe_cada=KEYFRAME_CADA):
+        self.directorio = directorio
+        self.keyframe_cada = keyframe_cada
+        self._dir_objetos = os.path.join(directorio, "objects")
+        self._dir_indices = os.path.join(directorio, "indices")
+        os.makedirs(self._dir_objetos, exist_ok=True)
+        os.makedirs(self._dir_indices, exist_ok=True)
+        self._indices = {}  # router -> lista de _Revision ordenada por instante
+        self._instantes = {}  # router -> lista paralela de instantes para bisect
+        self._textos = OrderedDict()  # hash -> lista de líneas (LRU)
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Respaldo
+    # ------------------------------------------------------------------
+
+    def respaldar_todos(self, router_manager, nombres=None, llamar=None, callback=None):
+        """
+        Descarga en paralelo la running-config de los routers y la guarda
+        llamar: función (fn, *args, **kwargs) que ejecuta las operaciones del
+                motor (p. ej. para resolver corrutinas del motor asyncio)
+        callback: función (nombre, resultado, duracion); resultado es el hash
+                  guardado, o None si no se pudo descargar
+        Devuelve un diccionario nombre -> (hash, nueva revisión) o None si falló
+        """
+        llamar = llamar or (lambda funcion, *args, **kwargs: funcion(*args, **kwargs))
+        resultados = {}
+
+        def al_descargar(nombre, config, duracion):
+            resultados[nombre] = self.guardar(nombre, config) if config else None
+            if callback:
+                callback(nombre, resultados[nombre], duracion)
+
+        llamar(router_manager.obtener_informacion, "show running-config",
+               nombres=nombres, callback=al_descargar, forzar=True)
+        return resultados
+
+    def guardar(self, router, config, instante=None):
+        """
+        Guarda una configuración y devuelve (hash, nueva_revision)
+        Si coincide con la última revisión del router no se registra nada
+        """
+        texto = normalizar_config(config)
+        hash_config = hashlib.sha256(texto.encode("utf-8")).hexdigest()
+        instante = time.time() if instante is None else instante
+
+        with self._lock:
+            revisiones = self._cargar_indice(router)
+            anterior = revisiones[-1] if revisiones else None
+            if anterior and anterior.hash == hash_config:
+                return hash_config, False
+
+            lineas = texto.splitlines()
+            profundidad = 0
+            anadidas, eliminadas = len(lineas), 0
+            if anterior:
+                operaciones, anadidas, eliminadas = _diferenciar(
+                    self._leer_lineas(anterior.hash), lineas)
+
+            if self._existe_objeto(hash_config):
+                profundidad = self._profundidad(hash_config)
+            elif anterior and anterior.profundidad + 1 < self.keyframe_cada:
+                profundidad = anterior.profundidad + 1
+                self._escribir_objeto(hash_config, {
+                    "base": anterior.hash,
+                    "ops": operaciones,
+                })
+            else:
+                self._escribir_objeto(hash_config, {"texto": texto})
+
+            self._recordar(hash_config, lineas)
+            revision = _Revision(instante, hash_config, profundidad, anadidas, eliminadas)
+            self._anadir_revision(router, revision)
+            return hash_config, True
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def routers(self):
+        """Routers con al menos un respaldo"""
+        with self._lock:
+            nombres = {archivo[:-len(".jsonl")] for archivo in os.listdir(self._dir_indices)
+                       if archivo.endswith(".jsonl")}
+            return sorted(nombres | set(self._indices))
+
+    def revisiones(self, router, desde=None, hasta=None):
+        """Revisiones de un router entre dos instantes, como diccionarios"""
+        with self._lock:
+            revisiones = self._cargar_indice(router)
+            instantes = self._instantes[router]
+            inicio = 0 if desde is None else bisect.bisect_left(instantes, desde)
+            fin = len(revisiones) if hasta is None else bisect.bisect_right(instantes, hasta)
+            return [revision.a_dict() for revision in revisiones[inicio:fin]]
+
+    def hash_en(self, router, instante=None):
+        """Hash de la configuración vigente en un instante (la última por defecto)"""
+        with self._lock:
+            revisiones = self._cargar_indice(router)
+            if instante is None:
+                return revisiones[-1].hash if revisiones else None
+            posicion = bisect.bisect_right(self._instantes[router], instante)
+            return revisiones[posicion - 1].hash if posicion else None
+
+    def obtener(self, router, instante=None):
+        """Texto de la configuración vigente en un instante (la última por defecto)"""
+        hash_config = self.hash_en(router, instante)
+        return self.obtener_objeto(hash_config) if hash_config else None
+
+    def obtener_objeto(self, hash_config):
+        """Texto de una configuración a partir de su hash"""
+        with self._lock:
+            return "\n".join(self._leer_lineas(hash_config)) + "\n"
+
+    def cambios_desde(self, instante, routers=None):
+        """
+        Routers cuya configuración actual difiere de la vigente en 'instante'
+        Devuelve nombre -> {"antes": hash o None, "ahora": hash, "revisiones": n}
+        """
+        cambios = {}
+        with self._lock:
+            for router in (self.routers() if routers is None else routers):
+                revisiones = self._cargar_indice(router)
+                if not revisiones:
+                    continue
+                posicion = bisect.bisect_right(self._instantes[router], instante)
+                antes = revisiones[posicion - 1].hash if posicion else None
+                if antes != revisiones[-1].hash:
+                    cambios[router] = {"antes": antes, "ahora": revisiones[-1].hash,
+                                       "revisiones": len(revisiones) - posicion}
+        return cambios
+
+    def diferencias(self, router, desde, hasta=None):
+        """Diff unificado de la configuración de un router entre dos instantes"""
+        antes = self.obtener(router, desde) or ""
+        ahora = self.obtener(router, hasta) or ""
+        return "".join(difflib.unified_diff(
+            antes.splitlines(True), ahora.splitlines(True),
+            fromfile=f"{router}@{_formatear_instante(desde)}",
+            tofile=f"{router}@{_formatear_instante(hasta)}",
+        ))
+
+    # ------------------------------------------------------------------
+    # Objetos
+    # ------------------------------------------------------------------
+
+    def _ruta_objeto(self, hash_config):
+        return os.path.join(self._dir_objetos, hash_config[:2], hash_config[2:])
+
+    def _existe_objeto(self, hash_config):
+        return os.path.exists(self._ruta_objeto(hash_config))
+
+    def _escribir_objeto(self, hash_config, contenido):
+        ruta = self._ruta_objeto(hash_config)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, "wb") as f:
+            f.write(zlib.compress(json.dumps(contenido).encode("utf-8"), 9))
+        os.replace(temporal, ruta)
+
+    def _leer_objeto(self, hash_config):
+        with open(self._ruta_objeto(hash_config), "rb") as f:
+            return json.loads(zlib.decompress(f.read()).decode("utf-8"))
+
+    def _leer_lineas(self, hash_config):
+        """Reconstruye una configuración siguiendo la cadena de diferencias"""
+        cadena = []
+        actual = hash_config
+        while actual not in self._textos:
+            objeto = self._leer_objeto(actual)
+            if "texto" in objeto:
+                self._recordar(actual, objeto["texto"].splitlines())
+                break
+            cadena.append((actual, objeto))
+            actual = objeto["base"]
+
+        lineas = self._textos[actual]
+        self._textos.move_to_end(actual)
+        for hash_objeto, objeto in reversed(cadena):
+            lineas = _aplicar_diferencia(lineas, objeto["ops"])
+            self._recordar(hash_objeto, lineas)
+        return lineas
+
+    def _profundidad(self, hash_config):
+        """Número de diferencias hasta el keyframe de un objeto existente"""
+        profundidad = 0
+        objeto = self._leer_objeto(hash_config)
+        while "base" in objeto:
+            profundidad += 1
+            objeto = self._leer_objeto(objeto["base"])
+        return profundidad
+
+    def _recordar(self, hash_config, lineas):
+        self._textos[hash_config] = lineas
+        self._textos.move_to_end(hash_config)
+        while len(self._textos) > MAX_TEXTOS_EN_MEMORIA:
+            self._textos.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Índices
+    # ------------------------------------------------------------------
+
+    def _ruta_indice(self, router):
+        return os.path.join(self._dir_indices, f"{router}.jsonl")
+
+    def _cargar_indice(self, router):
+        """Carga (una vez) el historial de un router"""
+        if router in self._indices:
+            return self._indices[router]
+
+        revisiones = []
+        ruta = self._ruta_indice(router)
+        if os.path.exists(ruta):
+            with open(ruta, encoding="utf-8") as f:
+                for linea in f:
+                    if linea.strip():
+                        d = json.loads(linea)
+                        revisiones.append(_Revision(d["t"], d["hash"], d.get("prof", 0),
+                                                    d.get("add", 0), d.get("del", 0)))
+            revisiones.sort(key=lambda revision: revision.instante)
+        self._indices[router] = revisiones
+        self._instantes[router] = [revision.instante for revision in revisiones]
+        return revisiones
+
+    def _anadir_revision(self, router, revision):
+        revisiones = self._indices[router]
+        instantes = self._instantes[router]
+        posicion = bisect.bisect_right(instantes, revision.instante)
+        revisiones.insert(posicion, revision)
+        instantes.insert(posicion, revision.instante)
+        with open(self._ruta_indice(router), "a", encoding="utf-8") as f:
+            f.write(json.dumps(revision.a_dict()) + "\n")
+
+
+def _diferenciar(antes, despues):
+    """
+    Codifica 'despues' respecto a 'antes' como operaciones compactas:
+    [inicio, fin] copia líneas de la base y {"+": [...]} inserta líneas.
+    Devuelve (operaciones, líneas añadidas, líneas eliminadas)
+    """
+    operaciones = []
+    anadidas = eliminadas = 0
+    matcher = difflib.SequenceMatcher(None, antes, despues, autojunk=False)
+    for etiqueta, i1, i2, j1, j2 in matcher.get_opcodes():
+        if etiqueta == "equal":
+            operaciones.append([i1, i2])
+            continue
+        eliminadas += i2 - i1
+        anadidas += j2 - j1
+        if j2 > j1:
+            operaciones.append({"+": despues[j1:j2]})
+    return operaciones, anadidas, eliminadas
+
+
+def _aplicar_diferencia(base, operaciones):
+    lineas = []
+    for operacion in operaciones:
+        if isinstance(operacion, dict):
+            lineas.extend(operacion["+"])
+        else:
+            lineas.extend(base[operacion[0]:operacion[1]])
+    return lineas
+
+
+def _formatear_instante(instante):
+    if instante is None:
+        return "actual"
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(instante))
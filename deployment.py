@@ -0,0 +1,166 @@
+"""
+Despliegue concurrente de configuración en varios routers.
+Aplica el mismo bloque de comandos en paralelo con un máximo de routers
+simultáneos, opcionalmente primero en unos routers canario, captura la
+running-config previa de cada router y la restaura si el cambio falla.
+En modo solo_delta únicamente se envían las líneas que faltan en cada
+router, y los routers que ya cumplen la plantilla no se tocan.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from ios_config import calcular_delta, contiene_errores, generar_rollback
+
+
+class ResultadoDespliegue:
+    """Resultado del despliegue en un router"""
+
+    APLICADO = "aplicado"
+    CONFORME = "conforme"
+    REVERTIDO = "revertido"
+    ROLLBACK_FALLIDO = "rollback fallido"
+    FALLIDO = "fallido"
+    OMITIDO = "omitido"
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.estado = self.OMITIDO
+        self.duracion = 0.0
+        self.error = None
+        self.salida = None
+        self.delta = None  # comandos enviados en modo solo_delta
+        self.rollback = []  # comandos enviados para revertir
+
+    @property
+    def exito(self):
+        return self.estado in (self.APLICADO, self.CONFORME)
+
+    def __str__(self):
+        texto = f"{self.nombre}: {self.estado} ({self.duracion:.2f}s)"
+        return f"{texto} - {self.error}" if self.error else texto
+
+
+class ConfigDeployer:
+    """
+    Motor de despliegue de configuración.
+    routers: diccionario nombre -> conexión (SSHRouterConnection o AsyncRouterConnection)
+    canarios: número de routers que reciben el cambio antes que el resto;
+              si alguno falla, el despliegue se detiene
+    rollback: restaurar automáticamente los routers en los que falle el cambio
+    solo_delta: enviar solo las líneas que faltan en la running-config
+    llamar: función (fn, *args) que ejecuta las operaciones del motor; permite
+            resolver corrutinas del motor asyncio (por defecto llamada directa)
+    """
+
+    def __init__(self, routers, max_workers=10, canarios=0, rollback=True, solo_delta=False,
+                 llamar=None):
+        self.routers = routers
+        self.max_workers = max_workers
+        self.canarios = canarios
+        self.rollback = rollback
+        self.solo_delta = solo_delta
+        self.llamar = llamar or (lambda funcion, *args, **kwargs: funcion(*args, **kwargs))
+
+    def desplegar(self, comandos, nombres=None, callback=None):
+        """
+        Despliega los comandos en los routers indicados (todos por defecto)
+        callback: función (nombre, resultado, duracion) llamada al terminar cada router
+        Devuelve un diccionario nombre -> ResultadoDespliegue en el orden de nombres
+        """
+        nombres = [n for n in (self.routers if nombres is None else nombres) if n in self.routers]
+        resultados = {nombre: ResultadoDespliegue(nombre) for nombre in nombres}
+        if not nombres or not comandos:
+            return resultados
+
+        canarios = nombres[:self.canarios] if 0 < self.canarios < len(nombres) else []
+        resto = nombres[len(canarios):]
+
+        if canarios:
+            print(f"Desplegando en {len(canarios)} router(s) canario: {', '.join(canarios)}")
+            self._ronda(canarios, comandos, resultados, callback)
+            fallidos = [n for n in canarios if not resultados[n].exito]
+            if fallidos:
+                print(f"✗ Falló el canario ({', '.join(fallidos)}): despliegue detenido")
+                for nombre in resto:
+                    resultados[nombre].error = "despliegue detenido por fallo del canario"
+                return resultados
+
+        self._ronda(resto, comandos, resultados, callback)
+        return resultados
+
+    def _ronda(self, nombres, comandos, resultados, callback):
+        """Despliega en paralelo en un grupo de routers"""
+        if not nombres:
+            return
+        workers = max(1, min(self.max_workers, len(nombres)))
+        total = len(nombres)
+        terminados = 0
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="deploy") as executor:
+            futuros = {
+                executor.submit(self._desplegar_router, resultados[nombre], comandos): nombre
+                for nombre in nombres
+            }
+            for futuro in as_completed(futuros):
+                nombre = futuros[futuro]
+                resultado = resultados[nombre]
+                try:
+                    futuro.result()
+                except Exception as e:
+                    resultado.estado = ResultadoDespliegue.FALLIDO
+                    resultado.error = str(e)
+                terminados += 1
+                print(f"[{terminados}/{total}] {resultado}")
+                if callback:
+                    try:
+                        callback(nombre, resultado, resultado.duracion)
+                    except Exception as e:
+                        print(f"Error en callback para {nombre}: {e}")
+
+    def _desplegar_router(self, resultado, comandos):
+        """Captura la configuración previa, aplica el cambio y revierte si falla"""
+        router = self.routers[resultado.nombre]
+        inicio = time.perf_counter()
+        try:
+            previa = self.llamar(router.obtener_informacion, "show running-config", forzar=True)
+            if not previa:
+                resultado.estado = ResultadoDespliegue.FALLIDO
+                resultado.error = "no se pudo capturar la configuración previa"
+                return
+
+            if self.solo_delta:
+                resultado.delta = calcular_delta(comandos, previa)
+                if not resultado.delta:
+                    resultado.estado = ResultadoDespliegue.CONFORME
+                    return
+                print(f"[{resultado.nombre}] Diferencias: {len(resultado.delta)} comando(s)")
+
+            salida = self.llamar(router.configurar, resultado.delta or comandos)
+            resultado.salida = salida
+            if salida is not False and not contiene_errores(salida):
+                resultado.estado = ResultadoDespliegue.APLICADO
+                return
+
+            resultado.error = ("el router rechazó algún comando" if salida
+                               else "error enviando la configuración")
+            if not self.rollback:
+                resultado.estado = ResultadoDespliegue.FALLIDO
+                return
+            self._revertir(router, resultado, comandos, previa)
+        finally:
+            resultado.duracion = time.perf_counter() - inicio
+
+    def _revertir(self, router, resultado, comandos, previa):
+        """Restaura la configuración previa deshaciendo solo lo que cambió"""
+        resultado.rollback = generar_rollback(comandos, previa)
+        if not resultado.rollback:
+            resultado.estado = ResultadoDespliegue.REVERTIDO
+            return
+
+        print(f"Revirtiendo {resultado.nombre} ({len(resultado.rollback)} comando(s))")
+        salida = self.llamar(router.configurar, resultado.rollback)
+        if salida is not False and not contiene_errores(salida):
+            resultado.estado = ResultadoDespliegue.REVERTIDO
+        else:
+            resultado.estado = ResultadoDespliegue.ROLLBACK_FALLIDO
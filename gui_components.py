@@ -5,11 +5,22 @@ Contiene widgets personalizados y paneles reutilizables.
 
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
+import tkinter.font as tkfont
 from typing import Dict, List, Callable, Optional, Tuple
+import os
 import threading
+import time
+from collections import deque
 from datetime import datetime
 
-from topology_config import TopologyConfig, NetworkCommands
+from topology_config import (TopologyConfig, NetworkCommands, LIMITE_DETALLE_TOPOLOGIA,
+                             DIRECTORIO_CACHE_LAYOUT)
+from topology_model import Topology
+from spatial_index import SpatialGrid
+from log_index import LogIndex
+from segment_log import SegmentLog
+from log_export import exportar
+from results_store import ResultStore
 
 
 class StyledButton(ttk.Button):
@@ -72,14 +83,47 @@ class StatusIndicator(tk.Frame):
 
 
 class NetworkTopologyCanvas(tk.Canvas):
-    """Canvas personalizado para dibujar la topología de red."""
+    """
+    Canvas personalizado para dibujar la topología de red.
     
-    def __init__(self, parent, **kwargs):
-        """Inicializa el canvas de topología."""
+    Los elementos se crean una sola vez y se guardan sus identificadores por
+    router y por enlace; los cambios de estado solo modifican con itemconfig
+    los elementos afectados, y varias actualizaciones en el mismo ciclo del
+    event loop se agrupan en un único repintado.
+    
+    Los clics y los tooltips se resuelven con un índice espacial en rejilla.
+    Con topologías grandes (más de DETAIL_LIMIT routers) cada router se dibuja
+    como un único círculo y sus datos se muestran solo en el tooltip.
+    """
+    
+    DETAIL_LIMIT = LIMITE_DETALLE_TOPOLOGIA
+    
+    def __init__(self, parent, topology: Optional[Topology] = None, **kwargs):
+        """
+        Inicializa el canvas de topología.
+        
+        Args:
+            parent: Widget padre
+            topology: Topología a dibujar (por defecto la de TopologyConfig)
+        """
         super().__init__(parent, bg="white", **kwargs)
-        self.router_positions = TopologyConfig.get_router_positions()
-        self.connections = TopologyConfig.get_connections()
+        self.topology = topology or TopologyConfig.get_topology()
+        self.router_positions = self.topology.placed_positions()
+        self.connections = self.topology.connections
         self.status_colors = {}
+        self.spatial = SpatialGrid()
+        self.router_radius = 25
+        self._hover_router: Optional[str] = None
+        self._tooltip_items: Tuple[int, ...] = ()
+        
+        # Identificadores de los elementos dibujados
+        self.router_items: Dict[str, Dict[str, int]] = {}
+        self.link_items: Dict[Tuple[str, str], int] = {}
+        self.links_by_router: Dict[str, List[Tuple[str, str]]] = {}
+        
+        # Routers con cambios pendientes de repintar
+        self._dirty: set = set()
+        self._refresh_pending = False
         
         # Inicializar estados como desconectado
         for router in self.router_positions:
@@ -90,20 +134,101 @@ class NetworkTopologyCanvas(tk.Canvas):
         self.bind("<Motion>", self.on_mouse_motion)
         
         self.draw_topology()
+        if len(self.router_positions) < len(self.topology):
+            self.auto_layout()
+    
+    def load_topology(self, topology: Topology):
+        """
+        Sustituye la topología dibujada.
+        
+        Args:
+            topology: Nueva topología (por ejemplo, cargada desde archivo)
+        """
+        self.topology = topology
+        self.router_positions = topology.placed_positions()
+        self.connections = topology.connections
+        self.status_colors = {router: self.status_colors.get(router, "disconnected")
+                              for router in self.router_positions}
+        self.draw_topology()
+        if len(self.router_positions) < len(topology):
+            self.auto_layout()
+    
+    def auto_layout(self, recalculate: bool = False):
+        """
+        Calcula en segundo plano la posición de los routers sin coordenadas
+        y vuelve a cargar la topología al terminar.
+        
+        Args:
+            recalculate: Recalcular también los routers que ya tienen posición
+        """
+        from topology_layout import ForceLayout
+        topology = self.topology
+        # El hilo trabaja con una copia; las posiciones se aplican en el hilo de Tk
+        names = list(topology.positions)
+        links = list(topology.connections)
+        fixed = {} if recalculate else topology.placed_positions()
+        previous = dict(topology.positions)
+        
+        def apply_layout(positions):
+            if self.topology is not topology:
+                return  # se cargó otra topología mientras tanto
+            for name, position in positions.items():
+                if topology.positions.get(name, position) == previous.get(name):
+                    topology.positions[name] = position
+            self.load_topology(topology)
+        
+        def layout_thread():
+            positions = ForceLayout(directorio_cache=DIRECTORIO_CACHE_LAYOUT).posiciones(names, links, fixed)
+            self.after(0, apply_layout, positions)
+        
+        threading.Thread(target=layout_thread, daemon=True).start()
     
     def draw_topology(self):
-        """Dibuja la topología completa de la red."""
+        """Dibuja la topología completa de la red (solo al crearla o si cambia)."""
         self.delete("all")
+        self.router_items.clear()
+        self.link_items.clear()
+        self.links_by_router.clear()
+        self._dirty.clear()
+        self._hover_router = None
+        self._tooltip_items = ()
+        
+        detailed = len(self.router_positions) <= self.DETAIL_LIMIT
+        self.router_radius = 25 if detailed else 6
+        
+        # Índice espacial para clics y tooltips
+        x1, y1, x2, y2 = self._bounds()
+        self.spatial = SpatialGrid(SpatialGrid.celda_recomendada(
+            len(self.router_positions), x2 - x1, y2 - y1))
+        self.spatial.cargar(self.router_positions)
+        margin = self.router_radius + 50
+        self.configure(scrollregion=(min(0, x1 - margin), min(0, y1 - margin),
+                                     x2 + margin, y2 + margin))
         
         # Dibujar conexiones primero (para que aparezcan detrás)
         self._draw_connections()
         
         # Dibujar routers
-        self._draw_routers()
+        if detailed:
+            self._draw_routers()
+        else:
+            self._draw_router_markers()
         
         # Dibujar leyenda
         self._draw_legend()
     
+    def _router_color(self, router: str) -> str:
+        """Color de un router según su estado."""
+        return TopologyConfig.COLORS.get(self.status_colors.get(router),
+                                         TopologyConfig.COLORS["disconnected"])
+    
+    def _link_color(self, r1: str, r2: str) -> str:
+        """Color de un enlace: conectado solo si ambos extremos lo están."""
+        return (TopologyConfig.COLORS["connected"]
+                if (self.status_colors.get(r1) == "connected" and
+                    self.status_colors.get(r2) == "connected")
+                else TopologyConfig.COLORS["disconnected"])
+    
     def _draw_connections(self):
         """Dibuja las conexiones entre routers."""
         for r1, r2 in self.connections:
@@ -111,15 +236,12 @@ class NetworkTopologyCanvas(tk.Canvas):
                 x1, y1 = self.router_positions[r1]
                 x2, y2 = self.router_positions[r2]
                 
-                # Color del enlace basado en el estado de ambos routers
-                color = (TopologyConfig.COLORS["connected"] 
-                        if (self.status_colors.get(r1) == "connected" and 
-                            self.status_colors.get(r2) == "connected")
-                        else TopologyConfig.COLORS["disconnected"])
-                
                 # Línea de conexión
-                self.create_line(x1, y1, x2, y2, width=3, fill=color, 
-                               tags=("connection", f"conn_{r1}_{r2}"))
+                self.link_items[(r1, r2)] = self.create_line(
+                    x1, y1, x2, y2, width=3, fill=self._link_color(r1, r2),
+                    tags=("connection", f"conn_{r1}_{r2}"))
+                self.links_by_router.setdefault(r1, []).append((r1, r2))
+                self.links_by_router.setdefault(r2, []).append((r1, r2))
                 
                 # Etiqueta de la conexión (opcional)
                 mid_x, mid_y = (x1 + x2) // 2, (y1 + y2) // 2
@@ -129,19 +251,17 @@ class NetworkTopologyCanvas(tk.Canvas):
     def _draw_routers(self):
         """Dibuja los routers en el canvas."""
         for router, (x, y) in self.router_positions.items():
-            color = (TopologyConfig.COLORS["connected"] 
-                    if self.status_colors.get(router) == "connected"
-                    else TopologyConfig.COLORS["disconnected"])
+            color = self._router_color(router)
             
             # Círculo principal del router
-            self.create_oval(x-25, y-25, x+25, y+25, 
-                           fill=color, outline="black", width=2, 
-                           tags=("router", f"router_{router}"))
+            oval = self.create_oval(x-25, y-25, x+25, y+25, 
+                                    fill=color, outline="black", width=2, 
+                                    tags=("router", f"router_{router}"))
             
             # Círculo interior para efecto visual
-            self.create_oval(x-20, y-20, x+20, y+20, 
-                           fill="white", outline=color, width=2,
-                           tags=("router_inner", f"inner_{router}"))
+            inner = self.create_oval(x-20, y-20, x+20, y+20, 
+                                     fill="white", outline=color, width=2,
+                                     tags=("router_inner", f"inner_{router}"))
             
             # Nombre del router
             self.create_text(x, y-40, text=router, 
@@ -149,17 +269,35 @@ class NetworkTopologyCanvas(tk.Canvas):
                            tags=("router_label", f"name_{router}"))
             
             # IP del router
-            router_configs = {r.nombre: r.ip for r in TopologyConfig.ROUTERS_CONFIG}
-            ip = router_configs.get(router, "")
-            self.create_text(x, y+40, text=ip, 
+            self.create_text(x, y+40, text=self.topology.ip(router), 
                            font=("Arial", 9), fill="gray",
                            tags=("router_ip", f"ip_{router}"))
             
             # Estado del router (texto)
-            status_text = "●" if self.status_colors.get(router) == "connected" else "●"
-            self.create_text(x, y, text=status_text, 
-                           font=("Arial", 16), fill="white",
-                           tags=("router_status", f"status_{router}"))
+            status = self.create_text(x, y, text="●", 
+                                      font=("Arial", 16), fill="white",
+                                      tags=("router_status", f"status_{router}"))
+            
+            self.router_items[router] = {"oval": oval, "inner": inner, "status": status,
+                                         "color": color}
+    
+    def _draw_router_markers(self):
+        """Dibuja cada router como un círculo simple (topologías grandes)."""
+        r = self.router_radius
+        for router, (x, y) in self.router_positions.items():
+            color = self._router_color(router)
+            oval = self.create_oval(x-r, y-r, x+r, y+r, fill=color, outline="black",
+                                    tags=("router", f"router_{router}"))
+            self.router_items[router] = {"oval": oval, "inner": None, "status": None,
+                                         "color": color}
+    
+    def _bounds(self) -> Tuple[float, float, float, float]:
+        """Rectángulo que contiene todos los routers."""
+        if not self.router_positions:
+            return 0, 0, 0, 0
+        xs = [x for x, _ in self.router_positions.values()]
+        ys = [y for _, y in self.router_positions.values()]
+        return min(xs), min(ys), max(xs), max(ys)
     
     def _draw_legend(self):
         """Dibuja la leyenda explicativa."""
@@ -190,9 +328,9 @@ class NetworkTopologyCanvas(tk.Canvas):
             router: Nombre del router
             status: Nuevo estado (connected, disconnected, warning)
         """
-        if router in self.router_positions:
+        if router in self.router_positions and self.status_colors.get(router) != status:
             self.status_colors[router] = status
-            self.draw_topology()  # Redibujar para actualizar colores
+            self._schedule_refresh([router])
     
     def update_all_status(self, status_dict: Dict[str, str]):
         """
@@ -201,36 +339,515 @@ class NetworkTopologyCanvas(tk.Canvas):
         Args:
             status_dict: Diccionario con el estado de cada router
         """
+        changed = [router for router, status in status_dict.items()
+                   if router in self.router_positions and self.status_colors.get(router) != status]
         self.status_colors.update(status_dict)
-        self.draw_topology()
+        self._schedule_refresh(changed)
+    
+    def _schedule_refresh(self, routers: List[str]):
+        """
+        Marca routers para repintar y agrupa los repintados del mismo ciclo.
+        
+        Args:
+            routers: Routers cuyo estado ha cambiado
+        """
+        if not routers:
+            return
+        self._dirty.update(routers)
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self._refresh_items)
+    
+    def _refresh_items(self):
+        """Aplica los cambios pendientes solo a los elementos afectados."""
+        self._refresh_pending = False
+        dirty, self._dirty = self._dirty, set()
+        links = set()
+        
+        for router in dirty:
+            items = self.router_items.get(router)
+            if items is None:
+                continue
+            color = self._router_color(router)
+            if items["color"] != color:
+                items["color"] = color
+                self.itemconfig(items["oval"], fill=color)
+                if items["inner"] is not None:
+                    self.itemconfig(items["inner"], outline=color)
+            links.update(self.links_by_router.get(router, ()))
+        
+        for r1, r2 in links:
+            self.itemconfig(self.link_items[(r1, r2)], fill=self._link_color(r1, r2))
+    
+    def router_at(self, x: float, y: float) -> Optional[str]:
+        """
+        Devuelve el router situado en unas coordenadas del canvas.
+        
+        Args:
+            x: Coordenada x del canvas
+            y: Coordenada y del canvas
+        """
+        return self.spatial.mas_cercano(x, y, self.router_radius)
     
     def on_click(self, event):
         """Maneja clics en el canvas."""
-        # Obtener elemento clickeado
-        item = self.find_closest(event.x, event.y)[0]
-        tags = self.gettags(item)
+        router_name = self.router_at(self.canvasx(event.x), self.canvasy(event.y))
         
         # Si se clickeó un router, emitir evento
-        for tag in tags:
-            if tag.startswith("router_") and not tag.startswith("router_inner"):
-                router_name = tag.split("_")[1]
-                self.event_generate("<<RouterSelected>>", data=router_name)
-                break
+        if router_name is not None:
+            self.event_generate("<<RouterSelected>>", data=router_name)
     
     def on_mouse_motion(self, event):
         """Maneja movimiento del mouse para tooltips."""
-        item = self.find_closest(event.x, event.y)[0]
-        tags = self.gettags(item)
+        x, y = self.canvasx(event.x), self.canvasy(event.y)
+        router = self.router_at(x, y)
+        if router == self._hover_router:
+            return
+        
+        self._hover_router = router
+        for item in self._tooltip_items:
+            self.delete(item)
+        self._tooltip_items = ()
+        if router is None:
+            return
+        
+        # Tooltip con los datos del router (los atributos se interpretan aquí)
+        attributes = self.topology.attributes(router)
+        lines = [router] + [f"{key}: {value}" for key, value in attributes.items() if value]
+        rx, ry = self.router_positions[router]
+        text = self.create_text(rx + self.router_radius + 8, ry, text="\n".join(lines),
+                                font=("Arial", 9), anchor="w", tags="tooltip")
+        bx1, by1, bx2, by2 = self.bbox(text)
+        background = self.create_rectangle(bx1 - 4, by1 - 2, bx2 + 4, by2 + 2,
+                                           fill="lightyellow", outline="gray", tags="tooltip")
+        self.tag_raise(text, background)
+        self._tooltip_items = (background, text)
+
+
+class ConsoleSink:
+    """
+    Salida de consola que los hilos de trabajo pueden usar sin tocar Tk.
+    
+    Las escrituras se encolan en una cola protegida por un lock y un único
+    drenado periódico en el hilo de Tk las inserta en bloques, agrupando
+    varias entradas en cada llamada a insert y haciendo un solo see() por
+    ciclo, sin pasar del presupuesto de tiempo por fotograma. Si la cola se
+    llena, los hilos productores esperan (contrapresión) y, pasado el tiempo
+    máximo, la escritura se descarta; los descartes y las esperas se
+    notifican en la propia consola. Si el widget es una VirtualConsole, cada
+    escritura conserva su router y comando para la exportación.
+    """
+    
+    def __init__(self, widget: tk.Text, capacity: int = 20000, interval_ms: int = 30,
+                 budget_ms: float = 8.0, chunk: int = 200, max_wait: float = 0.5):
+        """
+        Inicializa la salida de consola (debe crearse en el hilo de Tk).
+        
+        Args:
+            widget: Text (o VirtualConsole) donde se insertan las escrituras
+            capacity: Entradas máximas pendientes antes de aplicar contrapresión
+            interval_ms: Periodo del drenado
+            budget_ms: Tiempo máximo de inserción por drenado
+            chunk: Entradas por llamada a insert
+            max_wait: Segundos que un productor espera con la cola llena antes de descartar
+        """
+        self.widget = widget
+        self.capacity = capacity
+        self.interval_ms = interval_ms
+        self.budget = budget_ms / 1000
+        self.chunk = chunk
+        self.max_wait = max_wait
+        
+        self._queue: deque = deque()
+        self._insert_entries = getattr(widget, "insert_entries", None)
+        self._cond = threading.Condition()
+        self._ui_thread = threading.get_ident()
+        self._job = None
+        
+        # Estadísticas (totales y pendientes de notificar)
+        self.written = 0
+        self.dropped = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self._reported = (0, 0, 0.0)
+        self._reported_at = 0.0
+    
+    def write(self, text: str, tag: str = "", router: str = "", command: str = "") -> bool:
+        """
+        Encola texto para la consola desde cualquier hilo.
+        
+        Args:
+            text: Texto a insertar
+            tag: Tag de formato del Text
+            router: Router al que se refiere el texto (opcional)
+            command: Comando que produjo el texto (opcional)
+            
+        Returns:
+            False si la escritura se descartó por saturación
+        """
+        with self._cond:
+            # El hilo de Tk nunca espera: es el que vacía la cola
+            if len(self._queue) >= self.capacity and threading.get_ident() != self._ui_thread:
+                start = time.perf_counter()
+                self._cond.wait_for(lambda: len(self._queue) < self.capacity, timeout=self.max_wait)
+                self.waits += 1
+                self.wait_time += time.perf_counter() - start
+                if len(self._queue) >= self.capacity:
+                    self.dropped += 1
+                    return False
+            self._queue.append((text, tag, (router, command) if router or command else None))
+            self.written += 1
+        return True
+    
+    def start(self):
+        """Inicia el drenado periódico."""
+        if self._job is None:
+            self._job = self.widget.after(self.interval_ms, self.drain)
+    
+    def stop(self):
+        """Detiene el drenado periódico."""
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+    
+    def discard(self):
+        """Descarta las escrituras pendientes (por ejemplo al limpiar la consola)."""
+        with self._cond:
+            self._queue.clear()
+            self._cond.notify_all()
+    
+    def pending(self) -> int:
+        """Número de escrituras pendientes de insertar."""
+        return len(self._queue)
+    
+    def drain(self):
+        """Inserta las escrituras pendientes dentro del presupuesto y se reprograma."""
+        deadline = time.perf_counter() + self.budget
+        inserted = 0
+        while True:
+            with self._cond:
+                if not self._queue:
+                    break
+                batch = [self._queue.popleft() for _ in range(min(self.chunk, len(self._queue)))]
+                self._cond.notify_all()
+            
+            if self._insert_entries:
+                self._insert_entries(batch)
+            else:
+                args = []
+                for text, tag, _ in batch:
+                    args.extend((text, tag))
+                self.widget.insert(tk.END, *args)
+            inserted += len(batch)
+            if time.perf_counter() >= deadline:
+                break
+        
+        self._report_overload()
+        if inserted:
+            self.widget.see(tk.END)
+        if self._job is not None:
+            self._job = self.widget.after(self.interval_ms, self.drain)
+    
+    def _report_overload(self):
+        """Notifica en la consola los descartes y esperas desde la última notificación."""
+        with self._cond:
+            dropped, waits, wait_time = self.dropped, self.waits, self.wait_time
+        last_dropped, last_waits, last_wait_time = self._reported
+        if dropped == last_dropped and waits == last_waits:
+            return
+        if time.monotonic() - self._reported_at < 1.0:
+            return  # como mucho un aviso por segundo
+        self._reported = (dropped, waits, wait_time)
+        self._reported_at = time.monotonic()
+        
+        message = (f"[consola saturada] {waits - last_waits} escrituras esperaron "
+                   f"{wait_time - last_wait_time:.2f}s")
+        if dropped > last_dropped:
+            message += f", {dropped - last_dropped} descartadas"
+        self.widget.insert(tk.END, message + "\n", "warning")
+        print(message)
+    
+    def stats(self) -> Dict[str, float]:
+        """Estadísticas de la consola: escritas, descartadas, esperas y pendientes."""
+        with self._cond:
+            return {"written": self.written, "dropped": self.dropped, "waits": self.waits,
+                    "wait_time": self.wait_time, "pending": len(self._queue)}
+
+
+class VirtualConsole(tk.Frame):
+    """
+    Consola virtualizada sobre un SegmentLog en disco.
+    
+    Todo lo escrito se añade al log y el Text solo contiene las líneas
+    visibles más un margen por encima y por debajo. La barra de
+    desplazamiento representa el log completo; al acercarse al borde del
+    margen, el Text se rellena con las líneas leídas del log. Mientras la
+    vista está al final, la salida nueva se inserta directamente y se
+    recortan las líneas que quedan por encima del margen.
+    
+    Ofrece insert, see y after como un Text, de modo que ConsoleSink
+    escribe en ella sin cambios.
+    """
+    
+    MARGIN = 200  # Líneas renderizadas por encima y por debajo de las visibles
+    
+    def __init__(self, parent, log: Optional[SegmentLog] = None, **text_options):
+        """
+        Inicializa la consola.
+        
+        Args:
+            parent: Widget padre
+            log: Log donde se guarda la salida (por defecto uno temporal)
+            **text_options: Opciones del Text (wrap, height, font...)
+        """
+        super().__init__(parent)
+        self.log = log or SegmentLog()
+        
+        self.text = tk.Text(self, yscrollcommand=self._on_text_scroll, **text_options)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.text.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+        self.text.tag_configure("search_match", background="yellow")
+        self._font = tkfont.Font(font=self.text.cget("font"))
+        
+        # Ventana renderizada: líneas [first_line, last_line) del log
+        self.first_line = 0
+        self.last_line = 0
+        self.at_end = True  # la ventana llega al final del log y recibe la salida nueva
+        self.following = True  # la vista se mantiene al final
+        self._refill_job = None
+        self._last_search = ("", None)  # (término, línea de la última coincidencia)
+        
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.text.bind(sequence, self._on_wheel)
+        self.text.bind("<Prior>", lambda event: self._scroll_by(-self.visible_rows()))
+        self.text.bind("<Next>", lambda event: self._scroll_by(self.visible_rows()))
+        self.text.bind("<Control-Home>", lambda event: self.show(0) or "break")
+        self.text.bind("<Control-End>", lambda event: self.show(self.log.num_lineas) or "break")
+    
+    def tag_configure(self, *args, **kwargs):
+        """Configura un tag del Text."""
+        return self.text.tag_configure(*args, **kwargs)
+    
+    def insert(self, index, *args):
+        """
+        Añade texto al final de la consola (como Text.insert en END).
+        
+        Args:
+            index: Ignorado; la consola solo admite añadir al final
+            *args: texto, tag, texto, tag...
+        """
+        if len(args) % 2:
+            args += ("",)
+        self.insert_entries(list(zip(args[::2], args[1::2])))
+    
+    def insert_entries(self, entries: List[Tuple]):
+        """
+        Añade entradas al final de la consola.
+        
+        Args:
+            entries: Tuplas (texto, tag) o (texto, tag, (router, comando))
+        """
+        self.log.escribir(entries)
+        if not self.at_end:
+            return
+        if not self.following and self.last_line - self.first_line > self.visible_rows() + 2 * self.MARGIN:
+            # El usuario está leyendo más arriba: la ventana deja de crecer
+            self.at_end = False
+            return
+        args = []
+        for text, tag, *_ in entries:
+            args.extend((text, tag))
+        self.text.insert(tk.END, *args)
+        self.last_line = self.log.num_lineas
+    
+    def see(self, index=tk.END):
+        """Mantiene la vista al final si la está siguiendo y recorta el Text."""
+        if self.following:
+            if not self.at_end:
+                self.show(self.log.num_lineas)
+                return
+            rendered = self.last_line - self.first_line
+            keep = self.visible_rows() + self.MARGIN
+            if rendered > keep + self.MARGIN:
+                drop = rendered - keep
+                self.text.delete("1.0", f"{drop + 1}.0")
+                self.first_line += drop
+            self.text.see(tk.END)
+        self._update_scrollbar()
+    
+    def clear(self):
+        """Borra la consola y su log."""
+        self.log.limpiar()
+        self.text.delete("1.0", tk.END)
+        self.first_line = self.last_line = 0
+        self.at_end = self.following = True
+        self._last_search = ("", None)
+        self._update_scrollbar()
+    
+    def export(self, filename: str, on_done: Callable, header: str = ""):
+        """
+        Exporta la consola en segundo plano (ver run_export).
+        
+        Args:
+            filename: Archivo de destino (.txt, .jsonl, opcionalmente .gz)
+            on_done: Función llamada en el hilo de Tk con (completado, error)
+            header: Cabecera de la exportación en texto
+        """
+        run_export(self, filename,
+                   lambda: ((len(block), block) for block in self.log.bloques()),
+                   lambda: ((len(entry[4]), entry) for entry in self.log.entradas()),
+                   self.log.tamano, on_done, header)
+    
+    def close(self):
+        """Libera el log en disco."""
+        if self._refill_job is not None:
+            self.after_cancel(self._refill_job)
+            self._refill_job = None
+        self.log.cerrar()
+    
+    def visible_rows(self) -> int:
+        """Filas que caben en el Text."""
+        height = self.text.winfo_height()
+        if height <= 1:  # todavía sin dibujar
+            return int(self.text.cget("height"))
+        return max(1, height // self._font.metrics("linespace"))
+    
+    def top_line(self) -> int:
+        """Línea del log en la parte superior de la vista."""
+        return self.first_line + int(self.text.index("@0,0").split(".")[0]) - 1
+    
+    def show(self, top: int):
+        """
+        Desplaza la vista para que la línea indicada quede arriba,
+        rellenando el Text desde el log si la ventana no la cubre.
         
-        # Mostrar información del router en hover (implementar si es necesario)
-        pass
+        Args:
+            top: Línea del log
+        """
+        total = self.log.num_lineas
+        visible = self.visible_rows()
+        top = max(0, min(top, total - visible))
+        # Hace falta al menos una pantalla de margen salvo en los extremos del log
+        short_above = top - self.first_line < min(top, visible)
+        short_below = (not self.at_end
+                       and self.last_line - (top + visible) < min(total - top - visible, visible))
+        if short_above or short_below:
+            self._render(max(0, top - self.MARGIN), min(total, top + visible + self.MARGIN))
+        self.text.yview(f"{top - self.first_line + 1}.0")
+        self.following = top + visible >= total
+        self._update_scrollbar()
+    
+    def _render(self, first: int, last: int):
+        """Sustituye el contenido del Text por las líneas [first, last) del log."""
+        self.text.delete("1.0", tk.END)
+        segments = self.log.segmentos(first, last)
+        if segments:
+            self.text.insert(tk.END, *segments)
+        self.first_line, self.last_line = first, last
+        self.at_end = last >= self.log.num_lineas
+    
+    def _scroll_by(self, lines: int) -> str:
+        self.show(self.top_line() + lines)
+        return "break"
+    
+    def _on_wheel(self, event) -> str:
+        if event.num == 4:
+            lines = -3
+        elif event.num == 5:
+            lines = 3
+        else:
+            lines = -3 if event.delta > 0 else 3
+        return self._scroll_by(lines)
+    
+    def _on_scrollbar(self, action: str, amount: str, unit: str = "units"):
+        if action == "moveto":
+            self.show(int(float(amount) * self.log.num_lineas))
+        else:
+            step = self.visible_rows() if unit == "pages" else 1
+            self._scroll_by(int(amount) * step)
+    
+    def _on_text_scroll(self, first: str, last: str):
+        """El Text se desplazó por su cuenta (selección, cursor): rellena si llega al borde."""
+        self._update_scrollbar()
+        edge_above = float(first) <= 0.0 and self.first_line > 0
+        edge_below = float(last) >= 1.0 and not self.at_end
+        if (edge_above or edge_below) and self._refill_job is None:
+            self._refill_job = self.after_idle(self._refill)
+    
+    def _refill(self):
+        self._refill_job = None
+        self.show(self.top_line())
+    
+    def _update_scrollbar(self):
+        total = self.log.num_lineas
+        if not total:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        top = self.top_line()
+        self.scrollbar.set(top / total, min(1.0, (top + self.visible_rows()) / total))
+    
+    def find(self, term: str) -> bool:
+        """
+        Busca el término en el log a partir de la última coincidencia
+        (volviendo al principio al llegar al final) y lo resalta.
+        
+        Args:
+            term: Texto a buscar
+            
+        Returns:
+            True si se encontró
+        """
+        if not term:
+            return False
+        last_term, last_match = self._last_search
+        start = last_match + 1 if term == last_term and last_match is not None else 0
+        line = self.log.buscar(term, start)
+        if line is None and start:
+            line = self.log.buscar(term, 0)
+        self._last_search = (term, line)
+        self.text.tag_remove("search_match", "1.0", tk.END)
+        if line is None:
+            return False
+        
+        self.show(line - self.visible_rows() // 2)
+        row = line - self.first_line + 1
+        position = self.text.search(term, f"{row}.0", f"{row}.end", nocase=True)
+        if position:
+            self.text.tag_add("search_match", position, f"{position}+{len(term)}c")
+        return True
 
 
 class LogPanel(tk.Frame):
-    """Panel de logs con filtrado y búsqueda."""
+    """
+    Panel de logs con filtrado y búsqueda.
+    
+    Los logs se guardan en un buffer circular de capacidad fija; al llegar
+    al límite, cada log nuevo desplaza al más antiguo y del Text solo se
+    borran las líneas de ese log, de modo que añadir un log cuesta lo mismo
+    sea cual sea la duración de la sesión.
     
-    def __init__(self, parent):
-        """Inicializa el panel de logs."""
+    El filtrado usa un índice incremental (palabras, trigramas y facetas de
+    router y tipo), espera a que el usuario deje de escribir y muestra las
+    coincidencias más recientes con una sola inserción.
+    """
+    
+    DEFAULT_CAPACITY = 1000
+    FILTER_DELAY_MS = 150  # Espera tras la última tecla antes de filtrar
+    RENDER_LIMIT = 5000  # Coincidencias mostradas como máximo (las más recientes)
+    ALL = "Todos"
+    
+    def __init__(self, parent, capacity: int = DEFAULT_CAPACITY, store: Optional[ResultStore] = None):
+        """
+        Inicializa el panel de logs.
+        
+        Args:
+            parent: Widget padre
+            capacity: Número máximo de logs conservados
+            store: Historial donde se guardan también los logs (opcional)
+        """
         super().__init__(parent)
         
         # Frame superior con controles
@@ -252,6 +869,21 @@ class LogPanel(tk.Frame):
         search_entry.pack(side="left", padx=(0, 5))
         search_entry.bind("<KeyRelease>", self.filter_logs)
         
+        # Facetas: router y tipo
+        self.router_filter_var = tk.StringVar(value=self.ALL)
+        self.type_filter_var = tk.StringVar(value=self.ALL)
+        for label, var, facet in (("Router:", self.router_filter_var, "router"),
+                                  ("Tipo:", self.type_filter_var, "type")):
+            tk.Label(control_frame, text=label).pack(side="left", padx=(5, 2))
+            combo = ttk.Combobox(control_frame, textvariable=var, width=10, state="readonly")
+            combo.configure(postcommand=lambda combo=combo, facet=facet: combo.configure(
+                values=[self.ALL] + self.index.valores(facet)))
+            combo.pack(side="left", padx=(0, 5))
+            combo.bind("<<ComboboxSelected>>", lambda event: self.apply_filter())
+        
+        self.match_label = tk.Label(control_frame, text="", fg="gray")
+        self.match_label.pack(side="left", padx=(5, 0))
+        
         # Área de texto principal
         self.text_area = scrolledtext.ScrolledText(
             self, wrap=tk.WORD, height=15,
@@ -262,7 +894,13 @@ class LogPanel(tk.Frame):
         # Configurar tags para colores
         self.configure_text_tags()
         
-        self.all_logs = []  # Almacenar todos los logs para filtrado
+        self.capacity = capacity
+        self.store = store
+        self.all_logs: deque = deque(maxlen=capacity)  # Buffer circular con todos los logs
+        self.index = LogIndex(capacity)
+        self.active_filter: Tuple[str, Optional[str], Optional[str]] = ("", None, None)
+        self._displayed: deque = deque()  # (id, líneas) de los logs mostrados, en orden
+        self._filter_job = None
     
     def configure_text_tags(self):
         """Configura los tags de color para diferentes tipos de mensajes."""
@@ -272,7 +910,7 @@ class LogPanel(tk.Frame):
         self.text_area.tag_configure("error", foreground="red")
         self.text_area.tag_configure("timestamp", foreground="gray")
     
-    def add_log(self, message: str, log_type: str = "info", router: str = ""):
+    def add_log(self, message: str, log_type: str = "info", router: str = "", command: str = ""):
         """
         Añade un mensaje al log.
         
@@ -280,91 +918,125 @@ class LogPanel(tk.Frame):
             message: Mensaje a añadir
             log_type: Tipo de log (info, success, warning, error)
             router: Router relacionado (opcional)
+            command: Comando relacionado (opcional)
         """
-        timestamp = datetime.now().strftime("%H:%M:%S")
+        now = datetime.now()
+        timestamp = now.strftime("%H:%M:%S")
         router_prefix = f"[{router}] " if router else ""
         full_message = f"[{timestamp}] {router_prefix}{message}\n"
-        
-        # Almacenar en la lista completa
-        self.all_logs.append({
+        log_entry = {
             'timestamp': timestamp,
+            'time': now.timestamp(),
             'router': router,
+            'command': command,
             'message': message,
             'type': log_type,
-            'full': full_message
-        })
-        
-        # Mostrar en el área de texto
-        self.text_area.insert(tk.END, f"[{timestamp}] ", "timestamp")
-        if router:
-            self.text_area.insert(tk.END, f"[{router}] ", "info")
-        self.text_area.insert(tk.END, f"{message}\n", log_type)
-        
-        # Auto-scroll
+            'full': full_message,
+            'lines': full_message.count("\n")
+        }
+        self.all_logs.append(log_entry)
+        log_entry['id'] = self.index.agregar(log_entry)
+        if self.store:
+            self.store.guardar_log(message, log_type, router, command, log_entry['time'])
+        
+        if self._matches(log_entry):
+            self._displayed.append((log_entry['id'], log_entry['lines']))
+            self.text_area.insert(tk.END, *self._segments(log_entry))
+        
+        # El log que sale del buffer (o que supera el máximo mostrado) se
+        # borra del principio del Text si se estaba mostrando
+        while self._displayed and (self._displayed[0][0] < self.index.primero
+                                   or len(self._displayed) > self.RENDER_LIMIT):
+            _, lines = self._displayed.popleft()
+            self.text_area.delete("1.0", f"{lines + 1}.0")
         self.text_area.see(tk.END)
-        
-        # Limitar número de líneas (mantener últimas 1000)
-        if len(self.all_logs) > 1000:
-            self.all_logs = self.all_logs[-1000:]
-            self.refresh_display()
     
     def clear_logs(self):
         """Limpia todos los logs."""
         self.text_area.delete(1.0, tk.END)
         self.all_logs.clear()
+        self.index.limpiar()
+        self._displayed.clear()
+        self.match_label.config(text="")
     
     def filter_logs(self, event=None):
-        """Filtra los logs basado en el texto de búsqueda."""
-        search_term = self.search_var.get().lower()
-        
-        if not search_term:
-            self.refresh_display()
-            return
-        
-        # Limpiar y mostrar solo logs filtrados
-        self.text_area.delete(1.0, tk.END)
-        
-        for log_entry in self.all_logs:
-            if (search_term in log_entry['message'].lower() or 
-                search_term in log_entry['router'].lower()):
-                
-                self.text_area.insert(tk.END, f"[{log_entry['timestamp']}] ", "timestamp")
-                if log_entry['router']:
-                    self.text_area.insert(tk.END, f"[{log_entry['router']}] ", "info")
-                self.text_area.insert(tk.END, f"{log_entry['message']}\n", log_entry['type'])
-        
-        self.text_area.see(tk.END)
+        """Programa el filtrado cuando el usuario deja de escribir."""
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(self.FILTER_DELAY_MS, self.apply_filter)
+    
+    def apply_filter(self):
+        """Aplica el texto de búsqueda y las facetas seleccionadas."""
+        self._filter_job = None
+        router = self.router_filter_var.get()
+        log_type = self.type_filter_var.get()
+        self.active_filter = (self.search_var.get().lower(),
+                              None if router == self.ALL else router,
+                              None if log_type == self.ALL else log_type)
+        self.refresh_display()
     
     def refresh_display(self):
-        """Refresca la visualización completa de logs."""
+        """Refresca la visualización de los logs que cumplen el filtro activo."""
         self.text_area.delete(1.0, tk.END)
+        self._displayed.clear()
+        
+        search_term, router, log_type = self.active_filter
+        if search_term or router or log_type:
+            ids = self.index.buscar(search_term, router, log_type)
+            self.match_label.config(text=f"{len(ids)} coincidencias")
+        else:
+            ids = range(self.index.primero, self.index.siguiente)
+            self.match_label.config(text="")
         
-        for log_entry in self.all_logs:
-            self.text_area.insert(tk.END, f"[{log_entry['timestamp']}] ", "timestamp")
-            if log_entry['router']:
-                self.text_area.insert(tk.END, f"[{log_entry['router']}] ", "info")
-            self.text_area.insert(tk.END, f"{log_entry['message']}\n", log_entry['type'])
+        segments = []
+        for log_id in ids[-self.RENDER_LIMIT:]:
+            log_entry = self.index.entrada(log_id)
+            self._displayed.append((log_id, log_entry['lines']))
+            segments.extend(self._segments(log_entry))
+        if segments:
+            self.text_area.insert(tk.END, *segments)
         
         self.text_area.see(tk.END)
     
+    def _matches(self, log_entry: Dict) -> bool:
+        """Indica si un log cumple el filtro activo."""
+        search_term, router, log_type = self.active_filter
+        return ((router is None or log_entry['router'] == router)
+                and (log_type is None or log_entry['type'] == log_type)
+                and (not search_term or search_term in log_entry['message'].lower()
+                     or search_term in log_entry['router'].lower()))
+    
+    @staticmethod
+    def _segments(log_entry: Dict) -> List[str]:
+        """Pares (texto, tag) de un log para insertarlos en una sola llamada."""
+        segments = [f"[{log_entry['timestamp']}] ", "timestamp"]
+        if log_entry['router']:
+            segments += [f"[{log_entry['router']}] ", "info"]
+        segments += [f"{log_entry['message']}\n", log_entry['type']]
+        return segments
+    
     def export_logs(self):
-        """Exporta los logs a un archivo."""
+        """Exporta los logs a un archivo en segundo plano (texto, JSON Lines o gzip)."""
         from tkinter import filedialog
         
-        filename = filedialog.asksaveasfilename(
-            defaultextension=".txt",
-            filetypes=[("Archivos de texto", "*.txt"), ("Todos los archivos", "*.*")]
-        )
+        filename = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=EXPORT_FILETYPES)
+        if not filename:
+            return
         
-        if filename:
-            try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    for log_entry in self.all_logs:
-                        f.write(log_entry['full'])
-                
+        # Copia de las referencias: los logs nuevos no afectan a la exportación
+        entries = list(self.all_logs)
+        
+        def on_done(completed: bool, error: Optional[Exception]):
+            if error:
+                self.add_log(f"Error exportando logs: {error}", "error")
+            elif completed:
                 self.add_log(f"Logs exportados a {filename}", "success")
-            except Exception as e:
-                self.add_log(f"Error exportando logs: {e}", "error")
+        
+        run_export(self, filename,
+                   lambda: ((1, entry['full']) for entry in entries),
+                   lambda: ((1, (entry['time'], entry['router'], entry['type'],
+                                 entry['command'], entry['message'])) for entry in entries),
+                   len(entries), on_done)
 
 
 class ConfigurationDialog(tk.Toplevel):
@@ -656,4 +1328,51 @@ class ProgressDialog(tk.Toplevel):
     
     def is_cancelled(self) -> bool:
         """Verifica si la operación fue cancelada."""
-        return self.cancelled
\ No newline at end of file
+        return self.cancelled
+
+
+EXPORT_FILETYPES = [
+    ("Texto", "*.txt"),
+    ("Texto comprimido (gzip)", "*.txt.gz"),
+    ("JSON Lines", "*.jsonl"),
+    ("JSON Lines comprimido (gzip)", "*.jsonl.gz"),
+    ("Todos los archivos", "*.*"),
+]
+
+
+def run_export(parent: tk.Misc, filename: str, text: Callable, jsonl: Callable, total: int,
+               on_done: Callable, header: str = ""):
+    """
+    Exporta en un hilo aparte con log_export.exportar, mostrando el progreso
+    en un ProgressDialog que permite cancelar.
+    
+    Args:
+        parent: Widget desde el que se programan las actualizaciones
+        filename: Archivo de destino; la extensión elige el formato
+        text: Función que devuelve un iterador de (avance, texto)
+        jsonl: Función que devuelve un iterador de (avance, (instante, router, tipo, comando, mensaje))
+        total: Avance total, para el porcentaje
+        on_done: Función llamada en el hilo de Tk con (completado, error)
+        header: Cabecera (solo en texto)
+    """
+    dialog = ProgressDialog(parent, "Exportando...")
+    dialog.update_progress(0, f"Exportando a {os.path.basename(filename)}...")
+    
+    def show_progress(fraction: float):
+        parent.after(0, lambda: dialog.is_cancelled() or dialog.update_progress(fraction * 100))
+    
+    def export_thread():
+        error = None
+        try:
+            completed = exportar(filename, text, jsonl, total, show_progress, dialog.is_cancelled, header)
+        except Exception as e:
+            completed, error = False, e
+        
+        def finish():
+            if not dialog.is_cancelled():
+                dialog.destroy()
+            on_done(completed, error)
+        
+        parent.after(0, finish)
+    
+    threading.Thread(target=export_thread, daemon=True).start()
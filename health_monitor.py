@@ -0,0 +1,225 @@
+"""
+Monitor de salud concurrente y adaptativo para los routers.
+Sondea los routers en paralelo con un timeout por sonda y ajusta el
+intervalo de cada router: los estables se sondean cada vez menos y los
+que fallan o cambian de estado continuamente entran en back-off con jitter.
+Solo se notifican los routers cuyo estado ha cambiado.
+"""
+
+import heapq
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class _EstadoRouter:
+    """Estado de monitoreo de un router"""
+
+    def __init__(self, intervalo):
+        self.vivo = False
+        self.intervalo = intervalo
+        self.fallos = 0
+        self.cambios = deque()  # instantes de los últimos cambios de estado
+        self.token = 0  # identifica la sonda vigente
+        self.inicio_sonda = None
+        self.proxima = None  # instante de la próxima sonda programada
+
+
+class HealthMonitor:
+    """
+    Monitor de salud de routers.
+    routers: diccionario nombre -> router (se consulta en cada ciclo, así que
+             los routers añadidos después también se monitorizan)
+    on_change: función (nombre, vivo) llamada solo cuando cambia el estado
+    sonda: función (router) -> bool; por defecto router.verificar_conexion()
+    """
+
+    def __init__(self, routers, on_change, sonda=None, max_workers=10, timeout_sonda=15,
+                 intervalo_min=5, intervalo_max=60, backoff_max=120, factor=1.5,
+                 jitter=0.2, ventana_flap=120, umbral_flap=3):
+        self.routers = routers
+        self.on_change = on_change
+        self.sonda = sonda or (lambda router: router.conectado and router.verificar_conexion())
+        self.max_workers = max_workers
+        self.timeout_sonda = timeout_sonda
+        self.intervalo_min = intervalo_min
+        self.intervalo_max = intervalo_max
+        self.backoff_max = backoff_max
+        self.factor = factor
+        self.jitter = jitter
+        self.ventana_flap = ventana_flap
+        self.umbral_flap = umbral_flap
+
+        self.activo = False
+        self._estados = {}
+        self._heap = []  # (instante, nombre)
+        self._cond = threading.Condition()
+        self._executor = None
+        self._thread = None
+
+    def iniciar(self):
+        """Arranca el planificador de sondas"""
+        if self.activo:
+            return self
+        self.activo = True
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="health-probe")
+        self._thread = threading.Thread(target=self._planificador, daemon=True,
+                                        name="health-monitor")
+        self._thread.start()
+        return self
+
+    def detener(self):
+        """Detiene el monitor sin esperar a las sondas en curso"""
+        with self._cond:
+            self.activo = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=2)
+        if self._executor:
+            self._executor.shutdown(wait=False)
+
+    def actualizar_estado(self, nombre, vivo):
+        """
+        Informa de un cambio de estado conocido desde fuera (conexión o
+        desconexión manual) y programa una sonda de confirmación
+        """
+        with self._cond:
+            estado = self._obtener_estado(nombre)
+            estado.vivo = vivo
+            estado.fallos = 0
+            estado.intervalo = self.intervalo_min
+            self._programar(nombre, self.intervalo_min)
+
+    def sondear_ahora(self, nombres=None):
+        """Adelanta la sonda de los routers indicados (todos por defecto)"""
+        with self._cond:
+            for nombre in (self.routers if nombres is None else nombres):
+                self._obtener_estado(nombre)
+                self._programar(nombre, 0)
+
+    def estado(self, nombre):
+        """Último estado conocido de un router (True si está vivo)"""
+        estado = self._estados.get(nombre)
+        return bool(estado and estado.vivo)
+
+    def _planificador(self):
+        """Bucle principal: lanza sondas vencidas y aplica timeouts"""
+        while True:
+            with self._cond:
+                if not self.activo:
+                    return
+                self._registrar_nuevos()
+                ahora = time.monotonic()
+                vencidos = self._expirar_sondas(ahora)
+
+                lanzar = []
+                while self._heap and self._heap[0][0] <= ahora:
+                    instante, nombre = heapq.heappop(self._heap)
+                    estado = self._estados.get(nombre)
+                    if estado is None or nombre not in self.routers or instante != estado.proxima:
+                        continue  # router eliminado o entrada reprogramada
+                    if estado.inicio_sonda is not None:
+                        continue  # ya hay una sonda en curso
+                    estado.token += 1
+                    estado.inicio_sonda = ahora
+                    lanzar.append((nombre, estado.token))
+
+                espera = self._heap[0][0] - ahora if self._heap else 1.0
+                if not lanzar and not vencidos:
+                    self._cond.wait(timeout=max(0.05, min(espera, 1.0)))
+
+            for nombre in vencidos:
+                self._notificar(nombre, False)
+            for nombre, token in lanzar:
+                try:
+                    self._executor.submit(self._ejecutar_sonda, nombre, token)
+                except RuntimeError:
+                    return  # executor detenido
+
+    def _ejecutar_sonda(self, nombre, token):
+        """Ejecuta la sonda de un router en un hilo del pool"""
+        router = self.routers.get(nombre)
+        try:
+            vivo = bool(router is not None and self.sonda(router))
+        except Exception as e:
+            print(f"Error sondeando {nombre}: {e}")
+            vivo = False
+
+        with self._cond:
+            estado = self._estados.get(nombre)
+            if estado is None or estado.token != token or estado.inicio_sonda is None:
+                return  # la sonda expiró por timeout; su resultado ya no cuenta
+            estado.inicio_sonda = None
+            cambio = self._aplicar_resultado(nombre, estado, vivo)
+            self._cond.notify_all()
+
+        if cambio:
+            self._notificar(nombre, vivo)
+
+    def _expirar_sondas(self, ahora):
+        """Marca como caídos los routers cuya sonda superó el timeout"""
+        vencidos = []
+        for nombre, estado in self._estados.items():
+            if estado.inicio_sonda is not None and ahora - estado.inicio_sonda > self.timeout_sonda:
+                estado.inicio_sonda = None
+                print(f"Timeout sondeando {nombre} ({self.timeout_sonda}s)")
+                if self._aplicar_resultado(nombre, estado, False):
+                    vencidos.append(nombre)
+        return vencidos
+
+    def _aplicar_resultado(self, nombre, estado, vivo):
+        """Actualiza el estado y reprograma la siguiente sonda; devuelve si hubo cambio"""
+        ahora = time.monotonic()
+        cambio = vivo != estado.vivo
+        estado.vivo = vivo
+
+        if cambio:
+            estado.cambios.append(ahora)
+        while estado.cambios and ahora - estado.cambios[0] > self.ventana_flap:
+            estado.cambios.popleft()
+
+        if vivo:
+            estado.fallos = 0
+            estado.intervalo = (self.intervalo_min if cambio
+                                else min(estado.intervalo * self.factor, self.intervalo_max))
+        else:
+            estado.fallos += 1
+            estado.intervalo = min(self.intervalo_min * 2 ** estado.fallos, self.backoff_max)
+
+        # Router inestable: back-off según el número de cambios recientes
+        if len(estado.cambios) >= self.umbral_flap:
+            estado.intervalo = max(estado.intervalo,
+                                   min(self.intervalo_min * 2 ** len(estado.cambios),
+                                       self.backoff_max))
+
+        self._programar(nombre, estado.intervalo * random.uniform(1 - self.jitter, 1 + self.jitter))
+        return cambio
+
+    def _registrar_nuevos(self):
+        """Incorpora routers añadidos al diccionario después de iniciar"""
+        for nombre in list(self.routers):
+            if nombre not in self._estados:
+                self._obtener_estado(nombre)
+                # Repartir la primera sonda para no sondear todo a la vez
+                self._programar(nombre, random.uniform(0, self.intervalo_min * self.jitter))
+
+    def _obtener_estado(self, nombre):
+        estado = self._estados.get(nombre)
+        if estado is None:
+            estado = self._estados[nombre] = _EstadoRouter(self.intervalo_min)
+        return estado
+
+    def _programar(self, nombre, retraso):
+        instante = time.monotonic() + retraso
+        self._estados[nombre].proxima = instante
+        heapq.heappush(self._heap, (instante, nombre))
+        self._cond.notify_all()
+
+    def _notificar(self, nombre, vivo):
+        try:
+            self.on_change(nombre, vivo)
+        except Exception as e:
+            print(f"Error notificando el estado de {nombre}: {e}")
@@ -0,0 +1,269 @@
+"""
+Utilidades para configuraciones Cisco IOS.
+Reconstruye la jerarquía de secciones (interface, router, policy-map...) de
+una plantilla plana o de la running-config, calcula qué líneas de una
+plantilla faltan en el router y genera los comandos necesarios para
+deshacer un cambio respecto a la configuración previa.
+"""
+
+import re
+
+
+# Comandos que abren una sección de primer nivel
+SECCIONES = (
+    "interface", "router", "ip dhcp pool", "policy-map", "class-map", "line",
+    "ip access-list", "ipv6 access-list", "route-map", "vlan", "controller",
+    "key chain", "crypto isakmp policy", "crypto map", "crypto pki trustpoint",
+    "ip vrf", "vrf definition", "archive", "control-plane", "track",
+    "object-group", "zone-pair", "parameter-map", "ipv6 router",
+)
+
+# Subsecciones de segundo nivel dentro de cada tipo de sección
+SUBSECCIONES = {
+    "policy-map": ("class",),
+    "router bgp": ("address-family",),
+    "key chain": ("key",),
+    "vrf definition": ("address-family",),
+}
+
+# Comandos globales: al escribirlos dentro de una sección IOS vuelve al modo global
+GLOBALES = (
+    "access-list", "ip nat", "ip route", "ip dhcp excluded-address", "snmp-server",
+    "hostname", "service", "logging", "ntp", "banner", "username", "enable",
+    "ip domain", "ip domain-name", "ip domain-lookup", "ip name-server", "ip http",
+    "ip ssh", "ip cef", "ip routing", "ipv6 unicast-routing", "ipv6 route",
+    "spanning-tree", "vtp", "aaa", "clock", "boot", "cdp run", "lldp run",
+)
+
+# Comandos de valor único: aplicar uno nuevo sustituye al anterior
+VALOR_UNICO = (
+    "hostname", "description", "ip address", "bandwidth", "mtu", "speed", "duplex",
+    "router-id", "lease", "default-router", "domain-name", "clock rate",
+    "service-policy input", "service-policy output", "priority", "encapsulation",
+)
+
+# Comandos cuya forma negada IOS no muestra: si X no aparece en la
+# running-config, 'no X' ya está en vigor (una interfaz activa no lleva
+# 'no shutdown'). Las demás negaciones sí aparecen ('no cdp run'), y las
+# funciones activas por defecto (cdp run, ip domain-lookup) no se muestran
+NEGACION_IMPLICITA = ("shutdown",)
+
+# Marcas de error en la salida de configuración de IOS
+ERRORES_IOS = (
+    "% Invalid input", "% Incomplete command", "% Ambiguous command",
+    "% Unknown command", "% Error", "%Error",
+)
+
+_ACL_NUMERADA = re.compile(r"^access-list (\d+) ")
+
+
+def normalizar_linea(linea):
+    """Colapsa espacios para comparar líneas de configuración"""
+    return " ".join(linea.split())
+
+
+def _empieza(texto, prefijo):
+    """Compara por palabras completas: 'router' no coincide con 'router-id'"""
+    return texto == prefijo or texto.startswith(prefijo + " ")
+
+
+def es_seccion(texto):
+    return any(_empieza(texto, prefijo) for prefijo in SECCIONES)
+
+
+def es_subseccion(seccion, texto):
+    return any(_empieza(seccion, padre) and any(_empieza(texto, hijo) for hijo in hijos)
+               for padre, hijos in SUBSECCIONES.items())
+
+
+def es_global(texto):
+    if _empieza(texto, "no"):
+        texto = texto[3:]
+    return any(_empieza(texto, prefijo) for prefijo in GLOBALES)
+
+
+def jerarquizar_plantilla(comandos):
+    """
+    Convierte una lista plana de comandos en rutas jerárquicas
+    Ej.: ["ip dhcp pool A", "lease 7"] -> [("ip dhcp pool A",), ("ip dhcp pool A", "lease 7")]
+    """
+    rutas = []
+    pila = []
+    for linea in comandos:
+        texto = normalizar_linea(linea)
+        if not texto or texto.startswith("!"):
+            continue
+        if texto == "exit":
+            pila = pila[:-1]
+            continue
+        if texto == "end":
+            pila = []
+            continue
+
+        if es_seccion(texto):
+            pila = [texto]
+        elif pila and es_subseccion(pila[0], texto):
+            pila = [pila[0], texto]
+        elif pila and not es_global(texto):
+            rutas.append(tuple(pila) + (texto,))
+            continue
+        else:
+            pila = []
+            rutas.append((texto,))
+            continue
+        rutas.append(tuple(pila))
+    return rutas
+
+
+def parsear_running(texto):
+    """
+    Convierte la running-config (indentada) en la lista ordenada de rutas
+    """
+    rutas = []
+    pila = []  # (indentación, línea)
+    for linea in (texto or "").splitlines():
+        if not linea.strip() or linea.strip().startswith("!"):
+            continue
+        indentacion = len(linea) - len(linea.lstrip(" "))
+        contenido = normalizar_linea(linea)
+        if indentacion == 0 and (contenido.startswith("Building configuration")
+                                 or contenido.startswith("Current configuration")
+                                 or contenido == "end"):
+            continue
+        while pila and pila[-1][0] >= indentacion:
+            pila.pop()
+        pila.append((indentacion, contenido))
+        rutas.append(tuple(c for _, c in pila))
+    return rutas
+
+
+def emitir_comandos(rutas):
+    """
+    Genera la secuencia de comandos para aplicar las rutas en orden,
+    entrando en las secciones necesarias y saliendo con 'exit' entre ellas
+    """
+    comandos = []
+    contexto = ()
+    for ruta in rutas:
+        padres = ruta[:-1]
+        comun = 0
+        while comun < min(len(contexto), len(padres)) and contexto[comun] == padres[comun]:
+            comun += 1
+        comandos.extend(["exit"] * (len(contexto) - comun))
+        comandos.extend(padres[comun:])
+        comandos.append(ruta[-1])
+        contexto = ruta if _abre_seccion(ruta) else padres
+    return comandos  # el 'end' final lo envía el motor de configuración
+
+
+def _abre_seccion(ruta):
+    if len(ruta) == 1:
+        return es_seccion(ruta[0])
+    return len(ruta) == 2 and es_subseccion(ruta[0], ruta[1])
+
+
+def contiene_errores(salida):
+    """Indica si la salida de configuración contiene mensajes de error de IOS"""
+    return any(error in (salida or "") for error in ERRORES_IOS)
+
+
+def calcular_delta(comandos, running):
+    """
+    Devuelve los comandos de la plantilla que faltan o difieren en la
+    running-config, con las secciones necesarias para aplicarlos.
+    Una lista vacía indica que el router ya cumple la plantilla.
+    """
+    existentes = set(parsear_running(running))
+    rutas = []
+    for ruta in jerarquizar_plantilla(comandos):
+        hoja = ruta[-1]
+        if _empieza(hoja, "no"):
+            # X puede estar activo por defecto sin aparecer en la running-config:
+            # 'no X' se envía salvo que ya esté en vigor (reenviarlo no cambia nada)
+            if not _negacion_vigente(ruta, existentes):
+                rutas.append(ruta)
+        elif ruta not in existentes:
+            rutas.append(ruta)
+
+    # Las secciones ya presentes se emiten solo si hay líneas que añadir dentro
+    return emitir_comandos([ruta for ruta in rutas
+                            if not (_abre_seccion(ruta) and ruta in existentes)])
+
+
+def generar_rollback(comandos, running_previa):
+    """
+    Genera los comandos que devuelven el router a running_previa tras
+    aplicar 'comandos'. Solo se deshace lo que la plantilla cambió:
+    - secciones nuevas se eliminan enteras ('no interface Loopback1')
+    - líneas nuevas dentro de secciones existentes se niegan
+    - comandos de valor único recuperan su valor anterior
+    - ACL numeradas existentes se reconstruyen ('no access-list N' + entradas previas)
+    - 'no X' se deshace reponiendo X salvo que 'no X' ya estuviera en vigor
+      (X puede estar activo por defecto y no aparecer en la running-config)
+    Las líneas se deshacen en orden inverso al de la plantilla: lo que usa
+    una sección (service-policy en una interfaz, class dentro de un
+    policy-map) se retira antes de eliminar la sección, como exige IOS.
+    """
+    previas = parsear_running(running_previa)
+    existentes = set(previas)
+    rutas = []
+    acls_restaurar = []
+    plantilla = jerarquizar_plantilla(comandos)
+    secciones_eliminadas = {ruta for ruta in plantilla
+                            if not _empieza(ruta[-1], "no") and ruta not in existentes and _abre_seccion(ruta)}
+
+    for ruta in reversed(plantilla):
+        hoja = ruta[-1]
+        padres = ruta[:-1]
+        if any(ruta[:i] in secciones_eliminadas for i in range(1, len(ruta))):
+            continue  # se elimina con su sección
+
+        if _empieza(hoja, "no"):
+            if not _negacion_vigente(ruta, existentes):
+                rutas.append(padres + (hoja[3:],))
+            continue
+
+        if ruta in existentes:
+            continue
+
+        acl = _ACL_NUMERADA.match(hoja) if not padres else None
+        if acl:
+            numero = acl.group(1)
+            if numero not in acls_restaurar:
+                acls_restaurar.append(numero)
+            continue
+
+        if ruta in secciones_eliminadas:
+            rutas.append(padres + ("no " + hoja,))
+            continue
+
+        anterior = _valor_anterior(ruta, previas)
+        rutas.append(anterior if anterior else padres + ("no " + hoja,))
+
+    for numero in acls_restaurar:
+        rutas.append(("no access-list " + numero,))
+        rutas.extend(r for r in previas if len(r) == 1 and r[0].startswith(f"access-list {numero} "))
+
+    return emitir_comandos(rutas)
+
+
+def _negacion_vigente(ruta, existentes):
+    """
+    Indica si la línea 'no X' de la ruta ya está en vigor en la configuración:
+    aparece literalmente o, para NEGACION_IMPLICITA, X no aparece
+    """
+    if ruta in existentes:
+        return True
+    original = ruta[-1][3:]
+    return (any(_empieza(original, c) for c in NEGACION_IMPLICITA)
+            and ruta[:-1] + (original,) not in existentes)
+
+
+def _valor_anterior(ruta, previas):
+    """Para comandos de valor único, devuelve la ruta previa del mismo comando"""
+    hoja = ruta[-1]
+    prefijo = next((p for p in VALOR_UNICO if _empieza(hoja, p)), None)
+    if prefijo is None:
+        return None
+    padres = ruta[:-1]
+    return next((r for r in previas if r[:-1] == padres and _empieza(r[-1], prefijo)), None)
@@ -0,0 +1,113 @@
+"""
+Planificador único de keepalives para todas las sesiones SSH.
+Sustituye al hilo por conexión: un solo hilo mantiene un heap con el
+instante en que cada sesión cumpliría keepalive_interval sin actividad y
+solo envía el keepalive si la sesión sigue inactiva en ese momento.
+
+Coordinación con el monitor de salud: ambos se basan en ultima_actividad
+de la conexión. Cualquier comando o sonda real reinicia el contador del
+keepalive, y como keepalive_interval < umbral_inactividad, las sondas del
+monitor se resuelven con la comprobación del transporte sin enviar nada.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class KeepaliveScheduler:
+    """Planificador de keepalives basado en un heap de temporizadores"""
+
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self._heap = []  # (instante, secuencia, conexion)
+        self._registradas = {}  # id(conexion) -> secuencia vigente
+        self._secuencia = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._executor = None
+
+    def registrar(self, conexion):
+        """Añade una sesión; su primer keepalive se calcula desde su última actividad"""
+        with self._cond:
+            self._asegurar_hilo()
+            self._programar(conexion, conexion.ultima_actividad + conexion.keepalive_interval)
+
+    def cancelar(self, conexion):
+        """Retira una sesión del planificador"""
+        with self._cond:
+            self._registradas.pop(id(conexion), None)
+            self._cond.notify_all()
+
+    def sesiones(self):
+        """Número de sesiones registradas"""
+        return len(self._registradas)
+
+    def _programar(self, conexion, instante):
+        secuencia = next(self._secuencia)
+        self._registradas[id(conexion)] = secuencia
+        heapq.heappush(self._heap, (instante, secuencia, conexion))
+        self._cond.notify_all()
+
+    def _asegurar_hilo(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="keepalive")
+            self._thread = threading.Thread(target=self._bucle, daemon=True,
+                                            name="keepalive-scheduler")
+            self._thread.start()
+
+    def _bucle(self):
+        """Espera al siguiente vencimiento y despacha los keepalives necesarios"""
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+
+                instante, secuencia, conexion = self._heap[0]
+                espera = instante - time.monotonic()
+                if espera > 0:
+                    self._cond.wait(timeout=espera)
+                    continue
+
+                heapq.heappop(self._heap)
+                if self._registradas.get(id(conexion)) != secuencia:
+                    continue  # sesión cancelada o reprogramada
+
+                # La sesión se usó después de programar el keepalive: aplazarlo
+                proximo = conexion.ultima_actividad + conexion.keepalive_interval
+                if proximo > time.monotonic():
+                    self._programar(conexion, proximo)
+                    continue
+
+                # Retirar mientras el keepalive está en curso para no duplicarlo
+                del self._registradas[id(conexion)]
+
+            self._executor.submit(self._ejecutar, conexion, secuencia)
+
+    def _ejecutar(self, conexion, secuencia):
+        """Envía el keepalive y vuelve a programar la sesión si sigue activa"""
+        try:
+            conexion._enviar_keepalive()
+        except Exception as e:
+            print(f"Error en keepalive de {conexion.nombre}: {e}")
+
+        with self._cond:
+            # Una reconexión puede haber registrado ya la sesión de nuevo
+            if conexion.keepalive_activo and id(conexion) not in self._registradas:
+                self._programar(conexion, conexion.ultima_actividad + conexion.keepalive_interval)
+
+
+_planificador = None
+_planificador_lock = threading.Lock()
+
+
+def planificador_keepalive():
+    """Devuelve el planificador compartido por todas las conexiones"""
+    global _planificador
+    with _planificador_lock:
+        if _planificador is None:
+            _planificador = KeepaliveScheduler()
+        return _planificador
@@ -0,0 +1,98 @@
+"""
+Exportación por flujo de la consola y de los logs.
+
+El formato se deduce de la extensión del archivo: .jsonl escribe una línea
+JSON por entrada (instante, router, tipo, comando y mensaje) y cualquier
+otra extensión escribe texto plano; si además termina en .gz, la salida se
+comprime con gzip. Las entradas se leen de un iterador y se escriben en
+bloques, de modo que la exportación no necesita tener todo en memoria y
+puede ejecutarse en un hilo aparte informando del progreso.
+"""
+
+import gzip
+import json
+import os
+import time
+from datetime import datetime
+
+
+BLOQUE_ESCRITURA = 1024 * 1024  # bytes acumulados antes de cada escritura
+INTERVALO_PROGRESO = 0.1  # segundos mínimos entre avisos de progreso
+NIVEL_GZIP = 6
+
+
+def formato_de(ruta):
+    """Devuelve (formato, comprimido) según la extensión: formato 'jsonl' o 'txt'"""
+    base, extension = os.path.splitext(ruta.lower())
+    comprimido = extension == ".gz"
+    if comprimido:
+        extension = os.path.splitext(base)[1]
+    return ("jsonl" if extension == ".jsonl" else "txt"), comprimido
+
+
+def entrada_jsonl(instante, router, tipo, comando, mensaje):
+    """Línea JSON (con salto de línea) de una entrada"""
+    return json.dumps({
+        "timestamp": datetime.fromtimestamp(instante).isoformat(timespec="milliseconds"),
+        "router": router,
+        "type": tipo,
+        "command": comando,
+        "message": mensaje,
+    }, ensure_ascii=False) + "\n"
+
+
+def exportar(ruta, texto, jsonl, total, progreso=None, cancelado=None, cabecera=""):
+    """
+    Escribe la exportación en bloques.
+    texto y jsonl son funciones sin argumentos que devuelven un iterador de
+    (avance, datos): para texto, datos es str o bytes; para jsonl, una
+    tupla (instante, router, tipo, comando, mensaje). Solo se llama a la del
+    formato elegido. avance son las unidades de 'total' que representa cada
+    elemento, para el progreso.
+    progreso(fraccion) se llama como mucho cada INTERVALO_PROGRESO segundos
+    y cancelado() se consulta antes de cada bloque; si devuelve True, o si
+    la lectura lanza una excepción, se borra el archivo a medias.
+    Devuelve True si se completó
+    """
+    formato, comprimido = formato_de(ruta)
+    abrir = (lambda: gzip.open(ruta, "wb", compresslevel=NIVEL_GZIP)) if comprimido else (lambda: open(ruta, "wb"))
+    hecho = 0
+    ultimo_aviso = 0.0
+    try:
+        with abrir() as archivo:
+            pendiente, tamano = [], 0
+            if cabecera and formato == "txt":
+                pendiente.append(cabecera.encode("utf-8"))
+            for avance, datos in (jsonl() if formato == "jsonl" else texto()):
+                if formato == "jsonl":
+                    datos = entrada_jsonl(*datos)
+                if isinstance(datos, str):
+                    datos = datos.encode("utf-8")
+                pendiente.append(datos)
+                tamano += len(datos)
+                hecho += avance
+                if tamano < BLOQUE_ESCRITURA:
+                    continue
+
+                if cancelado and cancelado():
+                    break
+                archivo.write(b"".join(pendiente))
+                pendiente, tamano = [], 0
+                if progreso and time.monotonic() - ultimo_aviso >= INTERVALO_PROGRESO:
+                    ultimo_aviso = time.monotonic()
+                    progreso(min(1.0, hecho / total) if total else 1.0)
+            else:
+                archivo.write(b"".join(pendiente))
+                if progreso:
+                    progreso(1.0)
+                return True
+    except Exception:
+        # Un error a medias (p. ej. la consola se limpió) no deja un archivo incompleto
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
+        raise
+
+    os.remove(ruta)
+    return False
@@ -0,0 +1,189 @@
+"""
+Índice de búsqueda incremental para los logs.
+
+Cada log se divide en palabras (en minúsculas, separadas por espacios) y se
+guarda su identificador en la lista de cada palabra; el vocabulario se
+indexa a su vez por trigramas, de modo que una búsqueda por subcadena solo
+revisa las palabras que contienen todos los trigramas del término y los
+logs de esas palabras. El router y el tipo de cada log son facetas con su
+propia lista de identificadores.
+
+Los identificadores son consecutivos y el índice tiene la misma capacidad
+que el buffer circular de logs: los logs que salen del buffer se descartan
+de las listas de forma perezosa y las listas se compactan cada 'capacidad'
+logs nuevos, así que añadir un log cuesta O(palabras) amortizado.
+
+Si un término contiene al anterior (el usuario sigue escribiendo) y las
+facetas no cambian, la búsqueda parte de los resultados anteriores.
+"""
+
+from array import array
+from bisect import bisect_left
+
+
+# Con más resultados previos que estos, se comparan con los candidatos del índice
+REUTILIZAR_HASTA = 10000
+
+
+class LogIndex:
+    """Índice por palabras, trigramas y facetas de los últimos 'capacidad' logs"""
+
+    def __init__(self, capacidad):
+        self.capacidad = capacidad
+        self.limpiar()
+
+    def limpiar(self):
+        self._entradas = [None] * self.capacidad  # buffer circular id % capacidad -> log
+        self._claves = [""] * self.capacidad  # texto de búsqueda (mensaje y router en minúsculas)
+        self.siguiente = 0  # identificador del próximo log
+        self._palabras = {}  # palabra -> array de ids (ascendentes)
+        self._trigramas = {}  # trigrama -> conjunto de palabras que lo contienen
+        self._facetas = {"router": {}, "type": {}}  # faceta -> valor -> array de ids
+        self._compactado = 0
+        self._ultima = None  # (termino, router, tipo, siguiente, ids) de la última búsqueda
+
+    @property
+    def primero(self):
+        """Identificador del log más antiguo que sigue en el índice"""
+        return max(0, self.siguiente - self.capacidad)
+
+    def __len__(self):
+        return self.siguiente - self.primero
+
+    def agregar(self, entrada):
+        """
+        Indexa un log (diccionario con 'message', 'router' y 'type')
+        Devuelve su identificador
+        """
+        identificador = self.siguiente
+        mensaje, router = entrada["message"].lower(), entrada["router"].lower()
+        self._entradas[identificador % self.capacidad] = entrada
+        self._claves[identificador % self.capacidad] = f"{mensaje}\0{router}"
+        self.siguiente += 1
+
+        palabras = set(mensaje.split())
+        if router:
+            palabras.add(router)
+        for palabra in palabras:
+            ids = self._palabras.get(palabra)
+            if ids is None:
+                ids = self._palabras[palabra] = array("q")
+                for trigrama in _trigramas(palabra):
+                    self._trigramas.setdefault(trigrama, set()).add(palabra)
+            ids.append(identificador)
+
+        for faceta, valores in self._facetas.items():
+            valores.setdefault(entrada[faceta], array("q")).append(identificador)
+
+        if self.siguiente - self._compactado >= self.capacidad:
+            self._compactar()
+        return identificador
+
+    def entrada(self, identificador):
+        return self._entradas[identificador % self.capacidad]
+
+    def valores(self, faceta):
+        """Valores presentes de una faceta ('router' o 'type')"""
+        primero = self.primero
+        return sorted(valor for valor, ids in self._facetas[faceta].items() if ids and ids[-1] >= primero)
+
+    def buscar(self, termino="", router=None, tipo=None):
+        """
+        Identificadores (ascendentes) de los logs cuyo mensaje o router
+        contienen el término (sin distinguir mayúsculas) y que coinciden con
+        las facetas indicadas (None = cualquiera)
+        """
+        termino = termino.lower()
+        primero = self.primero
+        anterior = self._ultima
+        candidatos = None
+        verificar = termino
+        if anterior and anterior[0] and anterior[0] in termino and anterior[1:3] == (router, tipo):
+            # Búsqueda más estrecha: basta revisar los resultados anteriores y los logs nuevos
+            candidatos = [i for i in anterior[4] if i >= primero]
+            candidatos.extend(range(max(anterior[3], primero), self.siguiente))
+        if candidatos is None or len(candidatos) > REUTILIZAR_HASTA:
+            indexados, exactos = self._candidatos(termino, router, tipo, primero)
+            if candidatos is None or len(indexados) < len(candidatos):
+                candidatos, verificar = indexados, "" if exactos else termino
+
+        ids = self._filtrar(candidatos, verificar, router, tipo)
+        self._ultima = (termino, router, tipo, self.siguiente, ids)
+        return ids
+
+    def _filtrar(self, candidatos, termino, router, tipo):
+        """Candidatos que contienen el término y coinciden con las facetas"""
+        capacidad = self.capacidad
+        if termino:
+            claves = self._claves
+            ids = [i for i in candidatos if termino in claves[i % capacidad]]
+        else:
+            ids = list(candidatos)
+        entradas = self._entradas
+        if router is not None:
+            ids = [i for i in ids if entradas[i % capacidad]["router"] == router]
+        if tipo is not None:
+            ids = [i for i in ids if entradas[i % capacidad]["type"] == tipo]
+        return ids
+
+    def _candidatos(self, termino, router, tipo, primero):
+        """
+        Identificadores que pueden coincidir, según la lista más selectiva.
+        Devuelve (candidatos, exactos): exactos indica que todos contienen el
+        término, porque es una sola palabra y los candidatos salen de las
+        palabras que la contienen
+        """
+        listas = []
+        if router is not None:
+            listas.append([self._facetas["router"].get(router, array("q"))])
+        if tipo is not None:
+            listas.append([self._facetas["type"].get(tipo, array("q"))])
+        palabras = termino.split()
+        for palabra in palabras:
+            listas.append([self._palabras[p] for p in self._palabras_con(palabra)])
+        if not listas:
+            return range(primero, self.siguiente), False
+
+        # Unión de las listas de la condición con menos identificadores
+        mejor = min(listas, key=lambda grupo: sum(len(ids) for ids in grupo))
+        exactos = palabras == [termino] and mejor is listas[-1]
+        if len(mejor) == 1:
+            ids = mejor[0]
+            return ids[bisect_left(ids, primero):], exactos
+        candidatos = set()
+        for ids in mejor:
+            candidatos.update(ids[bisect_left(ids, primero):])
+        return sorted(candidatos), exactos
+
+    def _palabras_con(self, fragmento):
+        """Palabras del vocabulario que contienen el fragmento"""
+        trigramas = _trigramas(fragmento)
+        if not trigramas:
+            return [palabra for palabra in self._palabras if fragmento in palabra]
+        conjuntos = sorted((self._trigramas.get(t, ()) for t in trigramas), key=len)
+        posibles = set(conjuntos[0]).intersection(*conjuntos[1:])
+        return [palabra for palabra in posibles if fragmento in palabra]
+
+    def _compactar(self):
+        """Elimina de las listas los logs que ya salieron del buffer"""
+        primero = self.primero
+        for palabra in list(self._palabras):
+            ids = self._palabras[palabra]
+            del ids[:bisect_left(ids, primero)]
+            if not ids:
+                del self._palabras[palabra]
+                for trigrama in _trigramas(palabra):
+                    palabras = self._trigramas[trigrama]
+                    palabras.discard(palabra)
+                    if not palabras:
+                        del self._trigramas[trigrama]
+        for valores in self._facetas.values():
+            for valor in list(valores):
+                del valores[valor][:bisect_left(valores[valor], primero)]
+                if not valores[valor]:
+                    del valores[valor]
+        self._compactado = self.siguiente
+
+
+def _trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
@@ -1,21 +1,30 @@
+import argparse
+import contextlib
+import importlib.util
+import json
 import sys
 import os
+from datetime import datetime
 
 # Verificar versión de Python
 if sys.version_info < (3, 6):
     print("Error: Se requiere Python 3.6 o superior")
     sys.exit(1)
 
-def check_dependencies():
-    """Verifica que las dependencias estén instaladas"""
-    required_modules = ['netmiko', 'tkinter']
-    missing_modules = []
-    
-    for module in required_modules:
-        try:
-            __import__(module)
-        except ImportError:
-            missing_modules.append(module)
+# Códigos de salida del modo batch
+EXIT_OK = 0  # todos los routers respondieron
+EXIT_ERROR = 1  # error general (inventario, dependencias, routers desconocidos)
+EXIT_USAGE = 2  # argumentos no válidos (argparse)
+EXIT_PARTIAL = 3  # algunos routers fallaron
+EXIT_FAILED = 4  # fallaron todos los routers
+
+def check_dependencies(required_modules=('netmiko', 'tkinter')):
+    """
+    Verifica que las dependencias estén instaladas sin importarlas:
+    importar netmiko carga paramiko y cryptography, y eso retrasaría el
+    arranque (se importa en la primera conexión)
+    """
+    missing_modules = [module for module in required_modules if importlib.util.find_spec(module) is None]
     
     if missing_modules:
         print(f"Error: Módulos faltantes: {', '.join(missing_modules)}")
@@ -24,8 +33,172 @@ def check_dependencies():
     print("Todas las dependencias están disponibles")
     return True
 
-def main():
+def build_parser():
+    """Argumentos de línea de comandos: sin argumentos se abre la interfaz gráfica"""
+    import topology_config as config
+    
+    parser = argparse.ArgumentParser(
+        description="Gestor de Topología de Red GNS3. Sin argumentos abre la interfaz gráfica.")
+    subparsers = parser.add_subparsers(dest="modo")
+    batch = subparsers.add_parser(
+        "batch", help="Ejecuta una consulta o configuración sin interfaz gráfica",
+        description="Ejecuta una consulta o plantilla de configuración en varios routers a la vez "
+                    "y escribe un resultado JSON por router y línea en la salida estándar. "
+                    f"Códigos de salida: {EXIT_OK} todos OK, {EXIT_PARTIAL} algunos routers fallaron, "
+                    f"{EXIT_FAILED} fallaron todos, {EXIT_ERROR} error de inventario o dependencias.")
+    accion = batch.add_mutually_exclusive_group(required=True)
+    accion.add_argument("--consulta", choices=list(config.QUERY_COMMANDS),
+                        help="Clave de QUERY_COMMANDS a ejecutar")
+    accion.add_argument("--configuracion", choices=list(config.CONFIG_TEMPLATES),
+                        help="Clave de CONFIG_TEMPLATES a aplicar")
+    batch.add_argument("--inventario", metavar="ARCHIVO",
+                       help="Archivo de topología con los routers (router <nombre> <x> <y> <ip> "
+                            "[usuario=.. password=.. puerto=..]); por defecto ROUTERS_CONFIG")
+    batch.add_argument("--routers", metavar="R1,R2,...",
+                       help="Routers destino separados por comas (todos los del inventario por defecto)")
+    batch.add_argument("--concurrencia", type=int, default=config.MAX_CONEXIONES_SIMULTANEAS,
+                       metavar="N", help="Conexiones SSH simultáneas")
+    batch.add_argument("--parsear", action="store_true",
+                       help="Devuelve la salida de la consulta estructurada (TextFSM) si hay plantilla")
+    batch.add_argument("--solo-delta", action="store_true",
+                       help="Envía solo las líneas de la plantilla que faltan en la running-config")
+    batch.add_argument("--historial", nargs="?", const=config.ARCHIVO_HISTORIAL, metavar="RUTA",
+                       help=f"Guarda los resultados en el historial SQLite (por defecto {config.ARCHIVO_HISTORIAL})")
+    return parser
+
+def load_inventory(ruta, nombres):
+    """
+    Devuelve {nombre: (ip, usuario, password, puerto)} de los routers pedidos.
+    Sin archivo se usa ROUTERS_CONFIG; en el archivo, las credenciales que
+    falten se toman del router del mismo nombre en ROUTERS_CONFIG o, si no
+    existe, del primero (como en el descubrimiento de vecinos)
+    """
+    import topology_config as config
+    
+    predefinidos = {r.nombre: r for r in config.ROUTERS_CONFIG}
+    if ruta:
+        topologia = config.cargar_topologia(ruta)
+        disponibles = list(topologia.positions)
+    else:
+        topologia = None
+        disponibles = list(predefinidos)
+    nombres = nombres or disponibles
+    desconocidos = [n for n in nombres if n not in disponibles]
+    if desconocidos:
+        raise ValueError(f"Routers no encontrados en el inventario: {', '.join(desconocidos)}")
+    
+    inventario = {}
+    for nombre in nombres:
+        base = predefinidos.get(nombre) or config.ROUTERS_CONFIG[0]
+        atributos = topologia.attributes(nombre) if topologia else {"ip": base.ip}
+        if not atributos.get("ip"):
+            raise ValueError(f"El router {nombre} no tiene IP en el inventario")
+        try:
+            puerto = int(atributos.get("puerto", 22))
+        except ValueError:
+            raise ValueError(f"Puerto no válido para {nombre}: {atributos['puerto']}")
+        inventario[nombre] = (atributos["ip"], atributos.get("usuario", base.usuario),
+                              atributos.get("password", base.password), puerto)
+    return inventario
+
+def run_batch(args):
+    """
+    Modo batch: ejecuta la consulta o plantilla en los routers indicados y
+    escribe una línea JSON por router en stdout según van terminando.
+    Los mensajes del motor se desvían a stderr para no mezclarse con el JSON.
+    Devuelve el código de salida
+    """
+    salida = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        if not check_dependencies(['netmiko']):
+            return EXIT_ERROR
+        import topology_config as config
+        from ios_config import contiene_errores
+        from network_connection import RouterManager
+        
+        nombres = [n.strip() for n in (args.routers or "").split(",") if n.strip()]
+        try:
+            inventario = load_inventory(args.inventario, nombres)
+        except (OSError, ValueError) as e:
+            print(f"Error en el inventario: {e}")
+            return EXIT_ERROR
+        
+        if args.consulta:
+            comando = config.QUERY_COMMANDS[args.consulta]
+        else:
+            comandos = list(config.CONFIG_TEMPLATES[args.configuracion])
+        
+        historial = None
+        if args.historial:
+            from results_store import ResultStore
+            historial = ResultStore(args.historial)
+        
+        manager = RouterManager(max_workers=max(1, args.concurrencia), historial=historial)
+        for nombre, (ip, usuario, password, puerto) in inventario.items():
+            manager.agregar_router(nombre, ip, usuario, password, puerto)
+        
+        def tarea(router):
+            registro = {"router": router.nombre, "ip": router.ip, "ok": False}
+            if args.consulta:
+                registro.update(key=args.consulta, command=comando)
+            else:
+                registro.update(key=args.configuracion, commands=comandos)
+            if not router.conectar():
+                registro["error"] = "No se pudo conectar"
+                return registro
+            try:
+                if args.consulta:
+                    resultado = router.obtener_informacion(comando, parsear=args.parsear)
+                    registro["output"] = resultado
+                elif args.solo_delta:
+                    delta, resultado = router.configurar_delta(comandos)
+                    registro["sent"] = delta
+                    registro["output"] = resultado or ""
+                else:
+                    resultado = router.configurar(comandos)
+                    registro["output"] = resultado or ""
+                
+                # Como en ConfigDeployer: una salida con errores de IOS es un fallo
+                if resultado is None or resultado is False:
+                    registro["error"] = "El comando no devolvió respuesta"
+                elif isinstance(resultado, str) and contiene_errores(resultado):
+                    registro["error"] = "El router rechazó algún comando"
+                else:
+                    registro["ok"] = True
+            finally:
+                router.desconectar()
+            return registro
+        
+        fallidos = []
+        
+        def escribir(nombre, registro, duracion):
+            if not registro:
+                registro = {"router": nombre, "ip": inventario[nombre][0], "ok": False,
+                            "error": "Error inesperado (ver stderr)"}
+            registro["timestamp"] = datetime.now().isoformat(timespec="milliseconds")
+            registro["duration"] = round(duracion, 3)
+            if not registro["ok"]:
+                fallidos.append(nombre)
+            salida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            salida.flush()
+        
+        try:
+            manager.ejecutar_en_todos(tarea, list(inventario), callback=escribir,
+                                      exito=lambda registro: bool(registro and registro["ok"]))
+        finally:
+            if historial:
+                historial.cerrar()
+    
+    if not fallidos:
+        return EXIT_OK
+    return EXIT_FAILED if len(fallidos) == len(inventario) else EXIT_PARTIAL
+
+def main(argv=None):
     """Función principal"""
+    args = build_parser().parse_args(argv)
+    if args.modo == "batch":
+        sys.exit(run_batch(args))
+    
     print("Gestor de Topología de Red GNS3")
     print("=" * 40)
     
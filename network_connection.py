@@ -2,11 +2,17 @@
 Módulo para manejar conexiones SSH a routers Cisco.
 """
 
-from netmiko import ConnectHandler
+import re
 import time
-import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+from command_queue import CommandQueue
+from ios_config import calcular_delta
+from keepalive_scheduler import planificador_keepalive
+from response_cache import ResponseCache, es_cacheable
+from textfsm_parser import normalizar_comando, parsear_salida
+
 
 class SSHRouterConnection:
     """
@@ -14,7 +20,7 @@ class SSHRouterConnection:
     Mantiene la conexión viva y proporciona métodos para obtener y configurar información.
     """
     
-    def __init__(self, ip, usuario, password, nombre="Router"):
+    def __init__(self, ip, usuario, password, nombre="Router", puerto=22):
         self.ip = ip
         self.usuario = usuario
         self.password = password
@@ -22,9 +28,16 @@ class SSHRouterConnection:
         self.conexion = None
         self.conectado = False
         self.ultimo_comando = None
-        self.keepalive_interval = 30  # segundos
-        self.keepalive_thread = None
+        self.ultima_actividad = 0.0  # time.monotonic() de la última E/S exitosa
+        self.umbral_inactividad = 60  # segundos sin E/S antes de sondear el router
+        self.keepalive_interval = 30  # segundos (menor que umbral_inactividad)
+        self.keepalive_scheduler = None  # planificador compartido, ver keepalive_scheduler
         self.keepalive_activo = False
+        self.cache = ResponseCache()  # respuestas de comandos show
+        self.historial = None  # ResultStore donde se registran las respuestas (opcional)
+        self.cola = CommandQueue(nombre)  # serializa todo el acceso al canal SSH
+        self.timeout_lote = 60  # segundos máximos para un lote de comandos
+        self.silencio_lote = 0.5  # segundos sin datos para dar por vacío el canal tras un lote fallido
         
         # Configuración del dispositivo
         self.device_config = {
@@ -32,7 +45,7 @@ class SSHRouterConnection:
             'host': self.ip,
             'username': self.usuario,
             'password': self.password,
-            'port': 22,
+            'port': puerto,
             'ssh_config_file': None,
             'allow_agent': False,
             'disabled_algorithms': {
@@ -50,8 +63,11 @@ class SSHRouterConnection:
         """Establece la conexión SSH al router"""
         try:
             print(f"Conectando a {self.nombre} ({self.ip})...")
+            # netmiko (con paramiko y cryptography) se importa en la primera conexión
+            from netmiko import ConnectHandler
             self.conexion = ConnectHandler(**self.device_config)
             self.conectado = True
+            self._registrar_actividad()
             print(f"✓ Conexión exitosa a {self.nombre}")
             
             # Iniciar keepalive
@@ -74,18 +90,47 @@ class SSHRouterConnection:
         except Exception as e:
             print(f"Error al desconectar de {self.nombre}: {e}")
     
-    def verificar_conexion(self):
-        """Verifica si la conexión está activa"""
+    def verificar_conexion(self, forzar=False):
+        """
+        Verifica si la conexión está activa
+        Solo envía un comando de sondeo si la sesión lleva inactiva más de
+        umbral_inactividad segundos o si forzar=True
+        """
         if not self.conexion or not self.conectado:
             return False
         
-        try:
-            # Enviar comando simple para verificar conectividad
-            self.conexion.send_command("show clock", expect_string=r"#")
-            return True
-        except:
+        if not self._transporte_activo():
             self.conectado = False
             return False
+        
+        if not forzar and self.tiempo_inactivo() < self.umbral_inactividad:
+            return True
+        
+        # Sonda real a través de la cola; las sondas simultáneas se agrupan
+        return self.cola.ejecutar(self._sondear, clave=("sonda",))
+    
+    def estadisticas_cache(self):
+        """Aciertos y fallos de la caché de respuestas"""
+        return self.cache.estadisticas()
+    
+    def tiempo_inactivo(self):
+        """Segundos transcurridos desde la última E/S exitosa con el router"""
+        return time.monotonic() - self.ultima_actividad
+    
+    def _registrar_actividad(self):
+        """Marca el instante de la última E/S exitosa"""
+        self.ultima_actividad = time.monotonic()
+    
+    def _transporte_activo(self):
+        """Comprueba el estado del transporte SSH sin enviar nada al router"""
+        try:
+            canal = self.conexion.remote_conn
+            if canal is None or canal.closed:
+                return False
+            transporte = canal.get_transport()
+            return transporte is not None and transporte.is_active()
+        except Exception:
+            return False
     
     def reconectar(self):
         """Intenta reconectar al router"""
@@ -94,27 +139,218 @@ class SSHRouterConnection:
         time.sleep(2)
         return self.conectar()
     
-    def obtener_informacion(self, comando):
+    def obtener_informacion(self, comando, parsear=False, forzar=False):
         """
         Ejecuta comandos de consulta (show commands)
+        parsear: si es True y existe plantilla TextFSM, devuelve una lista de
+        registros (diccionarios) en lugar del texto
+        forzar: ignora la caché de respuestas y consulta al router
+        """
+        clave = normalizar_comando(comando)
+        resultado = None
+        if es_cacheable(comando) and not forzar:
+            resultado = self.cache.obtener(clave)
+        
+        if resultado is None:
+            resultado = self.cola.ejecutar(self._ejecutar_consulta, comando,
+                                           clave=("consulta", clave))
+        
+        if resultado is not None and parsear:
+            return self._parsear(comando, resultado)
+        return resultado
+    
+    def obtener_varios(self, comandos, parsear=False, forzar=False):
+        """
+        Ejecuta varios comandos show en un único intercambio con el router
+        Devuelve un diccionario comando -> resultado (None si falló)
+        """
+        resultados = {}
+        pendientes = []
+        for comando in comandos:
+            if es_cacheable(comando) and not forzar:
+                resultado = self.cache.obtener(normalizar_comando(comando))
+                if resultado is not None:
+                    resultados[comando] = resultado
+                    continue
+            if comando not in pendientes:
+                pendientes.append(comando)
+        
+        if pendientes:
+            resultados.update(self.cola.ejecutar(self._ejecutar_lote, pendientes))
+        
+        resultados = {comando: resultados.get(comando) for comando in comandos}
+        if parsear:
+            return {comando: self._parsear(comando, resultado) if resultado is not None else None
+                    for comando, resultado in resultados.items()}
+        return resultados
+    
+    def encolar_consulta(self, comando, forzar=False):
         """
+        Encola un comando show y devuelve un concurrent.futures.Future con su salida
+        Las consultas idénticas pendientes comparten una única llamada al router
+        """
+        clave = normalizar_comando(comando)
+        if es_cacheable(comando) and not forzar:
+            resultado = self.cache.obtener(clave)
+            if resultado is not None:
+                futuro = Future()
+                futuro.set_result(resultado)
+                return futuro
+        return self.cola.enviar(self._ejecutar_consulta, comando, clave=("consulta", clave))
+    
+    def configurar(self, comandos):
+        """
+        Ejecuta comandos de configuración
+        comandos: lista de comandos o string único
+        """
+        return self.cola.ejecutar(self._ejecutar_configuracion, comandos)
+    
+    def configurar_delta(self, comandos):
+        """
+        Aplica solo las líneas de la plantilla que faltan en la running-config
+        Devuelve (delta, resultado): delta vacío si el router ya cumple la
+        plantilla (no se envía nada) y None si no se pudo leer la configuración
+        """
+        return self.cola.ejecutar(self._ejecutar_delta, comandos)
+    
+    def encolar_configuracion(self, comandos):
+        """Encola comandos de configuración y devuelve un concurrent.futures.Future"""
+        return self.cola.enviar(self._ejecutar_configuracion, comandos)
+    
+    def _ejecutar_consulta(self, comando):
+        """Envía un comando show al router (se ejecuta en la cola del router)"""
         if not self._verificar_y_reconectar():
             return None
         
         try:
             print(f"[{self.nombre}] Ejecutando: {comando}")
             resultado = self.conexion.send_command(comando)
+            self._registrar_actividad()
             self.ultimo_comando = datetime.now()
+            if es_cacheable(comando):
+                self.cache.guardar(normalizar_comando(comando), resultado)
+            if self.historial:
+                self.historial.guardar_resultado(self.nombre, comando, resultado)
             return resultado
         except Exception as e:
             print(f"Error ejecutando '{comando}' en {self.nombre}: {e}")
+            self._marcar_si_caida()
             return None
     
-    def configurar(self, comandos):
+    def _ejecutar_lote(self, comandos):
         """
-        Ejecuta comandos de configuración
-        comandos: lista de comandos o string único
+        Envía todos los comandos de una vez y separa la salida por los prompts
+        (se ejecuta en la cola del router)
         """
+        if len(comandos) == 1:
+            return {comandos[0]: self._ejecutar_consulta(comandos[0])}
+        
+        if not self._verificar_y_reconectar():
+            return {comando: None for comando in comandos}
+        
+        try:
+            print(f"[{self.nombre}] Ejecutando lote de {len(comandos)} comando(s)")
+            prompt = re.compile(rf"^{re.escape(self.conexion.base_prompt)}[>#]", re.M)
+            # Un prompt atrasado en el canal daría el lote por terminado antes de tiempo
+            self._descartar_canal()
+            self.conexion.write_channel("\n".join(comandos) + "\n")
+            salida = self._leer_hasta_prompts(prompt, len(comandos))
+            self._registrar_actividad()
+            self.ultimo_comando = datetime.now()
+        except Exception as e:
+            print(f"Error ejecutando lote en {self.nombre}: {e}")
+            self._marcar_si_caida()
+            if self.conectado:
+                # Que la salida que aún llegue del lote no se atribuya al siguiente comando
+                try:
+                    self._descartar_canal(self.silencio_lote)
+                except Exception:
+                    self._marcar_si_caida()
+            return {comando: None for comando in comandos}
+        
+        resultados = self._separar_salidas(salida, prompt, comandos)
+        if resultados is None:
+            # El eco no coincide con lo esperado: repetir comando a comando con el
+            # canal vacío, sin restos del lote
+            print(f"[{self.nombre}] Salida del lote no reconocida, ejecutando en secuencia")
+            try:
+                self._descartar_canal(self.silencio_lote)
+            except Exception as e:
+                print(f"Error vaciando el canal de {self.nombre}: {e}")
+                self._marcar_si_caida()
+            return {comando: self._ejecutar_consulta(comando) for comando in comandos}
+        
+        for comando, resultado in resultados.items():
+            if es_cacheable(comando):
+                self.cache.guardar(normalizar_comando(comando), resultado)
+            if self.historial:
+                self.historial.guardar_resultado(self.nombre, comando, resultado)
+        return resultados
+    
+    def _descartar_canal(self, silencio=0.0):
+        """
+        Descarta lo que haya en el canal. Con silencio > 0 sigue leyendo hasta
+        que no llegue nada durante ese tiempo (como mucho timeout_lote segundos)
+        """
+        limite = time.monotonic() + self.timeout_lote
+        tranquilo = time.monotonic() + silencio
+        while time.monotonic() < limite:
+            if self.conexion.read_channel():
+                tranquilo = time.monotonic() + silencio
+            elif time.monotonic() >= tranquilo:
+                return
+            else:
+                time.sleep(0.01)
+    
+    def _leer_hasta_prompts(self, prompt, cantidad):
+        """Lee del canal hasta ver el prompt 'cantidad' veces"""
+        buffer = ""
+        limite = time.monotonic() + self.timeout_lote
+        while time.monotonic() < limite:
+            datos = self.conexion.read_channel()
+            if datos:
+                buffer += datos.replace("\r", "")
+                if len(prompt.findall(buffer)) >= cantidad:
+                    return buffer
+            else:
+                time.sleep(0.01)
+        raise TimeoutError(f"el lote no terminó en {self.timeout_lote}s")
+    
+    @staticmethod
+    def _separar_salidas(salida, prompt, comandos):
+        """
+        Divide la salida combinada en los límites del prompt
+        Admite eco intercalado ("cmd1, salida1, prompt, cmd2...") y eco
+        anticipado de todo lo tecleado; devuelve None si no encaja con ninguno
+        """
+        lineas = salida.split("\n")
+        
+        # Saltar restos anteriores al eco del primer comando
+        inicio = next((i for i, linea in enumerate(lineas)
+                       if linea.strip().endswith(comandos[0])), None)
+        if inicio is None:
+            return None
+        
+        ecos = 0
+        while (ecos < len(comandos) and inicio + ecos < len(lineas)
+               and lineas[inicio + ecos].strip().endswith(comandos[ecos])):
+            ecos += 1
+        
+        segmentos = prompt.split("\n".join(lineas[inicio + ecos:]))
+        resultados = {}
+        for indice, comando in enumerate(comandos):
+            if indice >= len(segmentos):
+                return None
+            segmento = segmentos[indice]
+            if indice >= ecos:
+                eco, _, segmento = segmento.partition("\n")
+                if not eco.strip().endswith(comando):
+                    return None
+            resultados[comando] = segmento.strip("\n")
+        return resultados
+    
+    def _ejecutar_configuracion(self, comandos):
+        """Envía comandos de configuración al router (se ejecuta en la cola del router)"""
         if not self._verificar_y_reconectar():
             return False
         
@@ -123,12 +359,56 @@ class SSHRouterConnection:
                 comandos = [comandos]
             
             print(f"[{self.nombre}] Ejecutando {len(comandos)} comando(s) de configuración")
-            resultado = self.conexion.send_config_set(comandos)
+            try:
+                resultado = self.conexion.send_config_set(comandos)
+            finally:
+                # Cualquier respuesta show anterior puede haber quedado obsoleta
+                self.cache.invalidar()
+            self._registrar_actividad()
             self.ultimo_comando = datetime.now()
             print(f"✓ Configuración aplicada en {self.nombre}")
             return resultado
         except Exception as e:
             print(f"✗ Error en configuración de {self.nombre}: {e}")
+            self._marcar_si_caida()
+            return False
+    
+    def _ejecutar_delta(self, comandos):
+        """Lee la running-config y envía la diferencia en un solo trabajo de la cola"""
+        if isinstance(comandos, str):
+            comandos = [comandos]
+        running = self._ejecutar_consulta("show running-config")
+        if not running:
+            return None, False
+        
+        delta = calcular_delta(comandos, running)
+        if not delta:
+            print(f"✓ {self.nombre} ya cumple la plantilla ({len(comandos)} comando(s))")
+            return delta, ""
+        print(f"[{self.nombre}] Diferencias: {len(delta)} de {len(comandos)} comando(s)")
+        return delta, self._ejecutar_configuracion(delta)
+    
+    def _parsear(self, comando, resultado):
+        """Parsea la salida con TextFSM; si no hay plantilla o falla, devuelve el texto"""
+        try:
+            registros = parsear_salida(comando, resultado)
+        except Exception as e:
+            print(f"Error parseando '{comando}' de {self.nombre}: {e}")
+            return resultado
+        return resultado if registros is None else registros
+    
+    def _sondear(self):
+        """Envía el comando de sondeo (se ejecuta en la cola del router)"""
+        if not self.conexion or not self.conectado:
+            return False
+        
+        try:
+            # Enviar comando simple para verificar conectividad
+            self.conexion.send_command("show clock", expect_string=r"#")
+            self._registrar_actividad()
+            return True
+        except:
+            self.conectado = False
             return False
     
     def _verificar_y_reconectar(self):
@@ -137,29 +417,35 @@ class SSHRouterConnection:
             return self.reconectar()
         return True
     
+    def _marcar_si_caida(self):
+        """Tras un error de E/S, marca la sesión como caída si el transporte murió"""
+        if not self._transporte_activo():
+            self.conectado = False
+    
     def _iniciar_keepalive(self):
-        """Inicia el hilo de keepalive para mantener la conexión viva"""
+        """Registra la sesión en el planificador compartido de keepalives"""
         self.keepalive_activo = True
-        self.keepalive_thread = threading.Thread(target=self._keepalive_worker, daemon=True)
-        self.keepalive_thread.start()
+        if self.keepalive_scheduler is None:
+            self.keepalive_scheduler = planificador_keepalive()
+        self.keepalive_scheduler.registrar(self)
     
     def _detener_keepalive(self):
         """Detiene el keepalive"""
         self.keepalive_activo = False
-        if self.keepalive_thread:
-            self.keepalive_thread.join(timeout=2)
+        if self.keepalive_scheduler:
+            self.keepalive_scheduler.cancelar(self)
     
-    def _keepalive_worker(self):
-        """Worker que mantiene la conexión viva"""
-        while self.keepalive_activo and self.conectado:
-            try:
-                time.sleep(self.keepalive_interval)
-                if self.keepalive_activo:
-                    self.conexion.send_command("show clock", expect_string=r"#")
-            except:
-                if self.keepalive_activo:
-                    print(f"Keepalive falló para {self.nombre}, intentando reconectar...")
-                    self.reconectar()
+    def _enviar_keepalive(self):
+        """Envía un keepalive (invocado por el planificador tras keepalive_interval de inactividad)"""
+        self.cola.ejecutar(self._keepalive, clave=("keepalive",))
+    
+    def _keepalive(self):
+        """Keepalive con reconexión si falla (se ejecuta en la cola del router)"""
+        if not self.keepalive_activo or self.tiempo_inactivo() < self.keepalive_interval:
+            return
+        if not self.verificar_conexion(forzar=True) and self.keepalive_activo:
+            print(f"Keepalive falló para {self.nombre}, intentando reconectar...")
+            self.reconectar()
     
     def __str__(self):
         estado = "Conectado" if self.conectado else "Desconectado"
@@ -171,22 +457,84 @@ class RouterManager:
     Clase para manejar múltiples conexiones de routers
     """
     
-    def __init__(self):
+    def __init__(self, max_workers=10, historial=None):
         self.routers = {}
+        self.max_workers = max_workers  # conexiones simultáneas por defecto
+        self.historial = historial  # ResultStore compartido por los routers (opcional)
     
-    def agregar_router(self, nombre, ip, usuario, password):
+    def agregar_router(self, nombre, ip, usuario, password, puerto=22):
         """Agrega un router al manager"""
-        router = SSHRouterConnection(ip, usuario, password, nombre)
+        router = SSHRouterConnection(ip, usuario, password, nombre, puerto)
+        router.historial = self.historial
         self.routers[nombre] = router
         return router
     
-    def conectar_todos(self):
-        """Conecta a todos los routers"""
+    def conectar_todos(self, max_workers=None, callback=None):
+        """
+        Conecta a todos los routers de forma concurrente
+        max_workers: número máximo de conexiones simultáneas (1 = secuencial)
+        callback: función (nombre, resultado, duracion) llamada al terminar cada router
+        """
+        return self._en_todos(lambda router: router.conectar(),
+                              max_workers=max_workers, callback=callback)
+    
+    def obtener_informacion(self, comando, nombres=None, max_workers=None, callback=None,
+                            parsear=False, forzar=False):
+        """
+        Ejecuta un comando show en varios routers a la vez
+        nombres: routers destino (todos por defecto)
+        callback: función (nombre, resultado, duracion) llamada según responde cada router
+        """
+        return self._en_todos(lambda router: router.obtener_informacion(comando, parsear, forzar),
+                              nombres, max_workers, callback)
+    
+    def ejecutar_en_todos(self, operacion, nombres=None, max_workers=None, callback=None, exito=None):
+        """
+        Ejecuta operacion(router) en varios routers a la vez (todos por defecto)
+        callback: función (nombre, resultado, duracion) llamada según termina cada router
+        exito: función (resultado) -> bool para el progreso OK/FALLO (por defecto, bool)
+        """
+        return self._en_todos(operacion, nombres, max_workers, callback, exito)
+    
+    def _en_todos(self, operacion, nombres=None, max_workers=None, callback=None, exito=None):
+        """Ejecuta operacion(router) en paralelo con un máximo de max_workers hilos"""
+        nombres = [n for n in (self.routers if nombres is None else nombres) if n in self.routers]
         resultados = {}
-        for nombre, router in self.routers.items():
-            resultados[nombre] = router.conectar()
+        if not nombres:
+            return resultados
+        
+        workers = max(1, min(max_workers or self.max_workers, len(nombres)))
+        total = len(nombres)
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futuros = {
+                executor.submit(self._ejecutar_medido, operacion, self.routers[nombre]): nombre
+                for nombre in nombres
+            }
+            for futuro in as_completed(futuros):
+                nombre = futuros[futuro]
+                resultado, duracion = futuro.result()
+                resultados[nombre] = resultado
+                estado = "OK" if (exito or bool)(resultado) else "FALLO"
+                print(f"[{len(resultados)}/{total}] {nombre}: {estado} ({duracion:.2f}s)")
+                if callback:
+                    try:
+                        callback(nombre, resultado, duracion)
+                    except Exception as e:
+                        print(f"Error en callback para {nombre}: {e}")
         return resultados
     
+    @staticmethod
+    def _ejecutar_medido(operacion, router):
+        """Ejecuta operacion(router) y devuelve (resultado, duración en segundos)"""
+        inicio = time.perf_counter()
+        try:
+            resultado = operacion(router)
+        except Exception as e:
+            print(f"Error en {router.nombre}: {e}")
+            resultado = None
+        return resultado, time.perf_counter() - inicio
+    
     def desconectar_todos(self):
         """Desconecta todos los routers"""
         for router in self.routers.values():
@@ -6,10 +6,19 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import threading
 import time
+import types
 from datetime import datetime
 
 # Importar módulos locales
 from network_connection import RouterManager
+from health_monitor import HealthMonitor
+from deployment import ConfigDeployer, ResultadoDespliegue
+from config_backup import ConfigBackupStore
+from results_store import ResultStore
+from spatial_index import SpatialGrid
+from topology_discovery import TopologyDiscovery
+from textfsm_parser import formatear_tabla
+from gui_components import ConsoleSink, VirtualConsole, EXPORT_FILETYPES
 import topology_config as config
 
 
@@ -22,11 +31,33 @@ class NetworkTopologyGUI:
         # Configurar estilos
         self.setup_styles()
         
-        # Inicializar el manager de routers
-        self.router_manager = RouterManager()
+        # Historial persistente de resultados (se escribe en segundo plano)
+        self.history = ResultStore(config.ARCHIVO_HISTORIAL)
+        
+        # Inicializar el manager de routers según el motor configurado
+        self.loop_thread = None
+        if config.MOTOR_CONEXION == "asyncio":
+            from async_connection import AsyncRouterManager, EventLoopThread
+            self.loop_thread = EventLoopThread().iniciar()
+            self.router_manager = AsyncRouterManager(max_concurrencia=config.MAX_CONEXIONES_SIMULTANEAS,
+                                                     historial=self.history)
+        else:
+            self.router_manager = RouterManager(max_workers=config.MAX_CONEXIONES_SIMULTANEAS,
+                                                historial=self.history)
         self.selected_router = None 
         self.monitoring_active = False
         self.status_colors = {}
+        self.backup_store = None
+        
+        # Elementos del canvas y repintado agrupado
+        self.router_items = {}
+        self.link_items = {}
+        self.item_colors = {}
+        self.redraw_lock = threading.Lock()
+        self.redraw_pending = False
+        self.topology = config.TopologyConfig.get_topology()
+        self.spatial = SpatialGrid()
+        self.router_radius = 20
         
         # Configurar routers predefinidos
         self.setup_predefined_routers()
@@ -53,6 +84,11 @@ class NetworkTopologyGUI:
         except:
             pass  # Si el tema no soporta colores personalizados
     
+    def show_initial_topology(self):
+        """Dibuja la topología inicial; main() la llama después del primer pintado de la ventana"""
+        self.draw_topology()
+        self.layout_topology(self.topology)
+    
     def setup_predefined_routers(self):
         """Configura los routers predefinidos"""
         for nombre, ip, usuario, password in config.ROUTERS_CONFIG:
@@ -93,26 +129,59 @@ class NetworkTopologyGUI:
                   command=self.connect_all_routers).pack(fill="x", pady=2)
         ttk.Button(connection_frame, text="Desconectar Todos", style='Danger.TButton',
                   command=self.disconnect_all_routers).pack(fill="x", pady=2)
+        ttk.Button(connection_frame, text="Respaldar configuraciones",
+                  command=self.backup_configs).pack(fill="x", pady=(8, 2))
+        ttk.Button(connection_frame, text="Cambios (últimas 24 h)",
+                  command=lambda: self.show_config_changes(24 * 3600)).pack(fill="x", pady=2)
+        ttk.Button(connection_frame, text="Cargar topología...",
+                  command=self.load_topology_file).pack(fill="x", pady=(8, 2))
+        ttk.Button(connection_frame, text="Descubrir vecinos (CDP/LLDP)",
+                  command=self.discover_topology).pack(fill="x", pady=2)
+        ttk.Button(connection_frame, text="Redistribuir topología",
+                  command=lambda: self.layout_topology(self.topology, recalcular=True)).pack(fill="x", pady=2)
         
         # Selección de router
         router_frame = ttk.LabelFrame(control_frame, text="Seleccionar Router", padding="5")
         router_frame.pack(fill="x", pady=(0, 10))
         
         self.router_var = tk.StringVar(value="R1")
-        router_combo = ttk.Combobox(router_frame, textvariable=self.router_var, 
+        self.router_combo = ttk.Combobox(router_frame, textvariable=self.router_var, 
                                    values=["R1", "R2", "R3", "R4", "R5"], state="readonly")
-        router_combo.pack(fill="x", pady=2)
-        router_combo.bind("<<ComboboxSelected>>", self.on_router_selected)
+        self.router_combo.pack(fill="x", pady=2)
+        self.router_combo.bind("<<ComboboxSelected>>", self.on_router_selected)
         
         # Botones de consulta
         query_frame = ttk.LabelFrame(control_frame, text="Consultas", padding="5")
         query_frame.pack(fill="x", pady=(0, 10))
         
+        # Modo multi-router: ejecutar la consulta en varios routers a la vez
+        self.fanout_var = tk.BooleanVar(value=False)
+        self.fanout_targets = list(self.router_manager.routers)
+        ttk.Checkbutton(query_frame, text="Ejecutar en varios routers",
+                       variable=self.fanout_var).pack(anchor="w")
+        ttk.Button(query_frame, text="Elegir routers...",
+                  command=self.choose_fanout_routers).pack(fill="x", pady=(1, 5))
+        
+        # Salida estructurada: registros parseados con TextFSM en forma de tabla
+        self.parsed_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(query_frame, text="Salida estructurada (TextFSM)",
+                       variable=self.parsed_var).pack(anchor="w")
+        
+        # Forzar actualización: ignorar la caché de respuestas show
+        self.force_refresh_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(query_frame, text="Forzar actualización (sin caché)",
+                       variable=self.force_refresh_var).pack(anchor="w", pady=(0, 5))
+        
         for text, command in config.QUERY_COMMANDS.items():
             ttk.Button(query_frame, text=text, 
                       command=lambda cmd=command, desc=text: self.execute_query(cmd, desc)
                       ).pack(fill="x", pady=1)
         
+        ttk.Button(query_frame, text="Todas las consultas",
+                  command=self.execute_all_queries).pack(fill="x", pady=(5, 1))
+        ttk.Button(query_frame, text="Historial de consultas...",
+                  command=self.history_dialog).pack(fill="x", pady=1)
+        
         # Botones de configuración
         config_frame = ttk.LabelFrame(control_frame, text="Configuraciones", padding="5")
         config_frame.pack(fill="x", pady=(0, 10))
@@ -147,9 +216,11 @@ class NetworkTopologyGUI:
         
         self.canvas = tk.Canvas(topology_frame, bg="white", height=300)
         self.canvas.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.canvas.bind("<Button-1>", self.on_canvas_click)
         
-        # Dibujar topología
-        self.draw_topology()
+        # Desplazamiento arrastrando con el botón central (topologías grandes)
+        self.canvas.bind("<ButtonPress-2>", lambda e: self.canvas.scan_mark(e.x, e.y))
+        self.canvas.bind("<B2-Motion>", lambda e: self.canvas.scan_dragto(e.x, e.y, gain=1))
         
         # Panel de resultados
         results_frame = ttk.LabelFrame(center_frame, text="Consola", padding="5")
@@ -166,11 +237,24 @@ class NetworkTopologyGUI:
         ttk.Button(results_buttons_frame, text="Exportar", 
                   command=self.export_results).pack(side="left")
         
-        self.results_text = scrolledtext.ScrolledText(results_frame, wrap=tk.WORD, height=15)
+        # Búsqueda en toda la salida (también la que ya no está en pantalla)
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(results_buttons_frame, textvariable=self.search_var, width=25)
+        search_entry.pack(side="right")
+        search_entry.bind("<Return>", lambda e: self.search_results())
+        ttk.Button(results_buttons_frame, text="Buscar", 
+                  command=self.search_results).pack(side="right", padx=(0, 5))
+        
+        # La salida se guarda en disco y solo se renderiza la parte visible
+        self.results_text = VirtualConsole(results_frame, wrap=tk.WORD, height=15)
         self.results_text.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # Configurar tags para colores
         self.setup_text_tags()
+        
+        # Los hilos escriben en la consola a través de una cola que se vacía en el hilo de Tk
+        self.console = ConsoleSink(self.results_text)
+        self.console.start()
     
     def create_status_panel(self, parent):
         """Crea el panel de estado inferior"""
@@ -193,36 +277,230 @@ class NetworkTopologyGUI:
         self.results_text.tag_configure("timestamp", foreground="gray", font=("Consolas", 8))
     
     def draw_topology(self):
-        """Dibuja la topología de red en el canvas"""
-        self.canvas.delete("all")
+        """
+        Actualiza la topología en el canvas.
+        Los elementos se crean la primera vez; después solo se cambia con
+        itemconfig el color de los routers y enlaces cuyo estado cambió.
+        """
+        if not self.router_items:
+            self.create_topology_items()
         
-        # Dibujar conexiones
-        for r1, r2 in config.CONNECTIONS:
-            x1, y1 = config.ROUTER_POSITIONS[r1]
-            x2, y2 = config.ROUTER_POSITIONS[r2]
-            
-            # Determinar color del enlace basado en el estado de ambos routers
+        # Routers
+        for router, oval in self.router_items.items():
+            self.set_item_color(oval, self.status_colors.get(router, "red"))
+        
+        # Enlaces: verdes solo si ambos extremos están conectados
+        for (r1, r2), line in self.link_items.items():
             color = "green" if (self.status_colors.get(r1) == "green" and 
                               self.status_colors.get(r2) == "green") else "red"
-            
-            self.canvas.create_line(x1, y1, x2, y2, width=2, fill=color, tags="connection")
+            self.set_item_color(line, color)
+    
+    def create_topology_items(self):
+        """Crea una sola vez los elementos del canvas y guarda sus identificadores"""
+        self.canvas.delete("all")
+        self.router_items = {}
+        self.link_items = {}
+        self.item_colors = {}
+        
+        positions = self.topology.placed_positions()
+        detailed = len(positions) <= config.LIMITE_DETALLE_TOPOLOGIA
+        self.router_radius = 20 if detailed else 5
+        r = self.router_radius
+        
+        # Dibujar conexiones
+        for r1, r2 in self.topology.connections:
+            if r1 not in positions or r2 not in positions:
+                continue
+            x1, y1 = positions[r1]
+            x2, y2 = positions[r2]
+            self.link_items[(r1, r2)] = self.canvas.create_line(x1, y1, x2, y2, width=2 if detailed else 1,
+                                                                fill="red", tags="connection")
+            self.item_colors[self.link_items[(r1, r2)]] = "red"
         
         # Dibujar routers
-        for router, (x, y) in config.ROUTER_POSITIONS.items():
-            color = self.status_colors.get(router, "red")
-            
+        for router, (x, y) in positions.items():
             # Círculo del router
-            self.canvas.create_oval(x-20, y-20, x+20, y+20, 
-                                   fill=color, outline="black", width=2, tags="router")
+            self.router_items[router] = self.canvas.create_oval(
+                x-r, y-r, x+r, y+r, fill="red", outline="black", width=2 if detailed else 1,
+                tags="router")
+            self.item_colors[self.router_items[router]] = "red"
+            if not detailed:
+                continue
             
             # Etiqueta del router
             self.canvas.create_text(x, y-35, text=router, font=("Arial", 10, "bold"), tags="label")
             
             # IP del router
             router_obj = self.router_manager.obtener_router(router)
-            if router_obj:
-                self.canvas.create_text(x, y+35, text=router_obj.ip, 
+            ip = router_obj.ip if router_obj else self.topology.ip(router)
+            if ip:
+                self.canvas.create_text(x, y+35, text=ip, 
                                       font=("Arial", 8), tags="ip")
+        
+        # Índice espacial para seleccionar routers con clic
+        self.spatial = SpatialGrid(SpatialGrid.celda_recomendada(len(positions), *self.canvas_extent(positions)))
+        self.spatial.cargar(positions)
+        x1, y1, x2, y2 = self.spatial.limites()
+        self.canvas.configure(scrollregion=(min(0, x1 - 60), min(0, y1 - 60), x2 + 60, y2 + 60))
+    
+    @staticmethod
+    def canvas_extent(positions):
+        """Ancho y alto ocupados por los routers"""
+        if not positions:
+            return 0, 0
+        xs = [x for x, _ in positions.values()]
+        ys = [y for _, y in positions.values()]
+        return max(xs) - min(xs), max(ys) - min(ys)
+    
+    def on_canvas_click(self, event):
+        """Selecciona el router sobre el que se hace clic"""
+        router = self.spatial.mas_cercano(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y),
+                                          self.router_radius)
+        if router is not None:
+            self.router_var.set(router)
+            self.on_router_selected()
+    
+    def load_topology_file(self):
+        """Carga una topología desde un archivo y la dibuja"""
+        from tkinter import filedialog
+        
+        filename = filedialog.askopenfilename(
+            filetypes=[("Topologías", "*.topo *.txt"), ("Todos los archivos", "*.*")],
+            title="Cargar topología"
+        )
+        if not filename:
+            return
+        
+        try:
+            inicio = time.perf_counter()
+            topology = config.TopologyConfig.get_topology(filename)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Error cargando la topología:\n{e}")
+            return
+        
+        self.topology = topology
+        for router in topology.positions:
+            self.status_colors.setdefault(router, "red")
+        self.create_topology_items()
+        self.draw_topology()
+        self.update_status(f"Topología cargada: {len(topology)} routers, "
+                           f"{len(topology.connections)} enlaces ({time.perf_counter() - inicio:.2f}s)")
+        self.layout_topology(topology)
+    
+    def layout_topology(self, topology, recalcular=False):
+        """
+        Calcula en segundo plano la posición de los routers sin coordenadas
+        (o de todos si recalcular) y vuelve a dibujar la topología al terminar
+        """
+        # El hilo trabaja con una copia; las posiciones se aplican en el hilo de Tk
+        nombres = list(topology.positions)
+        enlaces = list(topology.connections)
+        fijas = {} if recalcular else topology.placed_positions()
+        if len(fijas) == len(nombres):
+            return
+        previas = dict(topology.positions)
+        
+        def layout_thread():
+            try:
+                from topology_layout import ForceLayout
+            except ImportError as e:
+                self.update_status(f"Distribución automática no disponible: {e}")
+                return
+            
+            self.update_status(f"Calculando la distribución de {len(topology)} routers...")
+            inicio = time.perf_counter()
+            nuevas = ForceLayout(directorio_cache=config.DIRECTORIO_CACHE_LAYOUT).posiciones(nombres, enlaces, fijas)
+            duracion = time.perf_counter() - inicio
+            
+            def apply_layout():
+                if self.topology is not topology:
+                    return  # se cargó otra topología mientras tanto
+                # No se pisan los routers que cambiaron de posición durante el cálculo
+                colocados = 0
+                for nombre, posicion in nuevas.items():
+                    if topology.positions.get(nombre, posicion) == previas.get(nombre):
+                        topology.positions[nombre] = posicion
+                        colocados += 1
+                self.create_topology_items()
+                self.draw_topology()
+                self.update_status(f"Distribución calculada: {colocados} routers colocados ({duracion:.2f}s)")
+            
+            self.root.after(0, apply_layout)
+        
+        threading.Thread(target=layout_thread, daemon=True).start()
+    
+    def discover_topology(self):
+        """Descubre la topología con CDP/LLDP partiendo de los routers conectados"""
+        seeds = [nombre for nombre, router in self.router_manager.routers.items() if router.conectado]
+        if not seeds:
+            messagebox.showwarning("Advertencia", "No hay routers conectados")
+            return
+        usuario, password = config.ROUTERS_CONFIG[0].usuario, config.ROUTERS_CONFIG[0].password
+        
+        def connect_new(nombre, ip):
+            router = self.router_manager.agregar_router(nombre, ip, usuario, password)
+            conectado = self.call_engine(router.conectar)
+            self.status_colors[nombre] = "green" if conectado else "red"
+            self.health_monitor.actualizar_estado(nombre, bool(conectado))
+            return router if conectado else None
+        
+        def discovery_thread():
+            self.update_status(f"Descubriendo vecinos desde {len(seeds)} routers...")
+            timestamp = datetime.now().strftime('%H:%M:%S')
+            self.add_result(f"\n[{timestamp}] Descubrimiento de vecinos CDP/LLDP\n", "timestamp")
+            
+            def on_router_done(nombre, vecinos, duracion):
+                if vecinos is None:
+                    self.add_result(f"  ✗ {nombre:<10} sin respuesta ({duracion:.2f}s)\n", "error")
+                    return
+                nombres = ", ".join(sorted({vecino.nombre for vecino in vecinos})) or "ninguno"
+                self.add_result(f"  ✓ {nombre:<10} vecinos: {nombres} ({duracion:.2f}s)\n", "success")
+            
+            inicio = time.perf_counter()
+            discovery = TopologyDiscovery(self.router_manager.routers, conectar_nuevo=connect_new,
+                                          max_concurrencia=config.DESCUBRIMIENTO_CONCURRENCIA,
+                                          max_saltos=config.DESCUBRIMIENTO_MAX_SALTOS,
+                                          llamar=self.call_engine)
+            topology = discovery.descubrir(seeds, base=self.topology, callback=on_router_done)
+            duracion = time.perf_counter() - inicio
+            
+            def apply_topology():
+                self.topology = topology
+                for router in topology.positions:
+                    self.status_colors.setdefault(router, "red")
+                self.router_combo["values"] = sorted(self.router_manager.routers)
+                self.create_topology_items()
+                self.draw_topology()
+                self.update_status(f"Descubrimiento completado: {len(topology)} dispositivos, "
+                                   f"{len(topology.connections)} enlaces en {duracion:.2f}s")
+                self.layout_topology(topology)
+            
+            self.root.after(0, apply_topology)
+        
+        threading.Thread(target=discovery_thread, daemon=True).start()
+    
+    def set_item_color(self, item, color):
+        """Cambia el color de relleno de un elemento solo si es distinto"""
+        if self.item_colors.get(item) != color:
+            self.item_colors[item] = color
+            self.canvas.itemconfig(item, fill=color)
+    
+    def request_topology_redraw(self):
+        """
+        Solicita un repintado de la topología desde cualquier hilo.
+        Las solicitudes que llegan antes del repintado se agrupan en uno solo.
+        """
+        with self.redraw_lock:
+            if self.redraw_pending:
+                return
+            self.redraw_pending = True
+        self.root.after_idle(self.flush_topology_redraw)
+    
+    def flush_topology_redraw(self):
+        """Repinta la topología una vez por todas las solicitudes pendientes"""
+        with self.redraw_lock:
+            self.redraw_pending = False
+        self.draw_topology()
     
     def connect_all_routers(self):
         """Conecta a todos los routers"""
@@ -230,31 +508,91 @@ class NetworkTopologyGUI:
             self.update_status("Conectando a todos los routers...")
             self.add_result(f"\n[{datetime.now().strftime('%H:%M:%S')}] Iniciando conexiones...\n", "timestamp")
             
-            results = self.router_manager.conectar_todos()
+            total = len(self.router_manager.routers)
+            completados = []
             
-            for nombre, resultado in results.items():
+            def on_router_done(nombre, resultado, duracion):
+                completados.append(nombre)
+                self.health_monitor.actualizar_estado(nombre, bool(resultado))
                 if resultado:
                     self.status_colors[nombre] = "green"
-                    self.add_result(f"✓ {nombre} conectado exitosamente\n", "success")
+                    self.add_result(f"✓ {nombre} conectado exitosamente ({duracion:.2f}s)\n", "success")
                 else:
                     self.status_colors[nombre] = "red"
-                    self.add_result(f"✗ Error conectando a {nombre}\n", "error")
+                    self.add_result(f"✗ Error conectando a {nombre} ({duracion:.2f}s)\n", "error")
+                
+                self.request_topology_redraw()
+                self.update_status(f"Conectando routers... {len(completados)}/{total}")
             
-            self.root.after(0, self.draw_topology)
-            self.update_status("Conexiones completadas")
+            inicio = time.perf_counter()
+            results = self.call_engine(self.router_manager.conectar_todos, callback=on_router_done)
+            
+            conectados = sum(1 for resultado in results.values() if resultado)
+            self.update_status(f"Conexiones completadas: {conectados}/{total} "
+                               f"en {time.perf_counter() - inicio:.2f}s")
         
         threading.Thread(target=connect_thread, daemon=True).start()
     
     def disconnect_all_routers(self):
         """Desconecta todos los routers"""
-        self.router_manager.desconectar_todos()
+        self.call_engine(self.router_manager.desconectar_todos)
         for nombre in self.status_colors:
             self.status_colors[nombre] = "red"
+            self.health_monitor.actualizar_estado(nombre, False)
         
         self.draw_topology()
         self.update_status("Todos los routers desconectados")
         self.add_result(f"\n[{datetime.now().strftime('%H:%M:%S')}] Todos los routers desconectados\n", "timestamp")
     
+    def get_backup_store(self):
+        """Devuelve el almacén de respaldos, creándolo la primera vez"""
+        if self.backup_store is None:
+            self.backup_store = ConfigBackupStore(config.DIRECTORIO_RESPALDOS)
+        return self.backup_store
+    
+    def backup_configs(self):
+        """Respalda en paralelo la running-config de los routers conectados"""
+        targets = [nombre for nombre, router in self.router_manager.routers.items() if router.conectado]
+        if not targets:
+            messagebox.showwarning("Advertencia", "No hay routers conectados")
+            return
+        
+        def backup_thread():
+            self.update_status(f"Respaldando {len(targets)} routers...")
+            timestamp = datetime.now().strftime('%H:%M:%S')
+            self.add_result(f"\n[{timestamp}] Respaldo de configuraciones\n", "timestamp")
+            
+            def on_router_done(nombre, resultado, duracion):
+                if resultado is None:
+                    self.add_result(f"  ✗ {nombre:<10} no se pudo obtener la configuración\n", "error")
+                    return
+                hash_config, nueva = resultado
+                estado = "nueva revisión" if nueva else "sin cambios"
+                self.add_result(f"  ✓ {nombre:<10} {estado:<15} {hash_config[:12]} ({duracion:.2f}s)\n", "success")
+            
+            resultados = self.get_backup_store().respaldar_todos(
+                self.router_manager, targets, llamar=self.call_engine, callback=on_router_done)
+            nuevas = sum(1 for resultado in resultados.values() if resultado and resultado[1])
+            self.update_status(f"Respaldo completado: {nuevas} revisiones nuevas de {len(targets)} routers")
+        
+        threading.Thread(target=backup_thread, daemon=True).start()
+    
+    def show_config_changes(self, segundos):
+        """Muestra las diferencias de configuración de los routers que cambiaron en el periodo"""
+        store = self.get_backup_store()
+        desde = time.time() - segundos
+        cambios = store.cambios_desde(desde)
+        
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        self.add_result(f"\n[{timestamp}] Cambios de configuración en las últimas {segundos // 3600} h\n", "timestamp")
+        self.add_result("=" * 60 + "\n", "info")
+        if not cambios:
+            self.add_result("Sin cambios respaldados en el periodo\n", "success")
+        for nombre, cambio in cambios.items():
+            self.add_result(f"\n--- {nombre} ({cambio['revisiones']} revisiones) ---\n", "info")
+            self.add_result(store.diferencias(nombre, desde) or "(configuración nueva)\n", "warning")
+        self.add_result("=" * 60 + "\n", "info")
+    
     def on_router_selected(self, event=None):
         """Maneja la selección de router"""
         self.selected_router = self.router_var.get()
@@ -262,6 +600,10 @@ class NetworkTopologyGUI:
     
     def execute_query(self, command, description):
         """Ejecuta una consulta en el router seleccionado"""
+        if self.fanout_var.get():
+            self.execute_fanout_query(command, description)
+            return
+        
         if not self.selected_router:
             messagebox.showwarning("Advertencia", "Seleccione un router primero")
             return
@@ -274,33 +616,215 @@ class NetworkTopologyGUI:
             
             self.update_status(f"Ejecutando {description} en {self.selected_router}...")
             
-            result = router.obtener_informacion(command)
+            result = self.format_query_result(
+                self.call_engine(router.obtener_informacion, command, parsear=self.parsed_var.get(),
+                                 forzar=self.force_refresh_var.get()))
             
             timestamp = datetime.now().strftime('%H:%M:%S')
             self.add_result(f"\n[{timestamp}] {description} - {self.selected_router}\n", "timestamp")
             self.add_result("=" * 60 + "\n", "info")
             
             if result:
-                self.add_result(result + "\n", "success")
+                self.add_result(result + "\n", "success", self.selected_router, command)
             else:
                 if result is not None and str(result).strip():
-                    self.add_result(str(result) + "\n", "success")
+                    self.add_result(str(result) + "\n", "success", self.selected_router, command)
                 else:
                     self.add_result("No se obtuvo información (vacío)\n", "info")
             
             self.add_result("=" * 60 + "\n", "info")
-            self.update_status("Consulta completada")
+            stats = router.estadisticas_cache()
+            self.update_status(f"Consulta completada - caché {self.selected_router}: "
+                               f"{stats['hits']} aciertos / {stats['misses']} fallos")
         
         threading.Thread(target=query_thread, daemon=True).start()
     
+    def execute_all_queries(self):
+        """Ejecuta todas las consultas predefinidas en el router seleccionado en un único lote"""
+        if not self.selected_router:
+            messagebox.showwarning("Advertencia", "Seleccione un router primero")
+            return
+        
+        router_name = self.selected_router
+        
+        def batch_thread():
+            router = self.router_manager.obtener_router(router_name)
+            if not router:
+                self.root.after(0, lambda: messagebox.showerror("Error", "Router no encontrado"))
+                return
+            
+            self.update_status(f"Ejecutando todas las consultas en {router_name}...")
+            
+            inicio = time.perf_counter()
+            results = self.call_engine(router.obtener_varios, list(config.QUERY_COMMANDS.values()),
+                                       parsear=self.parsed_var.get(),
+                                       forzar=self.force_refresh_var.get())
+            total = time.perf_counter() - inicio
+            
+            timestamp = datetime.now().strftime('%H:%M:%S')
+            self.add_result(f"\n[{timestamp}] Todas las consultas - {router_name}\n", "timestamp")
+            
+            for description, command in config.QUERY_COMMANDS.items():
+                result = self.format_query_result(results.get(command))
+                self.add_result("=" * 60 + "\n", "info")
+                self.add_result(f"{description} ({command})\n", "info")
+                if result is not None and result.strip():
+                    self.add_result(result + "\n", "success", router_name, command)
+                else:
+                    self.add_result("No se obtuvo información (vacío)\n", "info", router_name, command)
+            
+            self.add_result("=" * 60 + "\n", "info")
+            self.update_status(f"{len(results)} consultas completadas en {total:.2f}s")
+        
+        threading.Thread(target=batch_thread, daemon=True).start()
+    
+    def execute_fanout_query(self, command, description):
+        """Ejecuta una consulta en varios routers a la vez"""
+        targets = [nombre for nombre in self.fanout_targets if nombre in self.router_manager.routers]
+        if not targets:
+            messagebox.showwarning("Advertencia", "Seleccione al menos un router")
+            return
+        
+        def fanout_thread():
+            self.update_status(f"Ejecutando {description} en {len(targets)} routers...")
+            
+            timestamp = datetime.now().strftime('%H:%M:%S')
+            self.add_result(f"\n[{timestamp}] {description} - {', '.join(targets)}\n", "timestamp")
+            self.add_result("=" * 60 + "\n", "info")
+            
+            latencies = {}
+            
+            def on_router_done(nombre, result, duracion):
+                result = self.format_query_result(result)
+                latencies[nombre] = (duracion, bool(result and result.strip()))
+                self.add_result(f"\n--- {nombre} ({duracion:.2f}s) ---\n", "info")
+                if result is not None and result.strip():
+                    self.add_result(result + "\n", "success", nombre, command)
+                else:
+                    self.add_result("No se obtuvo información\n", "error", nombre, command)
+                self.update_status(f"Ejecutando {description}... {len(latencies)}/{len(targets)}")
+            
+            inicio = time.perf_counter()
+            self.call_engine(self.router_manager.obtener_informacion, command,
+                             nombres=targets, callback=on_router_done,
+                             parsear=self.parsed_var.get(),
+                             forzar=self.force_refresh_var.get())
+            total = time.perf_counter() - inicio
+            
+            # Resumen de latencias por router, de más rápido a más lento
+            self.add_result("\n" + "=" * 60 + "\n", "info")
+            self.add_result(f"Resumen de latencias ({total:.2f}s en total):\n", "info")
+            for nombre, (duracion, ok) in sorted(latencies.items(), key=lambda item: item[1][0]):
+                self.add_result(f"  {'✓' if ok else '✗'} {nombre:<10} {duracion:6.2f}s\n",
+                                "success" if ok else "error")
+            for nombre in targets:
+                if nombre not in latencies:
+                    self.add_result(f"  ✗ {nombre:<10} sin respuesta\n", "error")
+            self.add_result("=" * 60 + "\n", "info")
+            
+            exitosos = sum(1 for _, ok in latencies.values() if ok)
+            self.update_status(f"Consulta completada: {exitosos}/{len(targets)} routers")
+        
+        threading.Thread(target=fanout_thread, daemon=True).start()
+    
+    def history_dialog(self):
+        """Muestra un diálogo para consultar resultados guardados sin contactar al router"""
+        if not self.selected_router:
+            messagebox.showwarning("Advertencia", "Seleccione un router primero")
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title(f"Historial - {self.selected_router}")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        frame = ttk.Frame(dialog, padding="10")
+        frame.pack(fill="both", expand=True)
+        
+        ttk.Label(frame, text="Consulta:").grid(row=0, column=0, sticky=tk.W, pady=2)
+        query_var = tk.StringVar(value=next(iter(config.QUERY_COMMANDS)))
+        ttk.Combobox(frame, textvariable=query_var, values=list(config.QUERY_COMMANDS),
+                     state="readonly", width=30).grid(row=0, column=1, pady=2)
+        
+        ttk.Label(frame, text="Hace (minutos):").grid(row=1, column=0, sticky=tk.W, pady=2)
+        minutes_var = tk.IntVar(value=60)
+        ttk.Spinbox(frame, from_=0, to=60 * 24 * 365, textvariable=minutes_var,
+                    width=10).grid(row=1, column=1, sticky=tk.W, pady=2)
+        
+        def accept():
+            try:
+                minutes = minutes_var.get()
+            except tk.TclError:
+                messagebox.showerror("Error", "Indique un número de minutos", parent=dialog)
+                return
+            dialog.destroy()
+            self.show_history(self.selected_router, query_var.get(), minutes * 60)
+        
+        ttk.Button(frame, text="Consultar", command=accept).grid(row=2, column=0, columnspan=2, pady=(10, 0))
+    
+    def show_history(self, router_name, description, seconds):
+        """Muestra el resultado guardado de una consulta tal como estaba hace 'seconds' segundos"""
+        command = config.QUERY_COMMANDS[description]
+        record = self.history.hace(router_name, command, seconds)
+        
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        self.add_result(f"\n[{timestamp}] Historial: {description} - {router_name} "
+                        f"(hace {seconds // 60} min)\n", "timestamp")
+        self.add_result("=" * 60 + "\n", "info")
+        if record is None:
+            self.add_result("No hay resultados guardados para ese momento\n", "warning")
+        else:
+            saved = datetime.fromtimestamp(record.instante).strftime('%Y-%m-%d %H:%M:%S')
+            self.add_result(f"Guardado el {saved}\n", "info")
+            self.add_result(record.salida + "\n", "success", router_name, command)
+        self.add_result("=" * 60 + "\n", "info")
+    
+    def format_query_result(self, result):
+        """Convierte el resultado de una consulta (texto o registros TextFSM) en texto"""
+        if isinstance(result, list):
+            return formatear_tabla(result)
+        return result
+    
+    def choose_fanout_routers(self):
+        """Muestra un diálogo para elegir los routers de las consultas múltiples"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Routers para consultas múltiples")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        main_frame = ttk.Frame(dialog, padding="10")
+        main_frame.pack(fill="both", expand=True)
+        
+        ttk.Label(main_frame, text="Routers destino:", style='Title.TLabel').pack(anchor="w")
+        
+        router_vars = {}
+        for nombre in self.router_manager.routers:
+            router_vars[nombre] = tk.BooleanVar(value=nombre in self.fanout_targets)
+            ttk.Checkbutton(main_frame, text=nombre, variable=router_vars[nombre]).pack(anchor="w")
+        
+        def set_all(value):
+            for var in router_vars.values():
+                var.set(value)
+        
+        def accept():
+            self.fanout_targets = [nombre for nombre, var in router_vars.items() if var.get()]
+            self.update_status(f"Routers para consultas múltiples: {len(self.fanout_targets)}")
+            dialog.destroy()
+        
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill="x", pady=(10, 0))
+        ttk.Button(button_frame, text="Todos", command=lambda: set_all(True)).pack(side="left")
+        ttk.Button(button_frame, text="Ninguno", command=lambda: set_all(False)).pack(side="left", padx=(5, 0))
+        ttk.Button(button_frame, text="Aceptar", command=accept).pack(side="right")
+    
     def config_dialog(self, config_type):
         """Muestra diálogo para configuración"""
-        if not self.selected_router:
+        if not self.selected_router and not self.fanout_var.get():
             messagebox.showwarning("Advertencia", "Seleccione un router primero")
             return
         
         dialog = tk.Toplevel(self.root)
-        dialog.title(f"Configurar {config_type} - {self.selected_router}")
+        dialog.title(f"Configurar {config_type} - {self.selected_router or 'varios routers'}")
         dialog.geometry("1200x800")
         dialog.transient(self.root)
         dialog.grab_set()
@@ -321,6 +845,23 @@ class NetworkTopologyGUI:
         default_commands = config.CONFIG_TEMPLATES.get(config_type, [])
         commands_text.insert("1.0", "\n".join(default_commands))
         
+        # Opciones de despliegue en varios routers
+        deploy_frame = ttk.LabelFrame(main_frame, text="Despliegue", padding="5")
+        deploy_frame.pack(fill="x", pady=(0, 10))
+        
+        multi_var = tk.BooleanVar(value=self.fanout_var.get())
+        canary_var = tk.BooleanVar(value=True)
+        rollback_var = tk.BooleanVar(value=True)
+        delta_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(deploy_frame, text="Desplegar en los routers de consultas múltiples",
+                       variable=multi_var).pack(anchor="w")
+        ttk.Checkbutton(deploy_frame, text=f"Canario primero ({config.DESPLIEGUE_CANARIOS} router)",
+                       variable=canary_var).pack(anchor="w")
+        ttk.Checkbutton(deploy_frame, text="Rollback automático si falla",
+                       variable=rollback_var).pack(anchor="w")
+        ttk.Checkbutton(deploy_frame, text="Solo diferencias (enviar lo que falta en la running-config)",
+                       variable=delta_var).pack(anchor="w")
+        
         # Botones
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill="x")
@@ -333,19 +874,42 @@ class NetworkTopologyGUI:
                 messagebox.showwarning("Advertencia", "Ingrese al menos un comando")
                 return
             
+            if multi_var.get():
+                targets = [nombre for nombre in self.fanout_targets if nombre in self.router_manager.routers]
+                if not targets:
+                    messagebox.showwarning("Advertencia", "Seleccione al menos un router")
+                    return
+                self.deploy_config(config_type, commands, targets,
+                                   canarios=config.DESPLIEGUE_CANARIOS if canary_var.get() else 0,
+                                   rollback=rollback_var.get(), solo_delta=delta_var.get())
+                dialog.destroy()
+                return
+            
+            if not self.selected_router:
+                messagebox.showwarning("Advertencia", "Seleccione un router primero")
+                return
+            
             def config_thread():
                 router = self.router_manager.obtener_router(self.selected_router)
                 if router:
-                    result = router.configurar(commands)
+                    sent = commands
+                    if delta_var.get():
+                        sent, result = self.call_engine(router.configurar_delta, commands)
+                    else:
+                        result = self.call_engine(router.configurar, commands)
                     
                     timestamp = datetime.now().strftime('%H:%M:%S')
                     self.add_result(f"\n[{timestamp}] Configuración {config_type} - {self.selected_router}\n", "timestamp")
                     self.add_result("=" * 60 + "\n", "info")
                     
-                    if result:
+                    if sent == []:
+                        self.add_result("✓ El router ya cumple la plantilla, no se envió nada\n", "success")
+                    elif result:
                         self.add_result("✓ Configuración aplicada exitosamente\n", "success")
+                        if sent is not commands:
+                            self.add_result(f"Diferencias: {len(sent)} de {len(commands)} comandos\n", "info")
                         self.add_result(f"Comandos ejecutados:\n", "info")
-                        for cmd in commands:
+                        for cmd in sent:
                             self.add_result(f"  - {cmd}\n", "info")
                     else:
                         self.add_result("✗ Error aplicando configuración\n", "error")
@@ -359,31 +923,79 @@ class NetworkTopologyGUI:
         ttk.Button(button_frame, text="Aplicar", command=apply_config).pack(side="right", padx=(5, 0))
         ttk.Button(button_frame, text="Cancelar", command=dialog.destroy).pack(side="right")
     
+    def deploy_config(self, config_type, commands, targets, canarios=0, rollback=True, solo_delta=False):
+        """Despliega una configuración en varios routers en paralelo"""
+        def deploy_thread():
+            self.update_status(f"Desplegando {config_type} en {len(targets)} routers...")
+            
+            timestamp = datetime.now().strftime('%H:%M:%S')
+            self.add_result(f"\n[{timestamp}] Despliegue {config_type} - {', '.join(targets)}\n", "timestamp")
+            self.add_result("=" * 60 + "\n", "info")
+            
+            tags = {
+                ResultadoDespliegue.APLICADO: "success",
+                ResultadoDespliegue.CONFORME: "success",
+                ResultadoDespliegue.REVERTIDO: "warning",
+                ResultadoDespliegue.OMITIDO: "warning",
+            }
+            terminados = []
+            
+            def on_router_done(nombre, resultado, duracion):
+                terminados.append(nombre)
+                self.add_result(f"{resultado}\n", tags.get(resultado.estado, "error"))
+                self.update_status(f"Desplegando {config_type}... {len(terminados)}/{len(targets)}")
+            
+            deployer = ConfigDeployer(self.router_manager.routers,
+                                      max_workers=config.MAX_CONEXIONES_SIMULTANEAS,
+                                      canarios=canarios, rollback=rollback, solo_delta=solo_delta,
+                                      llamar=self.call_engine)
+            inicio = time.perf_counter()
+            resultados = deployer.desplegar(commands, targets, callback=on_router_done)
+            total = time.perf_counter() - inicio
+            
+            # Resumen por router, en el orden de despliegue
+            self.add_result("\n" + "=" * 60 + "\n", "info")
+            self.add_result(f"Resumen del despliegue ({total:.2f}s en total):\n", "info")
+            for resultado in resultados.values():
+                self.add_result(f"  {resultado.nombre:<10} {resultado.estado:<17} {resultado.duracion:6.2f}s\n",
+                                tags.get(resultado.estado, "error"))
+            self.add_result("=" * 60 + "\n", "info")
+            
+            aplicados = sum(1 for resultado in resultados.values() if resultado.exito)
+            self.update_status(f"Despliegue {config_type}: {aplicados}/{len(targets)} routers")
+        
+        threading.Thread(target=deploy_thread, daemon=True).start()
+    
     def start_monitoring(self):
-        """Inicia el monitoreo automático de routers"""
+        """Inicia el monitoreo automático y concurrente de routers"""
         self.monitoring_active = True
         
-        def monitor_thread():
-            while self.monitoring_active:
-                try:
-                    for nombre, router in self.router_manager.routers.items():
-                        if router.conectado:
-                            if router.verificar_conexion():
-                                self.status_colors[nombre] = "green"
-                            else:
-                                self.status_colors[nombre] = "red"
-                        else:
-                            self.status_colors[nombre] = "red"
-                    
-                    # Actualizar topología en el hilo principal
-                    self.root.after(0, self.draw_topology)
-                    
-                    time.sleep(10)  # Monitorear cada 10 segundos
-                except Exception as e:
-                    print(f"Error en monitoreo: {e}")
-                    time.sleep(10)
+        def probe(router):
+            return router.conectado and self.call_engine(router.verificar_conexion)
         
-        threading.Thread(target=monitor_thread, daemon=True).start()
+        def on_status_change(nombre, vivo):
+            self.status_colors[nombre] = "green" if vivo else "red"
+            # Repintado agrupado en el hilo principal
+            self.request_topology_redraw()
+        
+        self.health_monitor = HealthMonitor(
+            self.router_manager.routers, on_status_change, sonda=probe,
+            max_workers=config.MAX_CONEXIONES_SIMULTANEAS,
+            timeout_sonda=config.MONITOR_TIMEOUT_SONDA,
+            intervalo_min=config.MONITOR_INTERVALO_MIN,
+            intervalo_max=config.MONITOR_INTERVALO_MAX,
+        )
+        self.health_monitor.iniciar()
+    
+    def call_engine(self, function, *args, **kwargs):
+        """
+        Invoca una operación del motor de conexiones y devuelve su resultado.
+        Con el motor asyncio la corrutina se ejecuta en el hilo del event loop.
+        """
+        result = function(*args, **kwargs)
+        if isinstance(result, types.CoroutineType):
+            return self.loop_thread.ejecutar(result)
+        return result
     
     def update_status(self, message):
         """Actualiza el mensaje de estado"""
@@ -392,53 +1004,67 @@ class NetworkTopologyGUI:
         
         self.root.after(0, update)
     
-    def add_result(self, text, tag=""):
-        """Añade texto al área de resultados"""
-        def add():
-            self.results_text.insert(tk.END, text, tag)
-            self.results_text.see(tk.END)
-        
-        self.root.after(0, add)
+    def add_result(self, text, tag="", router="", command=""):
+        """
+        Añade texto al área de resultados (desde cualquier hilo); router y
+        command se conservan en la exportación JSON Lines
+        """
+        self.console.write(text, tag, router, command)
     
     def clear_results(self):
         """Limpia el área de resultados"""
-        self.results_text.delete(1.0, tk.END)
+        self.console.discard()
+        self.results_text.clear()
         timestamp = datetime.now().strftime('%H:%M:%S')
         self.add_result(f"[{timestamp}] Se ha limpiado la consola\n", "info")
     
+    def search_results(self):
+        """Busca el texto indicado en la consola (siguiente coincidencia)"""
+        term = self.search_var.get()
+        if term and not self.results_text.find(term):
+            self.update_status(f"'{term}' no aparece en la consola")
+    
     def export_results(self):
-        """Exporta los resultados a un archivo"""
+        """Exporta la consola a un archivo en segundo plano (texto, JSON Lines o gzip)"""
         from tkinter import filedialog
         
-        content = self.results_text.get(1.0, tk.END)
-        if not content.strip():
+        if not self.results_text.log.tamano:
             messagebox.showinfo("Información", "No hay información para exportar")
             return
         
         filename = filedialog.asksaveasfilename(
             defaultextension=".txt",
-            filetypes=[("Archivos de texto", "*.txt"), ("Todos los archivos", "*.*")],
+            filetypes=EXPORT_FILETYPES,
             title="Exportar"
         )
+        if not filename:
+            return
         
-        if filename:
-            try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(f"Consola exportada - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    f.write("=" * 60 + "\n\n")
-                    f.write(content)
-                
+        def on_done(completed, error):
+            if error:
+                self.add_result(f"Error exportando: {error}\n", "error")
+                messagebox.showerror("Error", f"Error exportando archivo:\n{error}")
+            elif completed:
                 self.add_result(f"Consola exportada a: {filename}\n", "success")
                 messagebox.showinfo("Éxito", f"Consola exportada a:\n{filename}")
-                
-            except Exception as e:
-                self.add_result(f"Error exportando: {e}\n", "error")
-                messagebox.showerror("Error", f"Error exportando archivo:\n{e}")
+            else:
+                self.update_status("Exportación cancelada")
+        
+        header = (f"Consola exportada - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                  + "=" * 60 + "\n\n")
+        self.results_text.export(filename, on_done, header)
     
     def on_closing(self):
         """Maneja el cierre de la aplicación"""
         self.monitoring_active = False
-        self.router_manager.desconectar_todos()
+        self.console.stop()
+        self.results_text.close()
+        self.health_monitor.detener()
+        self.call_engine(self.router_manager.desconectar_todos)
+        if self.loop_thread:
+            self.loop_thread.detener()
+        # El historial se cierra al final, cuando ya no quedan consultas en curso
+        self.history.cerrar()
         self.root.destroy()
 
 
@@ -456,6 +1082,10 @@ def main():
     y = (root.winfo_screenheight() - root.winfo_height()) // 2
     root.geometry(f"+{x}+{y}")
     
+    # Pintar la ventana antes de dibujar la topología (puede tener miles de routers)
+    root.update()
+    app.show_initial_topology()
+    
     # Iniciar la aplicación
     root.mainloop()
 
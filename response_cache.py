@@ -0,0 +1,80 @@
+"""
+Caché de respuestas de comandos show por router.
+Cada entrada caduca tras un TTL y el tamaño total está acotado con
+política LRU (se descarta la entrada usada hace más tiempo).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+TTL_POR_DEFECTO = 5  # segundos
+MAX_ENTRADAS_POR_DEFECTO = 64
+
+
+def es_cacheable(comando):
+    """Solo se cachean comandos de consulta (show)"""
+    return comando.strip().lower().startswith("show")
+
+
+class ResponseCache:
+    """Caché TTL + LRU, segura entre hilos, con contadores de aciertos y fallos"""
+
+    def __init__(self, ttl=TTL_POR_DEFECTO, max_entradas=MAX_ENTRADAS_POR_DEFECTO):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.hits = 0
+        self.misses = 0
+        self._entradas = OrderedDict()  # clave -> (instante de caducidad, valor)
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        """Devuelve el valor vigente para la clave o None"""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.misses += 1
+                return None
+
+            caducidad, valor = entrada
+            if time.monotonic() >= caducidad:
+                del self._entradas[clave]
+                self.misses += 1
+                return None
+
+            self._entradas.move_to_end(clave)
+            self.hits += 1
+            return valor
+
+    def guardar(self, clave, valor):
+        """Guarda un valor, descartando las entradas menos usadas si se supera el límite"""
+        if self.ttl <= 0 or self.max_entradas <= 0:
+            return
+        with self._lock:
+            self._entradas[clave] = (time.monotonic() + self.ttl, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, clave=None):
+        """Elimina una entrada o, sin clave, toda la caché"""
+        with self._lock:
+            if clave is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(clave, None)
+
+    def estadisticas(self):
+        """Devuelve aciertos, fallos, tasa de aciertos y tamaño actual"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'ratio': self.hits / total if total else 0.0,
+                'entradas': len(self._entradas),
+            }
+
+    def __len__(self):
+        return len(self._entradas)
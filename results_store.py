@@ -0,0 +1,255 @@
+"""
+Historial persistente de resultados de comandos y de logs en SQLite.
+
+La base de datos usa WAL, de modo que las consultas no bloquean las
+escrituras. Las escrituras se encolan y un único hilo escritor las agrupa
+en transacciones de hasta LOTE_MAX elementos, así que registrar un
+resultado no espera al disco. Las salidas se guardan una sola vez,
+comprimidas con zlib e identificadas por su SHA-1: una tabla ARP que no
+cambia entre consultas no ocupa espacio nuevo.
+
+Los resultados se indexan por (router, comando, instante), (comando,
+instante) e instante, y los logs por (router, instante) e instante, de
+modo que "la tabla ARP de R2 hace una hora" es una búsqueda en el índice.
+"""
+
+import hashlib
+import os
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+from textfsm_parser import normalizar_comando
+
+
+LOTE_MAX = 500  # elementos por transacción
+ESPERA_LOTE = 0.2  # segundos máximos que un elemento espera a completar su lote
+
+Registro = namedtuple("Registro", "instante router comando salida")
+RegistroLog = namedtuple("RegistroLog", "instante router tipo comando mensaje")
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS salidas (
+    hash BLOB PRIMARY KEY,
+    texto BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS resultados (
+    id INTEGER PRIMARY KEY,
+    instante REAL NOT NULL,
+    router TEXT NOT NULL,
+    comando TEXT NOT NULL,
+    hash BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resultados_router_comando ON resultados (router, comando, instante);
+CREATE INDEX IF NOT EXISTS resultados_comando ON resultados (comando, instante);
+CREATE INDEX IF NOT EXISTS resultados_instante ON resultados (instante);
+CREATE TABLE IF NOT EXISTS logs (
+    id INTEGER PRIMARY KEY,
+    instante REAL NOT NULL,
+    router TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    comando TEXT NOT NULL,
+    mensaje TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS logs_router ON logs (router, instante);
+CREATE INDEX IF NOT EXISTS logs_instante ON logs (instante);
+"""
+
+_FIN = object()
+
+
+class ResultStore:
+    """Almacén SQLite de resultados y logs con un hilo escritor por lotes"""
+
+    def __init__(self, ruta="historial.db", lote_max=LOTE_MAX, espera_lote=ESPERA_LOTE):
+        self.ruta = ruta
+        self.lote_max = lote_max
+        self.espera_lote = espera_lote
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+
+        conexion = self._conectar()
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.executescript(_ESQUEMA)
+        conexion.close()
+
+        self.escritos = 0
+        self.lotes = 0
+        self.cerrado = False
+        self._cola = queue.Queue()
+        self._local = threading.local()
+        self._lecturas = []  # conexiones de lectura de cada hilo, para cerrarlas
+        self._lock = threading.Lock()
+        self._escritor = threading.Thread(target=self._escribir, name="ResultStore", daemon=True)
+        self._escritor.start()
+
+    def _conectar(self):
+        conexion = sqlite3.connect(self.ruta, timeout=30, check_same_thread=False)
+        conexion.execute("PRAGMA synchronous=NORMAL")
+        return conexion
+
+    # ------------------------------------------------------------------
+    # Escritura
+
+    def guardar_resultado(self, router, comando, salida, instante=None):
+        """Encola la salida de un comando (no espera a que se escriba); se ignora si el almacén está cerrado"""
+        if salida is None:
+            return
+        instante = time.time() if instante is None else instante
+        self._encolar(("resultado", instante, router, normalizar_comando(comando), salida))
+
+    def guardar_log(self, mensaje, tipo="info", router="", comando="", instante=None):
+        """Encola un log (no espera a que se escriba); se ignora si el almacén está cerrado"""
+        instante = time.time() if instante is None else instante
+        self._encolar(("log", instante, router, tipo, normalizar_comando(comando), mensaje))
+
+    def _encolar(self, elemento):
+        # Con el lock, nada se encola detrás de la marca de fin que pone cerrar()
+        with self._lock:
+            if not self.cerrado:
+                self._cola.put(elemento)
+
+    def vaciar(self):
+        """Espera a que se escriba todo lo encolado"""
+        self._cola.join()
+
+    def cerrar(self):
+        """
+        Escribe lo pendiente, detiene el hilo escritor y cierra las conexiones.
+        Lo que se guarde después se descarta
+        """
+        with self._lock:
+            if not self.cerrado:
+                self.cerrado = True
+                self._cola.put(_FIN)
+        self._escritor.join()
+        with self._lock:
+            for conexion in self._lecturas:
+                conexion.close()
+            self._lecturas.clear()
+
+    def _escribir(self):
+        """Hilo escritor: agrupa los elementos encolados en transacciones"""
+        conexion = self._conectar()
+        terminar = False
+        while not terminar:
+            elementos = [self._cola.get()]
+            limite = time.monotonic() + self.espera_lote
+            while len(elementos) < self.lote_max and elementos[-1] is not _FIN:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    elementos.append(self._cola.get(timeout=restante))
+                except queue.Empty:
+                    break
+
+            terminar = elementos[-1] is _FIN
+            try:
+                self._escribir_lote(conexion, [e for e in elementos if e is not _FIN])
+            except sqlite3.Error as e:
+                print(f"Error guardando {len(elementos)} elementos en el historial: {e}")
+            finally:
+                for _ in elementos:
+                    self._cola.task_done()
+        conexion.close()
+
+    def _escribir_lote(self, conexion, elementos):
+        if not elementos:
+            return
+        salidas, resultados, logs = {}, [], []
+        for elemento in elementos:
+            if elemento[0] == "resultado":
+                _, instante, router, comando, salida = elemento
+                datos = salida.encode("utf-8")
+                hash_salida = hashlib.sha1(datos).digest()
+                if hash_salida not in salidas:
+                    salidas[hash_salida] = datos
+                resultados.append((instante, router, comando, hash_salida))
+            else:
+                logs.append(elemento[1:])
+
+        with conexion:
+            if salidas:
+                # Solo se comprimen las salidas que no están ya guardadas
+                marcadores = ",".join("?" * len(salidas))
+                existentes = {fila[0] for fila in conexion.execute(
+                    f"SELECT hash FROM salidas WHERE hash IN ({marcadores})", list(salidas))}
+                conexion.executemany("INSERT OR IGNORE INTO salidas (hash, texto) VALUES (?, ?)",
+                                     [(h, zlib.compress(d)) for h, d in salidas.items() if h not in existentes])
+            conexion.executemany("INSERT INTO resultados (instante, router, comando, hash) VALUES (?, ?, ?, ?)",
+                                 resultados)
+            conexion.executemany("INSERT INTO logs (instante, router, tipo, comando, mensaje) "
+                                 "VALUES (?, ?, ?, ?, ?)", logs)
+        self.escritos += len(elementos)
+        self.lotes += 1
+
+    # ------------------------------------------------------------------
+    # Consultas
+
+    def _lectura(self):
+        """Conexión de lectura del hilo actual"""
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            conexion = self._local.conexion = self._conectar()
+            with self._lock:
+                self._lecturas.append(conexion)
+        return conexion
+
+    def consultar(self, router=None, comando=None, desde=None, hasta=None, limite=100):
+        """
+        Resultados (Registro) que cumplen los filtros, del más reciente al
+        más antiguo; desde/hasta son instantes de time.time()
+        """
+        condiciones, parametros = _filtros(router=router, comando=comando, desde=desde, hasta=hasta)
+        filas = self._lectura().execute(
+            "SELECT r.instante, r.router, r.comando, s.texto FROM resultados r "
+            f"JOIN salidas s ON s.hash = r.hash {condiciones} ORDER BY r.instante DESC LIMIT ?",
+            parametros + [limite]).fetchall()
+        return [Registro(instante, router, comando, zlib.decompress(texto).decode("utf-8"))
+                for instante, router, comando, texto in filas]
+
+    def en_instante(self, router, comando, instante):
+        """Último resultado del comando en el router en el instante indicado, o None"""
+        resultados = self.consultar(router, comando, hasta=instante, limite=1)
+        return resultados[0] if resultados else None
+
+    def hace(self, router, comando, segundos):
+        """Resultado que se tenía hace 'segundos' (p. ej. la tabla ARP de R2 hace una hora)"""
+        return self.en_instante(router, comando, time.time() - segundos)
+
+    def comandos(self, router=None):
+        """Comandos con resultados guardados (de un router o de todos)"""
+        condiciones, parametros = _filtros(router=router)
+        filas = self._lectura().execute(
+            f"SELECT DISTINCT comando FROM resultados r {condiciones} ORDER BY comando", parametros)
+        return [fila[0] for fila in filas]
+
+    def consultar_logs(self, router=None, tipo=None, desde=None, hasta=None, limite=1000):
+        """Logs (RegistroLog) que cumplen los filtros, del más reciente al más antiguo"""
+        condiciones, parametros = _filtros(router=router, tipo=tipo, desde=desde, hasta=hasta)
+        filas = self._lectura().execute(
+            "SELECT r.instante, r.router, r.tipo, r.comando, r.mensaje FROM logs r "
+            f"{condiciones} ORDER BY r.instante DESC LIMIT ?", parametros + [limite])
+        return [RegistroLog(*fila) for fila in filas]
+
+
+def _filtros(router=None, comando=None, tipo=None, desde=None, hasta=None):
+    """Cláusula WHERE (sobre el alias r) y sus parámetros"""
+    condiciones, parametros = [], []
+    for columna, valor in (("router", router), ("tipo", tipo),
+                           ("comando", comando and normalizar_comando(comando))):
+        if valor is not None:
+            condiciones.append(f"r.{columna} = ?")
+            parametros.append(valor)
+    if desde is not None:
+        condiciones.append("r.instante >= ?")
+        parametros.append(desde)
+    if hasta is not None:
+        condiciones.append("r.instante <= ?")
+        parametros.append(hasta)
+    return ("WHERE " + " AND ".join(condiciones)) if condiciones else "", parametros
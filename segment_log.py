@@ -0,0 +1,289 @@
+"""
+Log de solo añadido en disco para la salida de la consola.
+
+El texto se escribe en segmentos (archivos de unos megas) y se lee con mmap,
+de modo que la salida de una sesión larga no ocupa memoria del proceso:
+en memoria solo quedan el desplazamiento de cada línea y el de cada tramo
+de texto con el mismo tag y contexto (router y comando), con su instante.
+Así se puede pedir cualquier rango de líneas con sus tags, buscar texto
+recorriendo los segmentos por bloques y exportar copiando los bloques tal
+cual o tramo a tramo con sus metadatos.
+"""
+
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+
+
+SEGMENTO_BYTES = 8 * 1024 * 1024  # tamaño a partir del cual se abre un segmento nuevo
+BLOQUE_LECTURA = 1024 * 1024  # bytes por bloque en búsquedas y exportaciones
+
+
+class _Segmento:
+    """Archivo de segmento: desplazamiento global, tamaño y mapa de lectura"""
+
+    __slots__ = ("inicio", "ruta", "tamano", "mapa")
+
+    def __init__(self, inicio, ruta):
+        self.inicio = inicio
+        self.ruta = ruta
+        self.tamano = 0
+        self.mapa = None  # mmap de lectura (se rehace si el segmento creció)
+
+    def leer(self, desde, hasta):
+        """Bytes [desde, hasta) relativos al segmento"""
+        if self.mapa is None or len(self.mapa) < hasta:
+            self.cerrar()
+            with open(self.ruta, "rb") as archivo:
+                self.mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.mapa[desde:hasta]
+
+    def cerrar(self):
+        if self.mapa is not None:
+            self.mapa.close()
+            self.mapa = None
+
+
+class SegmentLog:
+    """
+    Log de texto con tags en segmentos de disco.
+    Las líneas se numeran desde 0; la última puede estar incompleta (sin
+    salto de línea) y se completa con las escrituras siguientes.
+    """
+
+    def __init__(self, directorio=None, segmento_bytes=SEGMENTO_BYTES):
+        """directorio=None usa un directorio temporal que se borra al cerrar"""
+        self.segmento_bytes = segmento_bytes
+        self._temporal = directorio is None
+        self.directorio = tempfile.mkdtemp(prefix="consola_") if directorio is None else directorio
+        os.makedirs(self.directorio, exist_ok=True)
+        self._lock = threading.RLock()
+        self._fd = None  # descriptor del segmento en escritura
+        self._contador = 0
+        self._generacion = 0  # cambia con cada limpiar(); invalida las lecturas en curso
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self._segmentos = []
+        self._inicios = []  # desplazamiento global de cada segmento (para bisect)
+        self.tamano = 0
+        self._lineas = array("q", [0])  # desplazamiento de inicio de cada línea
+        self._tramos = array("q")  # desplazamiento de inicio de cada tramo de texto
+        self._claves_tramo = array("I")  # (tag, router, comando) de cada tramo, índice en _claves
+        self._instantes = array("d")  # instante de la escritura que abrió cada tramo
+        self._claves = []
+        self._indice_clave = {}
+
+    @property
+    def num_lineas(self):
+        """Líneas escritas, contando la última aunque esté incompleta"""
+        with self._lock:
+            return len(self._lineas) - (self._lineas[-1] == self.tamano)
+
+    def tamano_indice(self):
+        """Bytes que ocupan en memoria los índices de líneas y tramos"""
+        with self._lock:
+            return (sum(sys.getsizeof(a) for a in (self._lineas, self._tramos, self._claves_tramo, self._instantes))
+                    + sys.getsizeof(self._claves) + sys.getsizeof(self._indice_clave))
+
+    def escribir(self, segmentos):
+        """
+        Añade una secuencia de (texto, tag) o (texto, tag, contexto) con una
+        sola escritura en disco; contexto es (router, comando) o None
+        """
+        with self._lock:
+            partes = []
+            posicion = self.tamano
+            instante = time.time()
+            anterior = None
+            for texto, tag, *contexto in segmentos:
+                datos = texto.encode("utf-8")
+                if not datos:
+                    continue
+                # Las escrituras seguidas de una misma llamada con el mismo
+                # tag y contexto forman un solo tramo
+                clave = self._id_clave((tag,) + tuple(contexto[0] if contexto and contexto[0] else ("", "")))
+                if clave != anterior:
+                    self._tramos.append(posicion)
+                    self._claves_tramo.append(clave)
+                    self._instantes.append(instante)
+                    anterior = clave
+                partes.append(datos)
+                posicion += len(datos)
+            if not partes:
+                return
+
+            bloque = b"".join(partes)
+            lineas = bloque.split(b"\n")
+            if len(lineas) > 1:
+                finales = accumulate((len(linea) + 1 for linea in lineas[:-1]), initial=self.tamano)
+                next(finales)
+                self._lineas.extend(finales)
+            segmento = self._segmento_activo()
+            escritos = 0
+            while escritos < len(bloque):
+                escritos += os.write(self._fd, bloque[escritos:])
+            segmento.tamano += len(bloque)
+            self.tamano = posicion
+            if segmento.tamano >= self.segmento_bytes:
+                os.close(self._fd)
+                self._fd = None
+
+    def _id_clave(self, clave):
+        indice = self._indice_clave.get(clave)
+        if indice is None:
+            indice = self._indice_clave[clave] = len(self._claves)
+            self._claves.append(clave)
+        return indice
+
+    def _segmento_activo(self):
+        if self._fd is None:
+            ruta = os.path.join(self.directorio, f"{self._contador:06d}.seg")
+            self._contador += 1
+            self._fd = os.open(ruta, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0))
+            self._segmentos.append(_Segmento(self.tamano, ruta))
+            self._inicios.append(self.tamano)
+        return self._segmentos[-1]
+
+    def leer(self, desde, hasta):
+        """Bytes [desde, hasta) del log"""
+        with self._lock:
+            hasta = min(hasta, self.tamano)
+            partes = []
+            i = bisect_right(self._inicios, desde) - 1
+            while desde < hasta:
+                segmento = self._segmentos[i]
+                fin = min(hasta, segmento.inicio + segmento.tamano)
+                partes.append(segmento.leer(desde - segmento.inicio, fin - segmento.inicio))
+                desde = fin
+                i += 1
+            return b"".join(partes)
+
+    def desplazamiento(self, linea):
+        """Desplazamiento en bytes del inicio de una línea (el final del log si no existe)"""
+        with self._lock:
+            return self._lineas[linea] if linea < len(self._lineas) else self.tamano
+
+    def linea_de(self, desplazamiento):
+        """Línea que contiene el byte indicado"""
+        with self._lock:
+            return bisect_right(self._lineas, desplazamiento) - 1
+
+    def segmentos(self, desde, hasta):
+        """
+        Texto de las líneas [desde, hasta) como lista plana texto, tag,
+        texto, tag... (los argumentos de Text.insert)
+        """
+        with self._lock:
+            inicio, fin = self.desplazamiento(desde), self.desplazamiento(hasta)
+            datos = self.leer(inicio, fin)
+            resultado = []
+            i = bisect_right(self._tramos, inicio) - 1
+            posicion = inicio
+            while posicion < fin:
+                final = min(fin, self._tramos[i + 1] if i + 1 < len(self._tramos) else self.tamano)
+                resultado.append(datos[posicion - inicio:final - inicio].decode("utf-8", "replace"))
+                resultado.append(self._claves[self._claves_tramo[i]][0])
+                posicion = final
+                i += 1
+            return resultado
+
+    def buscar(self, termino, desde=0):
+        """
+        Primera línea a partir de 'desde' que contiene el término (sin
+        distinguir mayúsculas), o None
+        """
+        termino = termino.lower()
+        if not termino:
+            return None
+        linea = desde
+        while True:
+            # Bloques de líneas completas: ninguna coincidencia queda partida
+            with self._lock:
+                total = self.num_lineas
+                if linea >= total:
+                    return None
+                inicio = self.desplazamiento(linea)
+                fin = min(total, max(linea + 1, self.linea_de(inicio + BLOQUE_LECTURA)))
+                texto = self.leer(inicio, self.desplazamiento(fin)).decode("utf-8", "replace").lower()
+            encontrado = texto.find(termino)
+            if encontrado != -1:
+                return linea + texto.count("\n", 0, encontrado)
+            linea = fin
+
+    def bloques(self, tamano_bloque=BLOQUE_LECTURA):
+        """
+        Recorre el contenido escrito hasta ahora en bloques de bytes.
+        Lanza RuntimeError si el log se limpia durante el recorrido
+        """
+        with self._lock:
+            total, generacion = self.tamano, self._generacion
+        for desde in range(0, total, tamano_bloque):
+            with self._lock:
+                self._comprobar_generacion(generacion)
+                bloque = self.leer(desde, min(total, desde + tamano_bloque))
+            yield bloque
+
+    def entradas(self):
+        """
+        Recorre el contenido escrito hasta ahora tramo a tramo como
+        (instante, router, tag, comando, texto).
+        Lanza RuntimeError si el log se limpia durante el recorrido
+        """
+        with self._lock:
+            total, tramos, generacion = self.tamano, len(self._tramos), self._generacion
+        i = 0
+        while i < tramos:
+            # Se leen varios tramos de una vez para no hacer una lectura por tramo
+            with self._lock:
+                self._comprobar_generacion(generacion)
+                inicio = self._tramos[i]
+                j = max(i + 1, bisect_right(self._tramos, inicio + BLOQUE_LECTURA, i, tramos) - 1)
+                fin = self._tramos[j] if j < tramos else total
+                datos = self.leer(inicio, fin)
+                bloque = []
+                for k in range(i, j):
+                    desde = self._tramos[k] - inicio
+                    hasta = (self._tramos[k + 1] if k + 1 < tramos else total) - inicio
+                    tag, router, comando = self._claves[self._claves_tramo[k]]
+                    bloque.append((self._instantes[k], router, tag, comando,
+                                   datos[desde:hasta].decode("utf-8", "replace")))
+            yield from bloque
+            i = j
+
+    def limpiar(self):
+        """Borra todo el contenido y sus segmentos"""
+        with self._lock:
+            self._cerrar_archivos()
+            for segmento in self._segmentos:
+                try:
+                    os.remove(segmento.ruta)
+                except OSError as e:
+                    print(f"No se pudo borrar el segmento {segmento.ruta}: {e}")
+            self._reiniciar()
+            self._generacion += 1
+
+    def _comprobar_generacion(self, generacion):
+        if generacion != self._generacion:
+            raise RuntimeError("El log se limpió durante la lectura")
+
+    def cerrar(self):
+        """Libera los archivos; el directorio temporal se borra"""
+        with self._lock:
+            self._cerrar_archivos()
+            if self._temporal:
+                shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def _cerrar_archivos(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        for segmento in self._segmentos:
+            segmento.cerrar()
@@ -0,0 +1,93 @@
+"""
+Índice espacial en rejilla para localizar routers en el canvas.
+Divide el plano en celdas cuadradas y guarda en cada celda los elementos
+cuyo punto cae en ella, de modo que las búsquedas por clic o al pasar el
+ratón solo revisan las celdas cercanas en lugar de todos los elementos.
+"""
+
+import math
+
+
+class SpatialGrid:
+    """Rejilla uniforme de puntos con búsqueda del más cercano y por rectángulo"""
+
+    def __init__(self, celda=64):
+        self.celda = celda
+        self._celdas = {}  # (columna, fila) -> {clave: (x, y)}
+        self._posiciones = {}  # clave -> (x, y)
+
+    def _celda_de(self, x, y):
+        return int(x // self.celda), int(y // self.celda)
+
+    def insertar(self, clave, x, y):
+        """Añade o mueve un elemento"""
+        if clave in self._posiciones:
+            self.eliminar(clave)
+        self._posiciones[clave] = (x, y)
+        self._celdas.setdefault(self._celda_de(x, y), {})[clave] = (x, y)
+
+    def eliminar(self, clave):
+        posicion = self._posiciones.pop(clave, None)
+        if posicion is None:
+            return
+        celda = self._celda_de(*posicion)
+        elementos = self._celdas.get(celda)
+        if elementos is not None:
+            elementos.pop(clave, None)
+            if not elementos:
+                del self._celdas[celda]
+
+    def cargar(self, posiciones):
+        """Reconstruye el índice a partir de un diccionario clave -> (x, y)"""
+        self._celdas.clear()
+        self._posiciones = dict(posiciones)
+        celda = self.celda
+        for clave, (x, y) in self._posiciones.items():
+            self._celdas.setdefault((int(x // celda), int(y // celda)), {})[clave] = (x, y)
+
+    def mas_cercano(self, x, y, radio):
+        """Devuelve la clave del elemento más cercano a (x, y) dentro de radio, o None"""
+        mejor = None
+        mejor_distancia = radio * radio
+        c1, f1 = self._celda_de(x - radio, y - radio)
+        c2, f2 = self._celda_de(x + radio, y + radio)
+        for columna in range(c1, c2 + 1):
+            for fila in range(f1, f2 + 1):
+                for clave, (px, py) in self._celdas.get((columna, fila), {}).items():
+                    distancia = (px - x) ** 2 + (py - y) ** 2
+                    if distancia <= mejor_distancia:
+                        mejor, mejor_distancia = clave, distancia
+        return mejor
+
+    def en_rectangulo(self, x1, y1, x2, y2):
+        """Claves de los elementos dentro del rectángulo"""
+        c1, f1 = self._celda_de(min(x1, x2), min(y1, y2))
+        c2, f2 = self._celda_de(max(x1, x2), max(y1, y2))
+        encontrados = []
+        for columna in range(c1, c2 + 1):
+            for fila in range(f1, f2 + 1):
+                for clave, (px, py) in self._celdas.get((columna, fila), {}).items():
+                    if min(x1, x2) <= px <= max(x1, x2) and min(y1, y2) <= py <= max(y1, y2):
+                        encontrados.append(clave)
+        return encontrados
+
+    def limites(self):
+        """Rectángulo (x1, y1, x2, y2) que contiene todos los elementos"""
+        if not self._posiciones:
+            return 0, 0, 0, 0
+        xs = [x for x, _ in self._posiciones.values()]
+        ys = [y for _, y in self._posiciones.values()]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    @staticmethod
+    def celda_recomendada(cantidad, ancho, alto, por_celda=4):
+        """Tamaño de celda para tener unos por_celda elementos por celda de media"""
+        if cantidad <= 0:
+            return 64
+        return max(16, math.sqrt(max(ancho * alto, 1) * por_celda / cantidad))
+
+    def __len__(self):
+        return len(self._posiciones)
+
+    def __contains__(self, clave):
+        return clave in self._posiciones
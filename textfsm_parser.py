@@ -0,0 +1,116 @@
+"""
+Parseo estructurado de salidas show mediante plantillas TextFSM.
+Las plantillas viven en templates/ y se compilan una única vez por comando.
+"""
+
+import os
+import threading
+
+
+DIRECTORIO_PLANTILLAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# Plantilla TextFSM para cada comando de consulta
+PLANTILLAS = {
+    "show ip arp": "cisco_ios_show_ip_arp.textfsm",
+    "show access-lists": "cisco_ios_show_access-lists.textfsm",
+    "show ip dhcp binding": "cisco_ios_show_ip_dhcp_binding.textfsm",
+    "show ip protocols": "cisco_ios_show_ip_protocols.textfsm",
+    "show ip interface brief": "cisco_ios_show_ip_interface_brief.textfsm",
+    "show ip nat statistics": "cisco_ios_show_ip_nat_statistics.textfsm",
+    "show policy-map interface": "cisco_ios_show_policy-map_interface.textfsm",
+    "show snmp": "cisco_ios_show_snmp.textfsm",
+    "show cdp neighbors detail": "cisco_ios_show_cdp_neighbors_detail.textfsm",
+    "show lldp neighbors detail": "cisco_ios_show_lldp_neighbors_detail.textfsm",
+}
+
+
+def normalizar_comando(comando):
+    """Normaliza espacios y mayúsculas para usar el comando como clave"""
+    return " ".join(comando.lower().split())
+
+
+class TemplateCache:
+    """
+    Caché de plantillas TextFSM compiladas, una por comando.
+    Un objeto TextFSM guarda estado durante el parseo, así que cada
+    plantilla compilada lleva su propio lock.
+    """
+
+    def __init__(self, directorio=DIRECTORIO_PLANTILLAS, plantillas=None):
+        self.directorio = directorio
+        self.plantillas = {normalizar_comando(c): f for c, f in (plantillas or PLANTILLAS).items()}
+        self._compiladas = {}
+        self._lock = threading.Lock()
+
+    def tiene_plantilla(self, comando):
+        """Indica si existe una plantilla para el comando"""
+        return normalizar_comando(comando) in self.plantillas
+
+    def obtener(self, comando):
+        """Devuelve (TextFSM, lock) para el comando, compilando solo la primera vez"""
+        clave = normalizar_comando(comando)
+        entrada = self._compiladas.get(clave)
+        if entrada is not None or clave not in self.plantillas:
+            return entrada
+
+        with self._lock:
+            entrada = self._compiladas.get(clave)
+            if entrada is None:
+                import textfsm  # se importa al compilar la primera plantilla
+                ruta = os.path.join(self.directorio, self.plantillas[clave])
+                with open(ruta, encoding="utf-8") as f:
+                    entrada = (textfsm.TextFSM(f), threading.Lock())
+                self._compiladas[clave] = entrada
+        return entrada
+
+    def parsear(self, comando, salida):
+        """
+        Parsea la salida de un comando
+        Devuelve una lista de diccionarios o None si no hay plantilla
+        """
+        entrada = self.obtener(comando)
+        if entrada is None:
+            return None
+
+        fsm, lock = entrada
+        with lock:
+            fsm.Reset()
+            filas = fsm.ParseText(salida or "")
+            cabecera = [campo.lower() for campo in fsm.header]
+        return [dict(zip(cabecera, fila)) for fila in filas]
+
+    def limpiar(self):
+        """Descarta las plantillas compiladas"""
+        with self._lock:
+            self._compiladas.clear()
+
+
+_cache = TemplateCache()
+
+
+def parsear_salida(comando, salida):
+    """Parsea la salida de un comando con la caché global de plantillas"""
+    return _cache.parsear(comando, salida)
+
+
+def formatear_tabla(registros):
+    """Formatea una lista de registros como tabla de texto alineada"""
+    if not registros:
+        return "(sin registros)"
+
+    columnas = list(registros[0])
+    filas = [[_a_texto(registro.get(col, "")) for col in columnas] for registro in registros]
+    anchos = [max(len(col), *(len(fila[i]) for fila in filas)) for i, col in enumerate(columnas)]
+
+    lineas = ["  ".join(col.upper().ljust(anchos[i]) for i, col in enumerate(columnas)).rstrip()]
+    lineas.append("  ".join("-" * ancho for ancho in anchos))
+    for fila in filas:
+        lineas.append("  ".join(valor.ljust(anchos[i]) for i, valor in enumerate(fila)).rstrip())
+    return "\n".join(lineas)
+
+
+def _a_texto(valor):
+    """Convierte un valor de TextFSM (texto o lista) en texto"""
+    if isinstance(valor, list):
+        return ", ".join(valor)
+    return "" if valor is None else str(valor)
@@ -2,15 +2,56 @@
 Configuración de la topología de red y comandos.
 """
 
+from collections import namedtuple
+
+from topology_model import cargar_topologia, topologia_desde_config
+
+RouterConfig = namedtuple("RouterConfig", ["nombre", "ip", "usuario", "password"])
+
 # Configuración de routers predefinidos
 ROUTERS_CONFIG = [
-    ("R1", "172.168.1.1", "admin", "password"),
-    ("R2", "172.168.1.2", "admin", "password"),
-    ("R3", "172.168.1.6", "admin", "password"),
-    ("R4", "172.168.1.10", "admin", "password"),
-    ("R5", "172.168.1.21", "admin", "password")
+    RouterConfig("R1", "172.168.1.1", "admin", "password"),
+    RouterConfig("R2", "172.168.1.2", "admin", "password"),
+    RouterConfig("R3", "172.168.1.6", "admin", "password"),
+    RouterConfig("R4", "172.168.1.10", "admin", "password"),
+    RouterConfig("R5", "172.168.1.21", "admin", "password")
 ]
 
+# Archivo de topología (formato en topology_model); None = topología predefinida
+ARCHIVO_TOPOLOGIA = None
+
+# Por encima de este número de routers, cada router se dibuja como un círculo simple
+LIMITE_DETALLE_TOPOLOGIA = 500
+
+# Número máximo de conexiones SSH simultáneas
+MAX_CONEXIONES_SIMULTANEAS = 10
+
+# Monitoreo de salud: intervalos adaptativos (segundos) y timeout por sonda
+MONITOR_INTERVALO_MIN = 5
+MONITOR_INTERVALO_MAX = 60
+MONITOR_TIMEOUT_SONDA = 15
+
+# Motor de conexiones: "netmiko" (hilos) o "asyncio" (asyncssh, un único event loop)
+MOTOR_CONEXION = "netmiko"
+
+# Despliegue en varios routers: routers canario que reciben el cambio primero
+DESPLIEGUE_CANARIOS = 1
+
+# Directorio del almacén de respaldos de running-config
+DIRECTORIO_RESPALDOS = "backups"
+
+# Base de datos SQLite con el historial de resultados de comandos y logs
+ARCHIVO_HISTORIAL = "historial.db"
+
+# Directorio donde se guardan las distribuciones automáticas ya calculadas
+DIRECTORIO_CACHE_LAYOUT = "layout_cache"
+
+# Descubrimiento de vecinos CDP/LLDP: consultas simultáneas y saltos desde
+# los routers conocidos (None = sin límite). Los dispositivos nuevos se
+# conectan con las credenciales del primer router de ROUTERS_CONFIG.
+DESCUBRIMIENTO_CONCURRENCIA = 20
+DESCUBRIMIENTO_MAX_SALTOS = None
+
 # Posiciones de los routers en el canvas
 ROUTER_POSITIONS = {
     "R1": (200, 100),
@@ -76,4 +117,46 @@ CONFIG_TEMPLATES = {
         "router ospf 1",
         "network 192.168.1.0 0.0.0.255 area 0"
     ]
-}
\ No newline at end of file
+}
+
+
+class TopologyConfig:
+    """Acceso a la configuración de la topología para los componentes gráficos"""
+    
+    COLORS = {
+        "connected": "green",
+        "disconnected": "red",
+        "warning": "orange",
+    }
+    
+    ROUTERS_CONFIG = ROUTERS_CONFIG
+    
+    @staticmethod
+    def get_topology(ruta=None):
+        """Topología del archivo indicado (o ARCHIVO_TOPOLOGIA) o la predefinida"""
+        ruta = ruta or ARCHIVO_TOPOLOGIA
+        if ruta:
+            return cargar_topologia(ruta)
+        return topologia_desde_config(ROUTERS_CONFIG, ROUTER_POSITIONS, CONNECTIONS)
+    
+    @staticmethod
+    def get_router_positions():
+        return dict(ROUTER_POSITIONS)
+    
+    @staticmethod
+    def get_connections():
+        return list(CONNECTIONS)
+    
+    @staticmethod
+    def get_config_template(config_type):
+        return {"comandos": list(CONFIG_TEMPLATES.get(config_type, []))}
+
+
+class NetworkCommands:
+    """Comandos de consulta predefinidos"""
+    
+    QUERY_COMMANDS = QUERY_COMMANDS
+    
+    @staticmethod
+    def get_command(description):
+        return QUERY_COMMANDS.get(description)
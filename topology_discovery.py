@@ -0,0 +1,174 @@
+"""
+Descubrimiento de la topología mediante CDP y LLDP.
+Partiendo de los routers conocidos, consulta en paralelo 'show cdp
+neighbors detail' y 'show lldp neighbors detail' (en un único intercambio
+por router), y se extiende en anchura a los dispositivos nuevos que van
+apareciendo, con un máximo de consultas simultáneas. Cada dispositivo se
+explora en cuanto se descubre, sin esperar a que termine su nivel, y los
+enlaces vistos desde ambos extremos se registran una sola vez.
+"""
+
+import re
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from topology_model import Topology
+
+
+COMANDO_CDP = "show cdp neighbors detail"
+COMANDO_LLDP = "show lldp neighbors detail"
+
+Vecino = namedtuple("Vecino", "nombre ip interfaz_local interfaz_remota plataforma protocolo")
+
+_IP = re.compile(r"^\d+\.\d+\.\d+\.\d+$")
+
+
+def nombre_dispositivo(texto):
+    """
+    Nombre corto de un dispositivo anunciado por CDP/LLDP:
+    'R2.lab.local' -> 'R2', 'SW1(FOC1234)' -> 'SW1'
+    """
+    texto = texto.strip().split("(")[0]
+    if _IP.match(texto):
+        return texto
+    return texto.split(".")[0]
+
+
+def extraer_vecinos(resultados):
+    """
+    Convierte los registros de CDP y LLDP en una lista de Vecino
+    resultados: diccionario comando -> registros parseados (None si falló)
+    Devuelve None si no se obtuvo respuesta de ningún protocolo
+    """
+    if all(registros is None for registros in resultados.values()):
+        return None
+
+    vecinos = []
+    for registro in _registros(resultados.get(COMANDO_CDP)):
+        vecinos.append(Vecino(nombre_dispositivo(registro["destination_host"]), registro["management_ip"],
+                              registro["local_port"], registro["remote_port"], registro["platform"], "cdp"))
+    for registro in _registros(resultados.get(COMANDO_LLDP)):
+        nombre = registro["neighbor"] or registro["chassis_id"]
+        vecinos.append(Vecino(nombre_dispositivo(nombre), registro["management_address"],
+                              registro["local_interface"], registro["neighbor_port_id"], "", "lldp"))
+    return vecinos
+
+
+def _registros(resultado):
+    """Registros parseados (una salida sin plantilla o con error se ignora)"""
+    return resultado if isinstance(resultado, list) else []
+
+
+class TopologyDiscovery:
+    """
+    Descubrimiento de vecinos en anchura.
+    routers: diccionario nombre -> conexión de los routers conocidos
+    conectar_nuevo: función (nombre, ip) -> conexión abierta o None para los
+                    dispositivos descubiertos (None = explorar solo los conocidos)
+    max_concurrencia: routers consultados a la vez
+    max_saltos: distancia máxima a las semillas (None = sin límite)
+    llamar: función (fn, *args) que ejecuta las operaciones del motor; permite
+            resolver corrutinas del motor asyncio (por defecto llamada directa)
+    """
+
+    def __init__(self, routers, conectar_nuevo=None, max_concurrencia=20, max_saltos=None,
+                 llamar=None):
+        self.routers = routers
+        self.conectar_nuevo = conectar_nuevo
+        self.max_concurrencia = max_concurrencia
+        self.max_saltos = max_saltos
+        self.llamar = llamar or (lambda funcion, *args, **kwargs: funcion(*args, **kwargs))
+        self.fallidos = []  # routers que no respondieron en el último descubrimiento
+
+    def descubrir(self, semillas=None, base=None, callback=None):
+        """
+        Descubre la topología a partir de las semillas (todos los routers conocidos por defecto)
+        base: topología previa de la que se conservan posiciones y atributos
+        callback: función (nombre, vecinos, duracion) llamada al explorar cada router
+                  (vecinos es None si el router no respondió)
+        Devuelve una Topology con los dispositivos y enlaces descubiertos
+        """
+        semillas = [n for n in (self.routers if semillas is None else semillas) if n in self.routers]
+        topologia = Topology()
+        self.fallidos = []
+        if not semillas:
+            return topologia
+
+        # Un dispositivo puede anunciarse con otro nombre: se identifica también por IP
+        por_ip = {getattr(router, "ip", None): nombre for nombre, router in self.routers.items()}
+        saltos = {nombre: 0 for nombre in semillas}
+        for nombre in semillas:
+            self._registrar(topologia, base, nombre, getattr(self.routers[nombre], "ip", ""))
+
+        workers = max(1, self.max_concurrencia)
+        explorados = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="discovery") as executor:
+            pendientes = {executor.submit(self._explorar, nombre, None): nombre for nombre in semillas}
+            while pendientes:
+                terminados, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    nombre = pendientes.pop(futuro)
+                    vecinos, duracion = futuro.result()
+                    explorados += 1
+                    if vecinos is None:
+                        self.fallidos.append(nombre)
+                    self._notificar(callback, nombre, vecinos, duracion)
+
+                    for vecino in vecinos or []:
+                        destino = por_ip.get(vecino.ip) or vecino.nombre
+                        if destino == nombre:
+                            continue
+                        if destino not in topologia:
+                            self._registrar(topologia, base, destino, vecino.ip, vecino.plataforma)
+                            if vecino.ip:
+                                por_ip.setdefault(vecino.ip, destino)
+                        topologia.add_link(nombre, destino)
+
+                        if destino in saltos or (self.max_saltos is not None
+                                                 and saltos[nombre] >= self.max_saltos):
+                            continue
+                        if destino not in self.routers and (not self.conectar_nuevo or not vecino.ip):
+                            continue
+                        saltos[destino] = saltos[nombre] + 1
+                        pendientes[executor.submit(self._explorar, destino, vecino.ip)] = destino
+
+        print(f"Descubrimiento completado: {explorados} routers explorados, {len(topologia)} dispositivos, "
+              f"{len(topologia.connections)} enlaces")
+        return topologia
+
+    def _explorar(self, nombre, ip):
+        """Consulta los vecinos CDP y LLDP de un router, conectándolo si es nuevo"""
+        inicio = time.perf_counter()
+        try:
+            router = self.routers.get(nombre)
+            if router is None:
+                router = self.conectar_nuevo(nombre, ip)
+                if router is None:
+                    return None, time.perf_counter() - inicio
+                self.routers[nombre] = router
+            resultados = self.llamar(router.obtener_varios, [COMANDO_CDP, COMANDO_LLDP],
+                                     parsear=True, forzar=True)
+            return extraer_vecinos(resultados), time.perf_counter() - inicio
+        except Exception as e:
+            print(f"Error descubriendo vecinos de {nombre}: {e}")
+            return None, time.perf_counter() - inicio
+
+    @staticmethod
+    def _registrar(topologia, base, nombre, ip, plataforma=""):
+        """Añade un dispositivo conservando la posición y los atributos de la topología base"""
+        if base is not None and nombre in base:
+            atributos = dict(base.attributes(nombre))
+            posicion = base.positions[nombre] or (None, None)
+            topologia.add_router(nombre, *posicion, **dict(atributos, ip=atributos.get("ip") or ip or ""))
+            return
+        atributos = {"plataforma": "_".join(plataforma.split())} if plataforma else {}
+        topologia.add_router(nombre, ip=ip or "", **atributos)
+
+    @staticmethod
+    def _notificar(callback, nombre, vecinos, duracion):
+        if callback:
+            try:
+                callback(nombre, vecinos, duracion)
+            except Exception as e:
+                print(f"Error en callback para {nombre}: {e}")
@@ -0,0 +1,307 @@
+"""
+Distribución automática de la topología (force-directed) vectorizada con NumPy.
+
+Algoritmo de Fruchterman-Reingold en su variante con rejilla: los enlaces
+atraen a sus extremos y cada router repele a los que tiene a menos de 2k.
+Los routers se agrupan en celdas de lado 2k y solo se comparan con los de
+su celda y las vecinas, lo que reduce el coste por iteración de O(n²) a
+O(n). Todos los pares se generan y evalúan con operaciones de NumPy, sin
+bucles de Python por router.
+
+La posición inicial sale de un recorrido en anchura (coronas concéntricas
+por nivel), de modo que cada router empieza cerca de sus vecinos y bastan
+pocas iteraciones. Los routers que ya tienen posición se mantienen fijos y
+solo se calculan los nuevos (re-layout incremental). Los resultados se
+guardan en disco con el hash de la topología como clave, de modo que
+reabrir una red grande no vuelve a calcular la distribución.
+"""
+
+import hashlib
+import os
+from collections import deque
+
+import numpy as np
+
+
+ESPACIADO = 60  # distancia ideal entre routers enlazados (píxeles)
+ITERACIONES = 100
+ITERACIONES_INCREMENTAL = 60
+MARGEN = 60
+
+
+class ForceLayout:
+    """
+    Motor de distribución automática.
+    espaciado: distancia ideal entre routers (k en Fruchterman-Reingold)
+    directorio_cache: directorio de la caché en disco (None = sin caché)
+    """
+
+    def __init__(self, espaciado=ESPACIADO, iteraciones=ITERACIONES,
+                 iteraciones_incremental=ITERACIONES_INCREMENTAL, directorio_cache=None, semilla=0):
+        self.espaciado = espaciado
+        self.iteraciones = iteraciones
+        self.iteraciones_incremental = iteraciones_incremental
+        self.directorio_cache = directorio_cache
+        self.semilla = semilla
+
+    def aplicar(self, topologia, recalcular=False):
+        """
+        Coloca los routers sin posición (o todos si recalcular) y actualiza
+        topologia.positions. Devuelve el número de routers colocados.
+        """
+        nuevas = self.posiciones(list(topologia.positions), list(topologia.connections),
+                                 {} if recalcular else topologia.placed_positions())
+        topologia.positions.update(nuevas)
+        return len(nuevas)
+
+    def posiciones(self, nombres, enlaces, fijas=None):
+        """
+        Posición de los routers que no están en fijas, de la caché en disco o
+        calculada. No modifica ninguna topología, así que puede ejecutarse en
+        otro hilo con una copia de los nombres, los enlaces y las posiciones.
+        Devuelve un diccionario nombre -> (x, y)
+        """
+        fijas = fijas or {}
+        if all(nombre in fijas for nombre in nombres):
+            return {}
+
+        clave = hash_topologia(nombres, enlaces, fijas, self.espaciado)
+        posiciones = self._leer_cache(clave)
+        if posiciones is None or set(posiciones) != set(nombres):
+            posiciones = self.calcular(nombres, enlaces, fijas)
+            self._guardar_cache(clave, posiciones)
+        return {nombre: posiciones[nombre] for nombre in nombres if nombre not in fijas}
+
+    def calcular(self, nombres, enlaces, fijas=None):
+        """
+        Calcula la posición de todos los routers
+        fijas: diccionario nombre -> (x, y) de routers que no se mueven
+        Devuelve un diccionario nombre -> (x, y)
+        """
+        fijas = fijas or {}
+        n = len(nombres)
+        if n == 0:
+            return {}
+
+        indice = {nombre: i for i, nombre in enumerate(nombres)}
+        aristas = np.array([(indice[a], indice[b]) for a, b in enlaces
+                            if a in indice and b in indice and a != b], dtype=np.int64).reshape(-1, 2)
+        aleatorio = np.random.default_rng(self.semilla)
+        k = float(self.espaciado)
+
+        pos = np.zeros((n, 2))
+        movil = np.ones(n, dtype=bool)
+        for nombre, (x, y) in fijas.items():
+            if nombre in indice:
+                pos[indice[nombre]] = (x, y)
+                movil[indice[nombre]] = False
+        pos = self._posiciones_iniciales(n, aristas, pos, ~movil, aleatorio)
+
+        # En el re-layout incremental solo se calculan las fuerzas sobre los
+        # routers nuevos y sobre los enlaces que los tocan
+        if movil.all():
+            activos, iteraciones = None, self.iteraciones
+        else:
+            activos, iteraciones = np.flatnonzero(movil), self.iteraciones_incremental
+            aristas = aristas[movil[aristas].any(axis=1)]
+
+        temperatura = 3 * k
+        for paso in range(iteraciones):
+            fuerza = _repulsion(pos, k, activos) + _atraccion(pos, aristas, k)
+            longitud = np.sqrt((fuerza ** 2).sum(axis=1)) + 1e-9
+            limite = temperatura * (1 - paso / iteraciones) + 0.01 * k
+            desplazamiento = fuerza * (np.minimum(longitud, limite) / longitud)[:, None]
+            pos[movil] += desplazamiento[movil]
+
+        # Sin routers fijos, se desplaza la distribución al origen del canvas
+        if not fijas:
+            pos += MARGEN - pos.min(axis=0)
+        return {nombre: (round(float(x), 1), round(float(y), 1))
+                for nombre, (x, y) in zip(nombres, pos)}
+
+    def _posiciones_iniciales(self, n, aristas, pos, colocado, aleatorio):
+        """
+        Posición de partida de los routers sin posición. Los que tienen un
+        vecino ya colocado empiezan junto a él; cada componente nueva se
+        dispone en coronas por nivel de un recorrido en anchura, y las
+        componentes se colocan en filas (a la derecha de lo ya colocado).
+        """
+        k = self.espaciado
+        vecinos = [[] for _ in range(n)]
+        for a, b in aristas.tolist():
+            vecinos[a].append(b)
+            vecinos[b].append(a)
+
+        cola = deque(np.flatnonzero(colocado).tolist())
+        ruido = aleatorio.normal(0, k, size=(n, 2))
+        while cola:
+            u = cola.popleft()
+            for v in vecinos[u]:
+                if not colocado[v]:
+                    pos[v] = pos[u] + ruido[v]
+                    colocado[v] = True
+                    cola.append(v)
+
+        if colocado.any():
+            origen_x, origen_y = pos[colocado, 0].max() + 2 * k, pos[colocado, 1].min()
+        else:
+            origen_x = origen_y = 0.0
+
+        componentes = []
+        for raiz in np.flatnonzero(~colocado).tolist():
+            if colocado[raiz]:
+                continue
+            colocado[raiz] = True
+            niveles = [[raiz]]
+            while True:
+                siguiente = []
+                for u in niveles[-1]:
+                    for v in vecinos[u]:
+                        if not colocado[v]:
+                            colocado[v] = True
+                            siguiente.append(v)
+                if not siguiente:
+                    break
+                niveles.append(siguiente)
+            componentes.append(_coronas(niveles, k, aleatorio))
+
+        # Componentes de mayor a menor, en filas de ancho similar al alto total
+        componentes.sort(key=lambda componente: -componente[2])
+        ancho_fila = np.sqrt(sum((2 * radio + k) ** 2 for _, _, radio in componentes))
+        x = y = alto_fila = 0.0
+        for indices, coordenadas, radio in componentes:
+            diametro = 2 * radio + k
+            if x and x + diametro > ancho_fila:
+                x, y, alto_fila = 0.0, y + alto_fila, 0.0
+            pos[indices] = coordenadas + (origen_x + x + diametro / 2, origen_y + y + diametro / 2)
+            x += diametro
+            alto_fila = max(alto_fila, diametro)
+        return pos
+
+    def _ruta_cache(self, clave):
+        return os.path.join(self.directorio_cache, f"{clave}.npz")
+
+    def _leer_cache(self, clave):
+        if not self.directorio_cache:
+            return None
+        try:
+            with np.load(self._ruta_cache(clave)) as datos:
+                return {str(nombre): (float(x), float(y))
+                        for nombre, (x, y) in zip(datos["nombres"], datos["posiciones"])}
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _guardar_cache(self, clave, posiciones):
+        if not self.directorio_cache:
+            return
+        try:
+            os.makedirs(self.directorio_cache, exist_ok=True)
+            temporal = self._ruta_cache(clave) + ".tmp.npz"
+            np.savez_compressed(temporal, nombres=np.array(list(posiciones)),
+                                posiciones=np.array(list(posiciones.values())))
+            os.replace(temporal, self._ruta_cache(clave))
+        except OSError as e:
+            print(f"No se pudo guardar la distribución en caché: {e}")
+
+
+def hash_topologia(nombres, enlaces, fijas=None, espaciado=ESPACIADO):
+    """Hash de los routers, los enlaces (sin orden) y las posiciones fijas"""
+    resumen = hashlib.sha256()
+    resumen.update(f"espaciado={espaciado}\n".encode())
+    for nombre in sorted(nombres):
+        resumen.update(f"r {nombre}\n".encode())
+    for a, b in sorted(tuple(sorted(enlace)) for enlace in enlaces):
+        resumen.update(f"l {a} {b}\n".encode())
+    for nombre, (x, y) in sorted((fijas or {}).items()):
+        resumen.update(f"f {nombre} {x:.1f} {y:.1f}\n".encode())
+    return resumen.hexdigest()
+
+
+def _coronas(niveles, k, aleatorio):
+    """
+    Coloca los niveles de un recorrido en anchura en coronas concéntricas
+    alrededor de la raíz. El área de cada corona es proporcional al número
+    de routers del nivel (un router por k²) y el ángulo sigue el orden del
+    recorrido, de modo que los hijos quedan junto a su padre.
+    Devuelve (índices, coordenadas relativas al centro, radio).
+    """
+    indices = np.array([i for nivel in niveles for i in nivel], dtype=np.int64)
+    coordenadas = np.zeros((len(indices), 2))
+    radio = 0.0
+    inicio = 1
+    for nivel in niveles[1:]:
+        cantidad = len(nivel)
+        interior, radio = radio, np.sqrt(radio ** 2 + cantidad * k * k / np.pi) + k / 2
+        angulo = 2 * np.pi * (np.arange(cantidad) + 0.5) / cantidad
+        distancia = np.sqrt(aleatorio.uniform(interior ** 2, radio ** 2, cantidad))
+        coordenadas[inicio:inicio + cantidad, 0] = distancia * np.cos(angulo)
+        coordenadas[inicio:inicio + cantidad, 1] = distancia * np.sin(angulo)
+        inicio += cantidad
+    return indices, coordenadas, radio
+
+
+def _repulsion(pos, k, activos=None):
+    """
+    Fuerza de repulsión k²/d entre routers a menos de 2k.
+    activos: índices de los routers sobre los que se calcula la fuerza
+    (None = todos; en ese caso cada par de celdas vecinas se visita una sola
+    vez y la fuerza se suma a un router y se resta al otro)
+    """
+    n = len(pos)
+    radio = 2 * k
+    coordenadas = np.floor(pos / radio).astype(np.int64)
+    coordenadas -= coordenadas.min(axis=0) - 1  # margen para las celdas vecinas
+    filas = int(coordenadas[:, 1].max()) + 2
+    clave = coordenadas[:, 0] * filas + coordenadas[:, 1]
+
+    orden = np.argsort(clave, kind="stable")
+    unicas, inicio, cuenta = np.unique(clave[orden], return_index=True, return_counts=True)
+
+    if activos is None:
+        origenes = np.arange(n)
+        vecindad = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+    else:
+        origenes = activos
+        vecindad = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+    fuerza = np.zeros_like(pos)
+    for dx, dy in vecindad:
+        # Celda vecina de cada router de origen y rango de routers que contiene
+        vecina = clave[origenes] + dx * filas + dy
+        posicion = np.minimum(np.searchsorted(unicas, vecina), len(unicas) - 1)
+        encontrada = unicas[posicion] == vecina
+        origen, posicion = origenes[encontrada], posicion[encontrada]
+        if len(origen) == 0:
+            continue
+        cantidad = cuenta[posicion]
+        desplazamiento = np.arange(cantidad.sum()) - np.repeat(np.cumsum(cantidad) - cantidad, cantidad)
+        i = np.repeat(origen, cantidad)
+        j = orden[np.repeat(inicio[posicion], cantidad) + desplazamiento]
+        if activos is None and dx == dy == 0:
+            i, j = i[i < j], j[i < j]
+
+        delta = pos[i] - pos[j]
+        d2 = (delta ** 2).sum(axis=1)
+        peso = np.where((d2 > 0) & (d2 < radio * radio), k * k / np.maximum(d2, 1e-9), 0.0)
+        for eje in range(2):
+            f = delta[:, eje] * peso
+            fuerza[:, eje] += np.bincount(i, weights=f, minlength=n)
+            if activos is None:
+                fuerza[:, eje] -= np.bincount(j, weights=f, minlength=n)
+    return fuerza
+
+
+def _atraccion(pos, aristas, k):
+    """Fuerza de atracción d²/k a lo largo de cada enlace"""
+    fuerza = np.zeros_like(pos)
+    if len(aristas) == 0:
+        return fuerza
+    a, b = aristas[:, 0], aristas[:, 1]
+    delta = pos[a] - pos[b]
+    distancia = np.sqrt((delta ** 2).sum(axis=1)) + 1e-9
+    f = delta * (distancia / k)[:, None]
+    n = len(pos)
+    for eje in range(2):
+        fuerza[:, eje] -= np.bincount(a, weights=f[:, eje], minlength=n)
+        fuerza[:, eje] += np.bincount(b, weights=f[:, eje], minlength=n)
+    return fuerza
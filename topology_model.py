@@ -0,0 +1,146 @@
+"""
+Modelo de topología y carga desde archivo.
+
+Formato del archivo (una entrada por línea, '#' para comentarios):
+    router <nombre> <x> <y> [ip] [clave=valor ...]
+    link <router1> <router2>
+Las coordenadas pueden ser '-' si la posición se calcula después.
+
+La carga es perezosa: solo se interpretan el nombre y la posición de cada
+router y los extremos de cada enlace; la IP y los atributos se guardan como
+texto sin procesar y se interpretan la primera vez que se piden.
+"""
+
+import io
+
+
+class Topology:
+    """Routers con posición, enlaces y atributos (interpretados bajo demanda)"""
+
+    def __init__(self):
+        self.positions = {}  # nombre -> (x, y) o None si no tiene posición
+        self.connections = []  # [(r1, r2)] sin duplicados
+        self._enlaces = set()  # pares ordenados para deduplicar
+        self._crudos = {}  # nombre -> texto de IP y atributos sin interpretar
+        self._atributos = {}  # nombre -> diccionario ya interpretado
+
+    def add_router(self, nombre, x=None, y=None, ip="", **atributos):
+        """Añade o actualiza un router"""
+        self.positions[nombre] = (x, y) if x is not None and y is not None else None
+        self._crudos.pop(nombre, None)
+        self._atributos[nombre] = dict(atributos, ip=ip)
+
+    def add_link(self, r1, r2):
+        """Añade un enlace; los enlaces repetidos o invertidos se ignoran"""
+        clave = (r1, r2) if r1 <= r2 else (r2, r1)
+        if r1 == r2 or clave in self._enlaces:
+            return False
+        self._enlaces.add(clave)
+        self.connections.append((r1, r2))
+        return True
+
+    def attributes(self, nombre):
+        """Atributos de un router (incluida 'ip'), interpretados la primera vez"""
+        atributos = self._atributos.get(nombre)
+        if atributos is None:
+            atributos = self._atributos[nombre] = _interpretar_atributos(self._crudos.pop(nombre, ""))
+        return atributos
+
+    def ip(self, nombre):
+        return self.attributes(nombre).get("ip", "")
+
+    def placed_positions(self):
+        """Posiciones de los routers que ya tienen coordenadas"""
+        return {nombre: posicion for nombre, posicion in self.positions.items() if posicion}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, nombre):
+        return nombre in self.positions
+
+
+def _interpretar_atributos(texto):
+    """'10.0.0.1 rol=core sitio=MAD' -> {'ip': '10.0.0.1', 'rol': 'core', 'sitio': 'MAD'}"""
+    atributos = {"ip": ""}
+    for campo in texto.split():
+        clave, separador, valor = campo.partition("=")
+        if separador:
+            atributos[clave] = valor
+        elif not atributos["ip"]:
+            atributos["ip"] = campo
+    return atributos
+
+
+def _coordenada(texto):
+    return None if texto == "-" else float(texto)
+
+
+def leer_topologia(archivo):
+    """Lee una topología desde un objeto de texto (archivo abierto o StringIO)"""
+    topologia = Topology()
+    posiciones = topologia.positions
+    crudos = topologia._crudos
+    for numero, linea in enumerate(archivo, 1):
+        if not linea.strip() or linea.lstrip().startswith("#"):
+            continue
+        campos = linea.split(None, 4)
+        tipo = campos[0]
+        try:
+            if tipo == "router":
+                nombre = campos[1]
+                x, y = _coordenada(campos[2]), _coordenada(campos[3])
+                posiciones[nombre] = (x, y) if x is not None and y is not None else None
+                crudos[nombre] = campos[4].strip() if len(campos) > 4 else ""
+            elif tipo == "link":
+                topologia.add_link(campos[1], campos[2])
+            else:
+                raise ValueError(f"tipo de entrada desconocido '{tipo}'")
+        except (IndexError, ValueError) as e:
+            raise ValueError(f"Línea {numero} de la topología no válida: {linea.strip()} ({e})")
+
+    # Enlaces a routers no declarados: se añaden sin posición
+    for r1, r2 in topologia.connections:
+        for nombre in (r1, r2):
+            if nombre not in posiciones:
+                posiciones[nombre] = None
+    return topologia
+
+
+def cargar_topologia(ruta):
+    """Carga una topología desde un archivo"""
+    with open(ruta, encoding="utf-8") as archivo:
+        return leer_topologia(archivo)
+
+
+def guardar_topologia(topologia, ruta):
+    """Guarda una topología en el formato de archivo"""
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        archivo.write(formatear_topologia(topologia))
+
+
+def formatear_topologia(topologia):
+    """Devuelve la topología como texto en el formato de archivo"""
+    salida = io.StringIO()
+    for nombre, posicion in topologia.positions.items():
+        x, y = (f"{posicion[0]:g}", f"{posicion[1]:g}") if posicion else ("-", "-")
+        if nombre in topologia._crudos:
+            resto = topologia._crudos[nombre]
+        else:
+            atributos = dict(topologia.attributes(nombre))
+            resto = " ".join([atributos.pop("ip", "")] + [f"{k}={v}" for k, v in atributos.items()])
+        salida.write(f"router {nombre} {x} {y} {resto.strip()}".rstrip() + "\n")
+    for r1, r2 in topologia.connections:
+        salida.write(f"link {r1} {r2}\n")
+    return salida.getvalue()
+
+
+def topologia_desde_config(routers_config, posiciones, conexiones):
+    """Construye la topología predefinida a partir de topology_config"""
+    topologia = Topology()
+    ips = {nombre: ip for nombre, ip, *_ in routers_config}
+    for nombre, (x, y) in posiciones.items():
+        topologia.add_router(nombre, x, y, ip=ips.get(nombre, ""))
+    for r1, r2 in conexiones:
+        topologia.add_link(r1, r2)
+    return topologia